@@ -0,0 +1,5 @@
+"""Benchmark suite for the cover letter generator.
+
+Run a benchmark from the project root, for example:
+    python -m benchmarks.bench_template_letter
+"""
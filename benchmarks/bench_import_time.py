@@ -0,0 +1,105 @@
+"""Benchmark cold-start import time with python -X importtime, against a budget.
+
+Each case imports an entry point in fresh interpreters and reports the median
+import time of the modules it pulled in beyond interpreter startup, the
+heaviest of those modules, and whether any module that entry point must not
+load (e.g. the Google SDK for an Ollama-only deployment) was imported.
+Exits non-zero if a case is over budget or imports a forbidden module.
+
+    python -m benchmarks.bench_import_time --output import_time.json
+    python -m benchmarks.bench_import_time --runs 10 --budget-scale 1.5
+"""
+import sys
+import argparse
+import statistics
+import subprocess
+from typing import Dict, List, Set, Tuple
+from .common import write_results
+
+# (name, statement, budget in ms, modules the statement must not import)
+CASES = [
+    ("core", "import src.core", 400, ["google.generativeai", "PyPDF2", "http.server"]),
+    ("ollama_client", "from src.clients import OllamaClient", 250, ["google.generativeai", "PyPDF2"]),
+    ("gemini_module", "import src.clients.gemini_client", 250, ["google.generativeai"]),
+    ("utils", "import src.utils", 150, ["PyPDF2", "http.server", "google.generativeai"]),
+    ("pdf_worker", "import src.utils.pdf_worker", 150, ["PyPDF2", "pydantic", "google.generativeai"])
+]
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """(module, self us, cumulative us, depth) rows of -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+def run_importtime(statement: str) -> List[Tuple[str, int, int, int]]:
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                               capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"'{statement}' failed:\n{completed.stderr[-2000:]}")
+    return parse_importtime(completed.stderr)
+
+def startup_modules() -> Set[str]:
+    """Modules imported by interpreter startup alone (site, encodings, ...)."""
+    return {row[0] for row in run_importtime("pass")}
+
+def measure_case(statement: str, baseline: Set[str], runs: int) -> Dict:
+    totals = []
+    self_times: Dict[str, List[int]] = {}
+    imported: Set[str] = set()
+    for _ in range(runs):
+        rows = [row for row in run_importtime(statement) if row[0] not in baseline]
+        # Top-level rows are the outermost imports; their cumulative times add up to the total
+        min_depth = min((row[3] for row in rows), default=0)
+        totals.append(sum(row[2] for row in rows if row[3] == min_depth) / 1000)
+        for name, self_us, _, _ in rows:
+            self_times.setdefault(name, []).append(self_us)
+            imported.add(name)
+    heaviest = sorted(((statistics.median(times) / 1000, name) for name, times in self_times.items()), reverse=True)
+    return {
+        'median_ms': statistics.median(totals),
+        'min_ms': min(totals),
+        'modules': len(imported),
+        'heaviest': [{'module': name, 'self_ms': ms} for ms, name in heaviest[:10]],
+        'imported': imported
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Check cold-start import time against a budget")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per case")
+    parser.add_argument("--budget-scale", type=float, default=1.0,
+                        help="Multiply every budget, e.g. for slower CI machines")
+    parser.add_argument("--cases", nargs="+", choices=[case[0] for case in CASES])
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    baseline = startup_modules()
+    results = {'benchmark': 'import_time', 'cases': {}, 'failures': []}
+    for name, statement, budget_ms, forbidden in CASES:
+        if args.cases and name not in args.cases:
+            continue
+        case = measure_case(statement, baseline, args.runs)
+        imported = case.pop('imported')
+        budget_ms *= args.budget_scale
+        case.update({
+            'statement': statement,
+            'budget_ms': budget_ms,
+            'forbidden_imported': [module for module in forbidden if module in imported]
+        })
+        results['cases'][name] = case
+        if case['median_ms'] > budget_ms:
+            results['failures'].append(f"{name}: {case['median_ms']:.0f}ms is over the {budget_ms:.0f}ms budget")
+        if case['forbidden_imported']:
+            results['failures'].append(f"{name}: imports {', '.join(case['forbidden_imported'])}")
+
+    write_results(results, args.output)
+    if results['failures']:
+        print("\n".join(results['failures']), file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
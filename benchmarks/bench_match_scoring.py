@@ -0,0 +1,56 @@
+"""Benchmark vectorized resume-to-job match scoring.
+
+Indexes synthetic job postings once, then scores one resume against all of
+them and picks the top K, as a batch run would before spending model calls.
+Reports index build time and scoring time per posting.
+
+    python -m benchmarks.bench_match_scoring --postings 1000 5000 20000
+"""
+import time
+import random
+import argparse
+from src.models import ResumeExtraction
+from src.services import JobMatcher
+from .common import time_function, write_results
+from .corpus import synthetic_job_posting
+
+RESUME = ResumeExtraction(
+    experience=["Senior Software Engineer at Acme Corp (2020 - Present)", "Data Engineer at Globex (2017 - 2020)"],
+    skills=["Python", "Docker", "Kubernetes", "AWS", "SQL", "Machine Learning"],
+    education=["B.S. Computer Science, State University (2017)"],
+    contact_info="jane.doe@example.com"
+)
+
+def run_case(postings: int, seed: int, iterations: int, top_k: int) -> dict:
+    rng = random.Random(seed)
+    job_texts = [synthetic_job_posting(rng) for _ in range(postings)]
+    start = time.perf_counter()
+    matcher = JobMatcher(job_texts)
+    build_ms = (time.perf_counter() - start) * 1000
+    timing = time_function(lambda: matcher.top_k(RESUME, top_k), iterations, warmup=2)
+    return {
+        'postings': postings,
+        'vocabulary': len(matcher.vocabulary),
+        'build_ms': build_ms,
+        'timing': timing,
+        'us_per_posting': timing['p50_ms'] * 1000 / postings,
+        'top': matcher.top_k(RESUME, top_k)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark resume-to-job match scoring")
+    parser.add_argument("--postings", nargs="+", type=int, default=[1000, 5000])
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    results = {
+        'benchmark': 'match_scoring',
+        'cases': [run_case(postings, args.seed, args.iterations, args.top_k) for postings in args.postings]
+    }
+    write_results(results, args.output)
+
+if __name__ == "__main__":
+    main()
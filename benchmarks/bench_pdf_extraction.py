@@ -0,0 +1,124 @@
+"""Benchmark PDF text extraction across backends and document kinds.
+
+Runs extract_text_from_pdf with every installed backend over synthetic resumes
+of 1 to 50 pages: single and two-column text, an embedded font, and scanned
+pages with and without an OCR text layer. Reports throughput, peak memory and
+how much of the laid-out text each backend recovers, and recommends the
+fastest backend that keeps up on yield.
+
+    python -m benchmarks.bench_pdf_extraction --output pdf_extraction.json
+    python -m benchmarks.bench_pdf_extraction --backends pypdf2 pymupdf --pages 1 10 --kinds two_column
+
+Peak memory comes from tracemalloc, so it counts Python allocations only;
+memory held inside C parsers such as MuPDF or PDFium is not included.
+"""
+import os
+import logging
+import argparse
+import tempfile
+import tracemalloc
+from typing import List
+from src.utils.pdf_utils import extract_text_from_pdf, get_pdf_backend, available_pdf_backends
+from .common import time_function, write_results
+from .corpus import PDF_KINDS, build_benchmark_pdf
+
+DEFAULT_PAGES = [1, 5, 10, 25, 50]
+# Kinds with extractable text, used to pick a backend
+TEXT_KINDS = ["single_column", "two_column", "embedded_font", "scanned_ocr"]
+# Within this fraction of the best yield still counts as keeping up
+YIELD_TOLERANCE = 0.95
+
+def measure_peak_memory(func) -> int:
+    """Peak traced bytes allocated by one call."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def run_case(backend, kind: str, pages: int, seed: int, iterations: int) -> dict:
+    data, source_text = build_benchmark_pdf(kind, pages, seed)
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as pdf_file:
+        pdf_file.write(data)
+        pdf_path = pdf_file.name
+    try:
+        text = extract_text_from_pdf(pdf_path, backend) or ""
+        timing = time_function(lambda: extract_text_from_pdf(pdf_path, backend), iterations, warmup=1)
+        peak_bytes = measure_peak_memory(lambda: extract_text_from_pdf(pdf_path, backend))
+    finally:
+        os.unlink(pdf_path)
+
+    seconds = timing['p50_ms'] / 1000
+    source_chars = len("".join(source_text.split()))
+    extracted_chars = len("".join(text.split()))
+    return {
+        'backend': backend.name,
+        'kind': kind,
+        'pages': pages,
+        'file_bytes': len(data),
+        'timing': timing,
+        'pages_per_second': pages / seconds if seconds > 0 else 0.0,
+        'megabytes_per_second': len(data) / 1e6 / seconds if seconds > 0 else 0.0,
+        'peak_memory_bytes': peak_bytes,
+        'source_chars': source_chars,
+        'extracted_chars': extracted_chars,
+        # Whitespace is ignored, since backends lay out lines and columns differently
+        'yield': extracted_chars / source_chars if source_chars else 0.0
+    }
+
+def recommend_backend(cases: List[dict]) -> dict:
+    """Fastest backend over the text kinds among those within tolerance of the best yield."""
+    totals = {}
+    for case in cases:
+        if case['kind'] not in TEXT_KINDS:
+            continue
+        total = totals.setdefault(case['backend'], {'seconds': 0.0, 'yields': []})
+        total['seconds'] += case['timing']['p50_ms'] / 1000
+        total['yields'].append(min(case['yield'], 1.0))
+    if not totals:
+        return {}
+    summary = {
+        name: {'seconds': total['seconds'], 'mean_yield': sum(total['yields']) / len(total['yields'])}
+        for name, total in totals.items()
+    }
+    best_yield = max(entry['mean_yield'] for entry in summary.values())
+    eligible = [name for name, entry in summary.items() if entry['mean_yield'] >= best_yield * YIELD_TOLERANCE]
+    return {
+        'backend': min(eligible, key=lambda name: summary[name]['seconds']),
+        'backends': summary
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF text extraction backends")
+    parser.add_argument("--backends", nargs="+", help="Backends to compare (default: every installed one)")
+    parser.add_argument("--kinds", nargs="+", choices=PDF_KINDS, default=PDF_KINDS)
+    parser.add_argument("--pages", nargs="+", type=int, default=DEFAULT_PAGES)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    # Scanned pages are expected to come back empty; keep that out of the output
+    logging.basicConfig(level=logging.CRITICAL)
+    backends = [get_pdf_backend(name) for name in (args.backends or available_pdf_backends())]
+    missing = [backend.name for backend in backends if not backend.is_available()]
+    if missing:
+        parser.error(f"Not installed: {', '.join(missing)}")
+
+    cases = [
+        run_case(backend, kind, pages, args.seed, args.iterations)
+        for backend in backends
+        for kind in args.kinds
+        for pages in args.pages
+    ]
+    results = {
+        'benchmark': 'pdf_extraction',
+        'backends': [backend.name for backend in backends],
+        'cases': cases,
+        'recommended': recommend_backend(cases)
+    }
+    write_results(results, args.output)
+
+if __name__ == "__main__":
+    main()
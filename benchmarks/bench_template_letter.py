@@ -0,0 +1,64 @@
+"""Benchmark the LLM-free template letter engine.
+
+Measures the composer on pre-extracted data and the full deterministic path
+(fallback extraction + composition) used for instant drafts and overload fallback.
+"""
+import argparse
+from src.models import ResumeExtraction, JobDescriptionExtraction
+from src.services import ResumeExtractor, JobExtractor, TemplateLetterComposer
+from .common import time_function, write_results
+
+SAMPLE_RESUME_TEXT = """Jane Doe
+jane.doe@example.com | (555) 123-4567
+Senior Software Engineer at Acme Corp (2020 - Present)
+Software Developer at Globex (2017 - 2020)
+Skills: Python, Docker, Kubernetes, AWS, SQL, React, Git
+Bachelor of Science in Computer Science, State University (2017)
+"""
+
+SAMPLE_JOB_TEXT = """Backend Engineer
+Initech
+We are hiring a backend engineer to build and scale our data platform.
+Requirements:
+Experience with Python and SQL required
+Knowledge of Docker and Kubernetes
+Familiar with AWS cloud services
+Strong communication skills
+"""
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the template letter engine")
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    resume_info = ResumeExtraction(
+        experience=["Senior Software Engineer at Acme Corp (2020 - Present)", "Software Developer at Globex (2017 - 2020)"],
+        skills=["Python", "Docker", "Kubernetes", "AWS", "SQL", "React"],
+        education=["B.S. Computer Science, State University (2017)"],
+        contact_info="jane.doe@example.com | (555) 123-4567"
+    )
+    job_info = JobDescriptionExtraction(
+        job_title="Backend Engineer",
+        company_name="Initech",
+        requirements=["Experience with Python and SQL", "Knowledge of Docker and Kubernetes", "Familiar with AWS", "Strong communication skills"],
+        description="Build and scale the data platform."
+    )
+
+    def compose_only():
+        TemplateLetterComposer.compose_cover_letter(resume_info, job_info)
+
+    def extract_and_compose():
+        resume = ResumeExtractor._fallback_resume_extraction(SAMPLE_RESUME_TEXT)
+        job = JobExtractor._fallback_job_extraction(SAMPLE_JOB_TEXT)
+        TemplateLetterComposer.compose_cover_letter(resume, job)
+
+    results = {
+        'benchmark': 'template_letter',
+        'compose': time_function(compose_only, args.iterations),
+        'extract_and_compose': time_function(extract_and_compose, args.iterations)
+    }
+    write_results(results, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import json
+import math
+import time
+import statistics
+from typing import Callable, List, Optional
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(max(math.ceil(pct / 100 * len(ordered)) - 1, 0), len(ordered) - 1)
+    return ordered[index]
+
+def summarize(samples_ms: List[float]) -> dict:
+    """Summarize latency samples in milliseconds."""
+    if not samples_ms:
+        return {'count': 0}
+    return {
+        'count': len(samples_ms),
+        'mean_ms': statistics.fmean(samples_ms),
+        'p50_ms': percentile(samples_ms, 50),
+        'p95_ms': percentile(samples_ms, 95),
+        'p99_ms': percentile(samples_ms, 99),
+        'max_ms': max(samples_ms)
+    }
+
+def time_function(func: Callable, iterations: int = 100, warmup: int = 5) -> dict:
+    """Call a function repeatedly and summarize its wall time."""
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+def write_results(results: dict, output_path: Optional[str]) -> None:
+    """Print results and optionally save them as JSON for comparison across commits."""
+    print(json.dumps(results, indent=2))
+    if output_path:
+        with open(output_path, "w") as f:
+            json.dump(results, f, indent=2)
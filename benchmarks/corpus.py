@@ -0,0 +1,274 @@
+"""Synthetic resumes and job postings for benchmarks and load tests.
+
+Everything is generated from a seed, so two runs with the same arguments
+see the same documents. PDFs are written directly with a minimal writer,
+so no PDF library beyond the one under test is needed.
+"""
+import zlib
+import random
+import textwrap
+from typing import List, Tuple
+
+FIRST_NAMES = ["Jane", "Arjun", "Mei", "Carlos", "Amara", "Lukas", "Sofia", "Kenji", "Nadia", "Tom"]
+LAST_NAMES = ["Doe", "Patel", "Chen", "Garcia", "Okafor", "Schmidt", "Rossi", "Tanaka", "Haddad", "Brown"]
+TITLES = ["Software Engineer", "Backend Engineer", "Data Engineer", "Full Stack Developer",
+          "Platform Engineer", "Machine Learning Engineer", "DevOps Engineer", "Frontend Developer"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Hooli", "Stark Industries",
+             "Wayne Analytics", "Cyberdyne", "Soylent Systems", "Vandelay Imports"]
+SKILLS = ["Python", "Java", "JavaScript", "TypeScript", "React", "Node", "SQL", "AWS", "Docker",
+          "Kubernetes", "Git", "Go", "Terraform", "PostgreSQL", "Redis", "Kafka", "Spark", "GraphQL"]
+SCHOOLS = ["State University", "Tech Institute", "City College", "National University"]
+DEGREES = ["Bachelor of Science in Computer Science", "Master of Science in Software Engineering",
+           "Bachelor of Engineering in Information Systems"]
+ACHIEVEMENTS = [
+    "Designed and shipped {skill} services handling millions of requests per day",
+    "Reduced deployment time by 60% by moving builds to {skill}",
+    "Led a team of four engineers delivering a {skill} migration on schedule",
+    "Built monitoring and alerting for {skill} workloads, cutting incidents in half",
+    "Mentored junior developers and ran weekly {skill} knowledge-sharing sessions",
+    "Optimized {skill} queries, lowering p95 latency from 900ms to 120ms"
+]
+RESPONSIBILITIES = [
+    "Build and operate backend services used by millions of customers",
+    "Work with product managers to turn requirements into reliable features",
+    "Own services end to end, from design through on-call",
+    "Improve the performance and cost of our data platform",
+    "Review code and mentor other engineers"
+]
+BENEFITS = [
+    "Competitive salary and equity",
+    "Flexible remote work",
+    "Generous parental leave",
+    "Annual learning budget"
+]
+
+def synthetic_resume_lines(rng: random.Random, roles: int = 3) -> List[str]:
+    """Lines of a plausible software resume."""
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    skills = rng.sample(SKILLS, 7)
+    lines = [
+        name,
+        f"{name.split()[0].lower()}.{name.split()[1].lower()}@example.com | (555) {rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+        "",
+        "Experience"
+    ]
+    year = 2024
+    for _ in range(roles):
+        start = year - rng.randint(2, 4)
+        lines.append(f"{rng.choice(TITLES)} at {rng.choice(COMPANIES)} ({start} - {year})")
+        for _ in range(3):
+            lines.append("- " + rng.choice(ACHIEVEMENTS).format(skill=rng.choice(skills)))
+        year = start
+    lines += [
+        "",
+        "Skills: " + ", ".join(skills),
+        "",
+        "Education",
+        f"{rng.choice(DEGREES)}, {rng.choice(SCHOOLS)} ({year})"
+    ]
+    return lines
+
+def synthetic_job_posting(rng: random.Random) -> str:
+    """A plausible job posting with title, company, requirements and boilerplate."""
+    title = rng.choice(TITLES)
+    company = rng.choice(COMPANIES)
+    skills = rng.sample(SKILLS, 5)
+    lines = [
+        title,
+        company,
+        f"{company} is hiring a {title.lower()} to join a growing team.",
+        "",
+        "Responsibilities:"
+    ]
+    lines += [f"- {item}" for item in rng.sample(RESPONSIBILITIES, 3)]
+    lines += [
+        "",
+        "Requirements:",
+        f"Experience with {skills[0]} and {skills[1]} required",
+        f"Knowledge of {skills[2]} and {skills[3]}",
+        f"Familiar with {skills[4]}",
+        f"{rng.randint(2, 7)}+ years of professional software development",
+        "Strong communication skills",
+        "",
+        "Benefits:"
+    ]
+    lines += [f"- {item}" for item in BENEFITS]
+    return "\n".join(lines)
+
+def _pdf_string(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def build_pdf(pages: List[List[str]], font_size: int = 11) -> bytes:
+    """Write a PDF with one text page per list of lines, in Helvetica."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        leading = font_size + 3
+        content = f"BT /F1 {font_size} Tf 50 750 Td {leading} TL " + " ".join(
+            f"({_pdf_string(line)}) '" for line in lines
+        ) + " ET"
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+        content_id = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {content_id} 0 R "
+            "/Resources << /Font << /F1 3 0 R >> >> >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    return serialize_pdf(objects)
+
+# Kinds of resume PDF for the extraction benchmark
+PDF_KINDS = ["single_column", "two_column", "embedded_font", "scanned", "scanned_ocr"]
+
+LINES_PER_PAGE = 48
+COLUMN_WIDTH_CHARS = 48
+SCAN_WIDTH, SCAN_HEIGHT = 850, 1100  # US Letter at 100 dpi
+
+def _stream(data: bytes, entries: str = "") -> bytes:
+    return f"<< /Length {len(data)}{entries} >>\nstream\n".encode() + data + b"\nendstream"
+
+def _text_block(lines: List[str], x: int, y: int, font: str, font_size: int, render_mode: int = 0) -> str:
+    # Render mode 3 draws nothing, as OCR tools do for their text layer
+    return f"BT /{font} {font_size} Tf {render_mode} Tr {x} {y} Td {font_size + 3} TL " + " ".join(
+        f"({_pdf_string(line)}) '" for line in lines
+    ) + " ET"
+
+def _resume_text_lines(rng: random.Random, count: int) -> List[str]:
+    """At least count lines; long documents are several resumes back to back."""
+    lines: List[str] = []
+    while len(lines) < count:
+        lines += synthetic_resume_lines(rng, roles=rng.randint(2, 4)) + [""]
+    return lines[:count]
+
+def _type3_font(objects: List) -> int:
+    """Add an embedded Type3 font with a ToUnicode map and return its object number.
+
+    The glyphs are plain boxes defined inside the file, so text extraction has to
+    go through the embedded font program's encoding and CMap, not the standard 14.
+    """
+    objects.append(_stream(b"500 0 0 0 420 680 d1 20 0 400 680 re f"))
+    glyph_id = len(objects)
+    cmap = (
+        "/CIDInit /ProcSet findresource begin 12 dict begin begincmap\n"
+        "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def\n"
+        "/CMapName /Adobe-Identity-UCS def /CMapType 2 def\n"
+        "1 begincodespacerange <00> <FF> endcodespacerange\n"
+        "1 beginbfrange <20> <7E> <0020> endbfrange\n"
+        "endcmap CMapName currentdict /CMap defineresource pop end end"
+    )
+    objects.append(_stream(cmap.encode()))
+    cmap_id = len(objects)
+    codes = range(32, 127)
+    objects.append(
+        "<< /Type /Font /Subtype /Type3 /FontBBox [0 0 500 700] /FontMatrix [0.001 0 0 0.001 0 0] "
+        f"/CharProcs << {' '.join(f'/c{code} {glyph_id} 0 R' for code in codes)} >> "
+        f"/Encoding << /Type /Encoding /Differences [32 {' '.join(f'/c{code}' for code in codes)}] >> "
+        f"/FirstChar 32 /LastChar 126 /Widths [{' '.join('500' for _ in codes)}] "
+        f"/ToUnicode {cmap_id} 0 R /Resources << >> >>"
+    )
+    return len(objects)
+
+def _scan_image(rng: random.Random, lines: List[str], row_variants: List[bytes]) -> bytes:
+    """A grayscale page image with dark strokes where text lines would be, plus scanner speckle."""
+    white = b"\xff" * SCAN_WIDTH
+    margin = 70
+    rows = []
+    for line in lines:
+        width = min(len(line) * 7, SCAN_WIDTH - 2 * margin)
+        for _ in range(12):
+            ink = rng.choice(row_variants)
+            rows.append(white[:margin] + ink[margin:margin + width] + white[margin + width:])
+        rows += [rng.choice(row_variants[-2:])] + [white] * 6
+    rows += [white] * (SCAN_HEIGHT - len(rows))
+    return b"".join(rows[:SCAN_HEIGHT])
+
+def _scan_row_variants(rng: random.Random) -> List[bytes]:
+    # Ink rows with gaps between letters, then two nearly white speckled rows
+    ink_rows = [
+        bytes(rng.randint(0, 90) if rng.random() < 0.55 else rng.randint(200, 255) for _ in range(SCAN_WIDTH))
+        for _ in range(8)
+    ]
+    speckle = [
+        bytes(rng.randint(0, 120) if rng.random() < 0.01 else rng.randint(235, 255) for _ in range(SCAN_WIDTH))
+        for _ in range(2)
+    ]
+    return ink_rows + speckle
+
+def build_benchmark_pdf(kind: str, pages: int, seed: int = 0) -> Tuple[bytes, str]:
+    """A resume PDF of the given kind and page count, and the text laid out in it.
+
+    single_column and two_column use Helvetica, embedded_font an embedded Type3
+    font, scanned is an image per page with no text at all, and scanned_ocr adds
+    the invisible text layer an OCR tool would.
+    """
+    if kind not in PDF_KINDS:
+        raise ValueError(f"Unknown PDF kind '{kind}'. Choose from: {', '.join(PDF_KINDS)}")
+    rng = random.Random(seed)
+    objects: List = ["<< /Type /Catalog /Pages 2 0 R >>", None]
+    if kind == "embedded_font":
+        font_id = _type3_font(objects)
+    else:
+        objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+        font_id = len(objects)
+    row_variants = _scan_row_variants(rng) if kind.startswith("scanned") else []
+
+    kids = []
+    page_texts = []
+    for _ in range(pages):
+        resources = f"/Font << /F1 {font_id} 0 R >>"
+        if kind == "two_column":
+            wrapped = [
+                piece for line in _resume_text_lines(rng, LINES_PER_PAGE)
+                for piece in (textwrap.wrap(line, COLUMN_WIDTH_CHARS) or [""])
+            ]
+            columns = [wrapped[:LINES_PER_PAGE], wrapped[LINES_PER_PAGE:2 * LINES_PER_PAGE]]
+            content = " ".join(
+                _text_block(column, x, 750, "F1", 9) for column, x in zip(columns, (50, 320))
+            )
+            page_texts.append("\n".join(columns[0] + columns[1]))
+        else:
+            lines = _resume_text_lines(rng, LINES_PER_PAGE)
+            page_texts.append("\n".join(lines))
+            if kind.startswith("scanned"):
+                objects.append(_stream(
+                    zlib.compress(_scan_image(rng, lines, row_variants)),
+                    f" /Type /XObject /Subtype /Image /Width {SCAN_WIDTH} /Height {SCAN_HEIGHT} "
+                    "/ColorSpace /DeviceGray /BitsPerComponent 8 /Filter /FlateDecode"
+                ))
+                resources += f" /XObject << /Im1 {len(objects)} 0 R >>"
+                content = "q 612 0 0 792 0 0 cm /Im1 Do Q"
+                if kind == "scanned_ocr":
+                    content += " " + _text_block(lines, 50, 750, "F1", 11, render_mode=3)
+            else:
+                content = _text_block(lines, 50, 750, "F1", 11)
+        objects.append(_stream(content.encode("latin-1")))
+        content_id = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {content_id} 0 R "
+            f"/Resources << {resources} >> >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    return serialize_pdf(objects), "\n".join(page_texts)
+
+def serialize_pdf(objects: List[str]) -> bytes:
+    """Serialize numbered objects (object 1 is the catalog) with a cross-reference table."""
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(output))
+        data = body if isinstance(body, bytes) else body.encode("latin-1")
+        output += f"{number} 0 obj\n".encode() + data + b"\nendobj\n"
+    xref = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    output += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(output)
+
+def build_corpus(size: int, seed: int = 0) -> List[Tuple[bytes, str]]:
+    """(resume PDF bytes, job posting text) pairs."""
+    rng = random.Random(seed)
+    return [
+        (build_pdf([synthetic_resume_lines(rng, roles=rng.randint(2, 4))]), synthetic_job_posting(rng))
+        for _ in range(size)
+    ]
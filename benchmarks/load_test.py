@@ -0,0 +1,202 @@
+"""End-to-end load test of the cover letter pipeline.
+
+N virtual users send requests back to back over a synthetic corpus, against
+the offline mock backend by default. Reports throughput, end-to-end and
+per-stage latency percentiles, fallbacks and error rates.
+
+    python -m benchmarks.load_test --users 8 --requests 80 --output load.json
+    python -m benchmarks.load_test --entry jobs --users 4 --duration 30
+    python -m benchmarks.load_test --backend ollama --base-url http://localhost:11434 --model llama3.2:latest
+"""
+import io
+import time
+import asyncio
+import logging
+import argparse
+import subprocess
+from collections import defaultdict
+from typing import Dict, List, Optional
+from src.core import process_cover_letter_request, get_job_manager, get_admission_controller, MODE_LLM, PIPELINE_MODES
+from .common import summarize, write_results
+from .corpus import build_corpus
+from .mock_llm import MockBehavior, MockOllamaServer, create_fake_gemini_client
+
+ERROR_PREFIXES = ("Error:", "An unexpected error occurred")
+
+class LoadStats:
+    """Latency samples and outcome counts collected across virtual users."""
+
+    def __init__(self):
+        self.latencies_ms: List[float] = []
+        self.stage_ms: Dict[str, List[float]] = defaultdict(list)
+        self.fallbacks: Dict[str, int] = defaultdict(int)
+        self.outcomes: Dict[str, int] = defaultdict(int)
+
+    def record_event(self, event) -> None:
+        if event.event == "started" or event.duration_ms is None:
+            return
+        self.stage_ms[event.stage].append(event.duration_ms)
+        if event.fallback_used:
+            self.fallbacks[event.stage] += 1
+
+    def record_result(self, content: Optional[str], elapsed_ms: float) -> None:
+        self.latencies_ms.append(elapsed_ms)
+        if not content:
+            self.outcomes["empty"] += 1
+        elif "at capacity" in content:
+            self.outcomes["rejected"] += 1
+        elif content.startswith(ERROR_PREFIXES):
+            self.outcomes["error"] += 1
+        else:
+            self.outcomes["ok"] += 1
+
+    def report(self, wall_seconds: float) -> dict:
+        total = len(self.latencies_ms)
+        return {
+            "requests": total,
+            "wall_seconds": wall_seconds,
+            "requests_per_second": total / wall_seconds if wall_seconds > 0 else 0.0,
+            "outcomes": dict(self.outcomes),
+            "error_rate": (total - self.outcomes["ok"]) / total if total else 0.0,
+            "latency": summarize(self.latencies_ms),
+            "stages": {stage: summarize(samples) for stage, samples in sorted(self.stage_ms.items())},
+            "fallbacks": dict(self.fallbacks)
+        }
+
+async def _send_request(args, client, pdf_bytes: bytes, job_text: str, stats: LoadStats) -> None:
+    start = time.perf_counter()
+    try:
+        content = await process_cover_letter_request(
+            io.BytesIO(pdf_bytes), job_text, client, mode=args.mode,
+            deadline=args.deadline, on_event=stats.record_event
+        )
+    except Exception as e:
+        content = f"Error: {e}"
+    stats.record_result(content, (time.perf_counter() - start) * 1000)
+
+async def _submit_job(args, client, pdf_bytes: bytes, job_text: str, stats: LoadStats) -> None:
+    """Drive the background job manager the way the UI does: submit, then poll."""
+    manager = get_job_manager()
+    start = time.perf_counter()
+    job_id = manager.submit(io.BytesIO(pdf_bytes), job_text, client, mode=args.mode)
+    while True:
+        status = manager.get_status(job_id)
+        if status is None or status.state in ("completed", "failed", "cancelled"):
+            break
+        await asyncio.sleep(args.poll_interval)
+    result = manager.get_result(job_id)
+    for event in (result.stages if result else []):
+        stats.record_event(event)
+    content = result.content if result else f"Error: job {status.state if status else 'lost'}"
+    stats.record_result(content, (time.perf_counter() - start) * 1000)
+
+async def run_load(args, client, corpus) -> dict:
+    stats = LoadStats()
+    send = _submit_job if args.entry == "jobs" else _send_request
+    next_index = 0
+    stop_at = time.monotonic() + args.duration if args.duration else None
+
+    def claim() -> Optional[int]:
+        # Single event loop, so no lock is needed to hand out request numbers
+        nonlocal next_index
+        if stop_at is not None:
+            if time.monotonic() >= stop_at:
+                return None
+        elif next_index >= args.requests:
+            return None
+        next_index += 1
+        return next_index - 1
+
+    async def virtual_user() -> None:
+        while True:
+            index = claim()
+            if index is None:
+                return
+            pdf_bytes, job_text = corpus[index % len(corpus)]
+            await send(args, client, pdf_bytes, job_text, stats)
+            if args.think_time:
+                await asyncio.sleep(args.think_time)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(virtual_user() for _ in range(args.users)))
+    return stats.report(time.perf_counter() - start)
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+def _create_client(args, behavior: MockBehavior):
+    if args.backend == "mock-gemini":
+        return create_fake_gemini_client(behavior), None
+    if args.backend == "mock-ollama":
+        server = MockOllamaServer(behavior).start()
+        base_url = server.base_url
+    else:
+        server = None
+        base_url = args.base_url
+    from src.clients import OllamaClient
+    return OllamaClient(model_name=args.model, base_url=base_url), server
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the cover letter pipeline")
+    parser.add_argument("--users", type=int, default=4, help="Concurrent virtual users")
+    parser.add_argument("--requests", type=int, default=40, help="Total requests (ignored with --duration)")
+    parser.add_argument("--duration", type=float, help="Run for this many seconds instead of a fixed request count")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Pause between a user's requests")
+    parser.add_argument("--entry", choices=["request", "jobs"], default="request",
+                        help="process_cover_letter_request directly, or the background job manager")
+    parser.add_argument("--mode", choices=PIPELINE_MODES, default=MODE_LLM)
+    parser.add_argument("--deadline", type=float, help="Per-request time budget in seconds")
+    parser.add_argument("--poll-interval", type=float, default=0.05)
+    parser.add_argument("--backend-slots", type=int,
+                        help="Parallel requests admission control assumes the backend serves (default: --users)")
+    parser.add_argument("--corpus-size", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", choices=["mock-ollama", "mock-gemini", "ollama"], default="mock-ollama")
+    parser.add_argument("--base-url", default="http://localhost:11434", help="Ollama URL for --backend ollama")
+    parser.add_argument("--model", default="mock:latest")
+    parser.add_argument("--ttft", type=float, default=0.2)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--broken-json-rate", type=float, default=0.0)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    behavior = MockBehavior(
+        ttft_seconds=args.ttft,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        broken_json_rate=args.broken_json_rate,
+        hang_seconds=args.deadline or 30.0,
+        seed=args.seed
+    )
+    client, server = _create_client(args, behavior)
+    corpus = build_corpus(args.corpus_size, args.seed)
+    # The mock serves every user in parallel, unlike a default single-slot Ollama
+    controller = get_admission_controller()
+    controller.config['backend_slots'] = args.backend_slots or args.users
+
+    try:
+        report = asyncio.run(run_load(args, client, corpus))
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    admission = controller.get_stats()
+    results = {
+        "benchmark": "load_test",
+        "commit": _git_commit(),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        **report,
+        "admission": {action: admission[action] for action in ("admitted", "degraded", "rejected")}
+    }
+    write_results(results, args.output)
+
+if __name__ == "__main__":
+    main()
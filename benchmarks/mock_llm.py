@@ -0,0 +1,342 @@
+"""Offline stand-ins for the model backends.
+
+MockOllamaServer implements the parts of the Ollama HTTP API the app uses
+(/api/generate, streaming and non-streaming, and /api/tags), and
+create_fake_gemini_client returns a GeminiClient whose model is replaced by a
+local fake with the same generate_content shape. Both share a MockBehavior
+that sets time to first token, decode speed, error and timeout injection and
+how often extraction responses contain broken JSON.
+
+Run the server on its own with:
+    python -m benchmarks.mock_llm --port 11435 --ttft 0.5 --tokens-per-second 40
+"""
+import re
+import json
+import time
+import random
+import logging
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+RESUME_RESPONSE = {
+    "experience": ["Senior Software Engineer at Acme Corp (2020 - Present)", "Software Developer at Globex (2017 - 2020)"],
+    "skills": ["Python", "Docker", "Kubernetes", "AWS", "SQL"],
+    "education": ["B.S. Computer Science, State University (2017)"],
+    "contact_info": "jane.doe@example.com | (555) 123-4567"
+}
+
+JOB_RESPONSE = {
+    "job_title": "Backend Engineer",
+    "company_name": "Initech",
+    "requirements": ["Experience with Python and SQL", "Knowledge of Docker and Kubernetes", "Familiar with AWS cloud services"],
+    "description": "Build and scale the data platform. Work with product teams on reliable backend services."
+}
+
+COVER_LETTER_RESPONSE = """Dear Hiring Manager,
+
+I am excited to apply for the Backend Engineer position at Initech. Over the past several years I have designed, built and operated backend services in Python, and the work your team describes on the data platform is exactly the kind of problem I enjoy solving.
+
+As a Senior Software Engineer at Acme Corp, I led the migration of our ingestion pipeline to containerized services on Kubernetes, cutting deployment time from hours to minutes. Before that, at Globex, I owned SQL-heavy reporting services and learned how to keep them fast as data volumes grew.
+
+My toolkit includes Python, SQL, Docker, Kubernetes and AWS, which line up closely with your requirements. I care about observability and clear documentation, and I enjoy working with product teams to turn requirements into dependable systems.
+
+I would welcome the chance to discuss how I can contribute to Initech. Thank you for your time and consideration.
+
+Sincerely,
+Jane Doe"""
+
+MOCK_MODELS = ["deepseek-r1:latest", "llama3.2:latest", "mock:latest"]
+
+class MockBehavior:
+    """How the fake backends respond.
+
+    ttft_seconds: delay before the first token.
+    tokens_per_second: decode speed after the first token (0 means instant).
+    error_rate: share of requests that fail with a server error.
+    timeout_rate: share of requests that hang for hang_seconds without answering.
+    broken_json_rate: share of extraction responses whose JSON is cut off.
+    thinking: wrap responses in a <think> block first, like reasoning models do.
+    """
+
+    def __init__(self, ttft_seconds: float = 0.2, tokens_per_second: float = 50.0, error_rate: float = 0.0,
+                 timeout_rate: float = 0.0, broken_json_rate: float = 0.0, hang_seconds: float = 600.0,
+                 thinking: bool = False, seed: Optional[int] = None):
+        self.ttft_seconds = ttft_seconds
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.broken_json_rate = broken_json_rate
+        self.hang_seconds = hang_seconds
+        self.thinking = thinking
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def roll(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < rate
+
+    def response_for(self, prompt: str) -> str:
+        """Canned response matching the kind of prompt the app sent."""
+        lowered = prompt.lower()
+        if "resume parser" in lowered:
+            text = self._json_response(RESUME_RESPONSE)
+        elif "job description parser" in lowered:
+            text = self._json_response(JOB_RESPONSE)
+        else:
+            text = COVER_LETTER_RESPONSE
+        if self.thinking:
+            text = "<think>Working out what the request needs.</think>\n" + text
+        return text
+
+    def _json_response(self, data: dict) -> str:
+        text = json.dumps(data, indent=2)
+        if self.roll(self.broken_json_rate):
+            # Cut the JSON off mid-way, as a model that hit its token limit would
+            return text[:len(text) // 2]
+        return text
+
+    def decode_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+def split_tokens(text: str) -> List[str]:
+    """Split text into word-sized pieces that stand in for model tokens."""
+    return re.findall(r'\S+\s*|\s+', text)
+
+def estimate_prompt_tokens(prompt: str) -> int:
+    return max(len(prompt) // 4, 1)
+
+class _OllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "MockOllamaServer"
+
+    def log_message(self, format, *args):
+        logger.debug("Mock Ollama: " + format % args)
+
+    def do_GET(self):
+        if self.path.rstrip("/") != "/api/tags":
+            self._send_json(404, {"error": "not found"})
+            return
+        models = [{"name": name, "model": name, "size": 0} for name in self.server.models]
+        self._send_json(200, {"models": models})
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/api/generate":
+            self._send_json(404, {"error": "not found"})
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        behavior = self.server.behavior
+        self.server.record_request()
+
+        if body.get("model") not in self.server.models:
+            self._send_json(404, {"error": f"model '{body.get('model')}' not found, try pulling it first"})
+            return
+        if behavior.roll(behavior.timeout_rate):
+            time.sleep(behavior.hang_seconds)
+            return
+        if behavior.roll(behavior.error_rate):
+            self._send_json(500, {"error": "mock server error"})
+            return
+
+        prompt = body.get("prompt", "")
+        tokens = split_tokens(behavior.response_for(prompt))
+        num_predict = (body.get("options") or {}).get("num_predict")
+        if num_predict:
+            tokens = tokens[:num_predict]
+
+        start = time.monotonic()
+        time.sleep(behavior.ttft_seconds)
+        if body.get("stream", True):
+            self._stream(body, prompt, tokens, start)
+        else:
+            time.sleep(behavior.decode_delay() * max(len(tokens) - 1, 0))
+            self._send_json(200, self._final_chunk(body, prompt, tokens, start, "".join(tokens)))
+
+    def _stream(self, body: dict, prompt: str, tokens: List[str], start: float) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        delay = self.server.behavior.decode_delay()
+        try:
+            for index, token in enumerate(tokens):
+                if index:
+                    time.sleep(delay)
+                self._write_chunk({"model": body.get("model"), "response": token, "done": False})
+            self._write_chunk(self._final_chunk(body, prompt, tokens, start, ""))
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client closed the stream, e.g. because the request was cancelled
+            self.server.record_abort()
+
+    def _final_chunk(self, body: dict, prompt: str, tokens: List[str], start: float, response: str) -> dict:
+        total_ns = int((time.monotonic() - start) * 1e9)
+        eval_ns = int(self.server.behavior.decode_delay() * len(tokens) * 1e9)
+        return {
+            "model": body.get("model"),
+            "response": response,
+            "done": True,
+            "done_reason": "stop",
+            "prompt_eval_count": estimate_prompt_tokens(prompt),
+            "prompt_eval_duration": int(self.server.behavior.ttft_seconds * 1e9),
+            "eval_count": len(tokens),
+            "eval_duration": eval_ns,
+            "total_duration": total_ns
+        }
+
+    def _write_chunk(self, data: dict) -> None:
+        line = (json.dumps(data) + "\n").encode("utf-8")
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+        self.wfile.flush()
+
+    def _send_json(self, status: int, data: dict) -> None:
+        payload = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+class MockOllamaServer(ThreadingHTTPServer):
+    """Ollama-compatible HTTP server backed by canned responses."""
+
+    daemon_threads = True
+
+    def __init__(self, behavior: Optional[MockBehavior] = None, host: str = "127.0.0.1", port: int = 0,
+                 models: Optional[List[str]] = None):
+        super().__init__((host, port), _OllamaHandler)
+        self.behavior = behavior or MockBehavior()
+        self.models = list(models or MOCK_MODELS)
+        self.requests_served = 0
+        self.requests_aborted = 0
+        self._count_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def handle_error(self, request, client_address):
+        # Clients dropping keep-alive connections is expected under load tests
+        pass
+
+    def record_request(self) -> None:
+        with self._count_lock:
+            self.requests_served += 1
+
+    def record_abort(self) -> None:
+        with self._count_lock:
+            self.requests_aborted += 1
+
+    def start(self) -> "MockOllamaServer":
+        """Serve from a daemon thread and return self."""
+        threading.Thread(target=self.serve_forever, name="mock-ollama", daemon=True).start()
+        return self
+
+class FakeUsageMetadata:
+    def __init__(self, prompt_token_count: int, candidates_token_count: int):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+        self.total_token_count = prompt_token_count + candidates_token_count
+
+class FakeGeminiChunk:
+    def __init__(self, text: str):
+        self.text = text
+
+class FakeGeminiResponse:
+    """Mimics google.generativeai's GenerateContentResponse for plain and streamed calls."""
+
+    def __init__(self, chunks: Iterator[FakeGeminiChunk], usage_metadata: FakeUsageMetadata, stream: bool):
+        self._iterator = chunks
+        self.usage_metadata = usage_metadata
+        self._text: Optional[str] = None
+        if not stream:
+            self._text = "".join(chunk.text for chunk in chunks)
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = "".join(chunk.text for chunk in self._iterator)
+        return self._text
+
+    def __iter__(self):
+        return iter(self._iterator)
+
+class FakeGenerativeModel:
+    """Offline replacement for genai.GenerativeModel with the same generate_content signature."""
+
+    def __init__(self, model_name: str = "gemini-2.0-flash", behavior: Optional[MockBehavior] = None):
+        self.model_name = model_name
+        self.behavior = behavior or MockBehavior()
+
+    def generate_content(self, prompt: str, generation_config=None, stream: bool = False, request_options=None):
+        behavior = self.behavior
+        timeout = (request_options or {}).get("timeout")
+        if behavior.roll(behavior.timeout_rate):
+            time.sleep(min(behavior.hang_seconds, timeout) if timeout else behavior.hang_seconds)
+            raise TimeoutError("504 Deadline Exceeded")
+        if behavior.roll(behavior.error_rate):
+            raise RuntimeError("500 An internal error has occurred")
+
+        tokens = split_tokens(behavior.response_for(prompt))
+        max_tokens = getattr(generation_config, "max_output_tokens", None)
+        if max_tokens:
+            tokens = tokens[:max_tokens]
+        usage = FakeUsageMetadata(estimate_prompt_tokens(prompt), len(tokens))
+        time.sleep(behavior.ttft_seconds)
+        return FakeGeminiResponse(self._chunks(tokens), usage, stream)
+
+    def _chunks(self, tokens: List[str], tokens_per_chunk: int = 8) -> Iterator[FakeGeminiChunk]:
+        delay = self.behavior.decode_delay()
+        for start in range(0, len(tokens), tokens_per_chunk):
+            piece = tokens[start:start + tokens_per_chunk]
+            if start:
+                time.sleep(delay * len(piece))
+            yield FakeGeminiChunk("".join(piece))
+
+def create_fake_gemini_client(behavior: Optional[MockBehavior] = None, model_name: str = "gemini-2.0-flash"):
+    """A real GeminiClient whose model is the offline fake, so the client's own code paths still run."""
+    from src.clients import GeminiClient
+    client = GeminiClient(api_key="offline-fake-key", model_name=model_name)
+    client.model = FakeGenerativeModel(model_name, behavior)
+    return client
+
+def main():
+    parser = argparse.ArgumentParser(description="Run an Ollama-compatible mock server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--ttft", type=float, default=0.2, help="Seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--broken-json-rate", type=float, default=0.0)
+    parser.add_argument("--thinking", action="store_true", help="Prefix responses with a <think> block")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    behavior = MockBehavior(
+        ttft_seconds=args.ttft,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        broken_json_rate=args.broken_json_rate,
+        thinking=args.thinking,
+        seed=args.seed
+    )
+    server = MockOllamaServer(behavior, args.host, args.port)
+    print(f"Mock Ollama listening on {server.base_url} (models: {', '.join(server.models)})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,163 @@
 import streamlit as st
 import os
-import asyncio
-from src.core import process_cover_letter_request
+import time
+from src.core import get_job_manager, get_admission_controller, MODE_LLM, MODE_TEMPLATE
+from src.config import JOB_CONFIG, METRICS_CONFIG, setup_logging
+from src.services import CoverLetterGenerator
+from src.utils import start_metrics_server, truncate_text
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
+def render_result(result, provider, model_name, ai_client=None):
+    """Render the outcome of a finished cover letter job."""
+    cover_letter = result.content
+    
+    if result.admission == "rejected":
+        st.warning(f"⏳ {result.message}")
+        st.info("💡 Switch to Instant template mode for a letter right away, without waiting for the model.")
+    elif cover_letter:
+        st.success("🎉 Cover letter generated successfully!")
+        if result.message:
+            st.info(f"⚡ {result.message}")
+
+        # Enhanced display tabs
+        tab1, tab2, tab3 = st.tabs(["📖 Preview", "📝 Edit & Copy", "📊 Analysis"])
+
+        with tab1:
+            st.markdown("### 📄 Your Generated Cover Letter")
+            st.markdown("---")
+            
+            # Display with better formatting
+            formatted_letter = cover_letter.replace('\n\n', '\n\n> ')
+            st.markdown(formatted_letter)
+            
+            # Quick actions
+            col_a, col_b = st.columns(2)
+            with col_a:
+                if st.button("👍 Looks Good!", type="primary"):
+                    st.balloons()
+            with col_b:
+                if st.button("🔄 Regenerate"):
+                    st.session_state.regenerate_requested = True
+                    st.rerun()
+
+            render_paragraph_rewrite(result, ai_client)
+        
+        with tab2:
+            st.markdown("### ✏️ Edit Your Cover Letter")
+            edited_letter = st.text_area(
+                "Make any adjustments:", 
+                value=cover_letter,
+                height=400,
+                help="You can edit the generated content before downloading"
+            )
+            
+            col_download, col_copy = st.columns(2)
+            
+            with col_download:
+                st.download_button(
+                    label="📥 Download as TXT",
+                    data=edited_letter,
+                    file_name="cover_letter.txt",
+                    mime="text/plain",
+                    use_container_width=True
+                )
+            
+            with col_copy:
+                st.download_button(
+                    label="📄 Download as Markdown",
+                    data=edited_letter,
+                    file_name="cover_letter.md",
+                    mime="text/markdown",
+                    use_container_width=True
+                )
+        
+        with tab3:
+            st.markdown("### 📊 Generation Analysis")
+            
+            col_stats1, col_stats2, col_stats3 = st.columns(3)
+            
+            with col_stats1:
+                word_count = len(cover_letter.split())
+                st.metric("Word Count", word_count)
+            
+            with col_stats2:
+                paragraph_count = len([p for p in cover_letter.split('\n\n') if p.strip()])
+                st.metric("Paragraphs", paragraph_count)
+            
+            with col_stats3:
+                st.metric("Provider", f"{provider}")
+                st.caption(f"Model: {model_name}")
+            
+            if result.stages:
+                st.markdown("#### ⏱️ Pipeline Stages")
+                render_stage_events(result.stages)
+            
+            # Show tips
+            st.info("💡 **Tips for improvement:**\n"
+                   "• Customize the greeting with hiring manager's name if available\n"
+                   "• Add specific examples from your experience\n"
+                   "• Tailor the closing to match company culture")
+            
+    else: 
+        st.error("❌ Failed to generate cover letter. Please check your inputs and try again.")
+
+
+def render_paragraph_rewrite(result, ai_client):
+    """Rewrite one paragraph of the letter, reusing the last run's extractions."""
+    if ai_client is None or result.mode != MODE_LLM or result.resume_info is None or result.job_info is None:
+        return
+    paragraphs = CoverLetterGenerator.body_paragraphs(result.content)
+    if not paragraphs:
+        return
+    with st.expander("✏️ Rewrite One Paragraph"):
+        paragraph_index = st.selectbox(
+            "Paragraph to rewrite:",
+            range(len(paragraphs)),
+            format_func=lambda index: f"{index + 1}. {truncate_text(paragraphs[index], 70, '...')}"
+        )
+        instructions = st.text_input(
+            "What should change? (optional)",
+            placeholder="e.g. mention my AWS certification, make it shorter"
+        )
+        if st.button("🔁 Rewrite Paragraph", help="Rewrites only this paragraph; much faster than regenerating the letter"):
+            try:
+                # Runs as a background job like generation, so a rerun does not lose it
+                st.session_state.active_job_id = get_job_manager().submit_paragraph_rewrite(
+                    result, paragraph_index, ai_client, instructions=instructions or None,
+                    abandon_after=JOB_CONFIG['abandon_after_seconds']
+                )
+                st.session_state.active_job_is_rewrite = True
+            except Exception as e:
+                st.error(f"🚨 Could not rewrite the paragraph: {str(e)}")
+            else:
+                st.rerun()
+
+
+def render_stage_events(events):
+    """Show per-stage timing and token counts."""
+    if not events:
+        return
+    st.dataframe(
+        [
+            {
+                "Stage": event.stage,
+                "Status": event.event,
+                "Time (s)": round(event.duration_ms / 1000, 2) if event.duration_ms is not None else None,
+                "Prompt tokens": event.prompt_tokens,
+                "Completion tokens": event.completion_tokens,
+                "Tokens saved": event.tokens_saved,
+                "Fallback": "yes" if event.fallback_used else ""
+            }
+            for event in events
+        ],
+        use_container_width=True,
+        hide_index=True
+    )
+
+
 def main():
     st.set_page_config(
         page_title="AI Cover Letter Generator",
@@ -53,14 +204,31 @@ def main():
                 help="Get your API key from Google AI Studio"
             )
         
+        generation_mode = st.radio(
+            "Generation Mode",
+            [MODE_LLM, MODE_TEMPLATE],
+            format_func=lambda mode: "🤖 AI (LLM)" if mode == MODE_LLM else "⚡ Instant template",
+            help="Instant template mode writes a draft from your resume in milliseconds without calling a model"
+        )
+        
         st.header("📊 Generation Stats")
         if 'generation_count' not in st.session_state:
             st.session_state.generation_count = 0
         st.metric("Cover Letters Generated", st.session_state.generation_count)
 
+        admission_stats = get_admission_controller().get_stats()
+        st.caption(
+            f"In flight: {admission_stats['in_flight']} • Queued: {admission_stats['queue_depth']} • "
+            f"Degraded: {admission_stats['degraded']} • Rejected: {admission_stats['rejected']}"
+        )
+
     st.title("🚀 AI Cover Letter Generator")
     st.caption("Upload your resume and paste the job description to generate a personalized cover letter powered by AI")
 
+    setup_logging()
+    if METRICS_CONFIG['enabled']:
+        start_metrics_server()
+
     # Initialize AI client based on provider
     @st.cache_resource
     def load_ai_client(provider_type, model, api_key=None, model_base_url=None):
@@ -135,6 +303,7 @@ def main():
             st.caption(f"📊 Words: {word_count}")
 
     # Generation controls
+    job_manager = get_job_manager()
     col3, col4, col5 = st.columns([2, 1, 1])
     
     with col3:
@@ -147,132 +316,75 @@ def main():
     
     with col4:
         if st.button("🔄 Clear All", use_container_width=True):
+            if st.session_state.get('active_job_id'):
+                job_manager.cancel(st.session_state.active_job_id)
+            st.session_state.active_job_id = None
+            st.session_state.last_result = None
             st.rerun()
     
     with col5:
         preview_mode = st.toggle("👁️ Preview Mode", help="Show generation steps")
 
-    if generate_btn:
+    if generate_btn or st.session_state.get('regenerate_requested'):
+        st.session_state.regenerate_requested = False
         if uploaded_file and job_description.strip():
             try:
-                # Create progress tracking
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-                
-                async def process_with_enhanced_status():
-                    status_text.info("🔍 Analyzing your resume...")
-                    progress_bar.progress(25)
-                    
-                    if preview_mode:
-                        st.info("📖 Extracting resume information...")
-                    
-                    status_text.info("🎯 Processing job requirements...")
-                    progress_bar.progress(50)
-                    
-                    if preview_mode:
-                        st.info("🏢 Analyzing job description...")
-                    
-                    status_text.info("✍️ Crafting your cover letter...")
-                    progress_bar.progress(75)
-                    
-                    cover_letter = await process_cover_letter_request(
-                        uploaded_file, job_description.strip(), ai_client
-                    )
-                    
-                    progress_bar.progress(100)
-                    return cover_letter
-                
-                # Run the async process
-                cover_letter = asyncio.run(process_with_enhanced_status())
-                
-                if cover_letter:
-                    status_text.empty()
-                    progress_bar.empty()
-                    
-                    st.session_state.generation_count += 1
-                    st.success("🎉 Cover letter generated successfully!")
-
-                    # Enhanced display tabs
-                    tab1, tab2, tab3 = st.tabs(["📖 Preview", "📝 Edit & Copy", "📊 Analysis"])
-
-                    with tab1:
-                        st.markdown("### 📄 Your Generated Cover Letter")
-                        st.markdown("---")
-                        
-                        # Display with better formatting
-                        formatted_letter = cover_letter.replace('\n\n', '\n\n> ')
-                        st.markdown(formatted_letter)
-                        
-                        # Quick actions
-                        col_a, col_b = st.columns(2)
-                        with col_a:
-                            if st.button("👍 Looks Good!", type="primary"):
-                                st.balloons()
-                        with col_b:
-                            if st.button("🔄 Regenerate"):
-                                st.rerun()
-                    
-                    with tab2:
-                        st.markdown("### ✏️ Edit Your Cover Letter")
-                        edited_letter = st.text_area(
-                            "Make any adjustments:", 
-                            value=cover_letter,
-                            height=400,
-                            help="You can edit the generated content before downloading"
-                        )
-                        
-                        col_download, col_copy = st.columns(2)
-                        
-                        with col_download:
-                            st.download_button(
-                                label="📥 Download as TXT",
-                                data=edited_letter,
-                                file_name="cover_letter.txt",
-                                mime="text/plain",
-                                use_container_width=True
-                            )
-                        
-                        with col_copy:
-                            st.download_button(
-                                label="📄 Download as Markdown",
-                                data=edited_letter,
-                                file_name="cover_letter.md",
-                                mime="text/markdown",
-                                use_container_width=True
-                            )
-                    
-                    with tab3:
-                        st.markdown("### 📊 Generation Analysis")
-                        
-                        col_stats1, col_stats2, col_stats3 = st.columns(3)
-                        
-                        with col_stats1:
-                            word_count = len(cover_letter.split())
-                            st.metric("Word Count", word_count)
-                        
-                        with col_stats2:
-                            paragraph_count = len([p for p in cover_letter.split('\n\n') if p.strip()])
-                            st.metric("Paragraphs", paragraph_count)
-                        
-                        with col_stats3:
-                            st.metric("Provider", f"{provider}")
-                            st.caption(f"Model: {model_name}")
-                        
-                        # Show tips
-                        st.info("💡 **Tips for improvement:**\n"
-                               "• Customize the greeting with hiring manager's name if available\n"
-                               "• Add specific examples from your experience\n"
-                               "• Tailor the closing to match company culture")
-                        
-                else: 
-                    st.error("❌ Failed to generate cover letter. Please check your inputs and try again.")
-                    
+                # Replace any job still running for this session
+                if st.session_state.get('active_job_id'):
+                    job_manager.cancel(st.session_state.active_job_id)
+                st.session_state.active_job_id = job_manager.submit(
+                    uploaded_file, job_description.strip(), ai_client, mode=generation_mode,
+                    abandon_after=JOB_CONFIG['abandon_after_seconds']
+                )
+                st.session_state.active_job_is_rewrite = False
+                st.session_state.last_result = None
             except Exception as e:
                 st.error(f"🚨 An error occurred: {str(e)}")
                 st.info("Try refreshing the page or check your AI provider configuration.")
         else:
             st.warning("⚠️ Please upload your resume and paste the job description.")
 
+    # Poll the background job; it keeps running across script reruns
+    active_job_id = st.session_state.get('active_job_id')
+    if active_job_id:
+        job_status = job_manager.get_status(active_job_id)
+        if job_status is None:
+            st.session_state.active_job_id = None
+            st.warning("⚠️ The previous generation is no longer available. Please generate again.")
+        elif job_status.state in ("completed", "failed", "cancelled"):
+            result = job_manager.get_result(active_job_id)
+            st.session_state.active_job_id = None
+            if job_status.state == "failed":
+                st.error(f"🚨 An error occurred: {job_status.error_message}")
+                st.info("Try refreshing the page or check your AI provider configuration.")
+            elif result is not None:
+                st.session_state.last_result = result
+                if result.admission != "rejected" and result.content and not st.session_state.get('active_job_is_rewrite'):
+                    st.session_state.generation_count += 1
+        else:
+            if job_status.state == "queued":
+                st.progress(0)
+                st.info("⏳ Waiting for a free worker...")
+            else:
+                st.progress(int(job_status.progress))
+                finished = {event.stage for event in job_status.events if event.event != "started"}
+                running = [event for event in job_status.events
+                           if event.event == "started" and event.stage not in finished]
+                st.info(f"✍️ {running[-1].message}..." if running else "✍️ Crafting your cover letter...")
+                if preview_mode:
+                    render_stage_events([event for event in job_status.events if event.event != "started"])
+            
+            if job_status.draft:
+                with st.expander("⚡ Instant draft (while the AI letter is being written)", expanded=True):
+                    st.markdown(job_status.draft)
+            
+            time.sleep(1)
+            st.rerun()
+
+    result = st.session_state.get('last_result')
+    if result is not None:
+        render_result(result, provider, model_name, ai_client)
+
     # Enhanced help section
     with st.expander("❓ How to Use This Tool", expanded=False):
         st.markdown("""
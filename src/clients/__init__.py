@@ -1,5 +1,18 @@
 from .base_client import BaseClient
-from .gemini_client import GeminiClient
-from .ollama_client import OllamaClient
 
-__all__ = ["BaseClient", "GeminiClient", "OllamaClient"]
\ No newline at end of file
+# Provider clients are imported on first access, so that using one provider does
+# not pay for importing the other's SDK (google.generativeai alone takes ~0.5s)
+_LAZY_CLIENTS = {
+    "GeminiClient": ".gemini_client",
+    "OllamaClient": ".ollama_client"
+}
+
+def __getattr__(name):
+    if name in _LAZY_CLIENTS:
+        import importlib
+        client = getattr(importlib.import_module(_LAZY_CLIENTS[name], __name__), name)
+        globals()[name] = client
+        return client
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+__all__ = ["BaseClient", "GeminiClient", "OllamaClient"]
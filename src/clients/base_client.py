@@ -1,10 +1,31 @@
+import time
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Optional
+from ..utils.cancellation import CancellationToken
+from ..utils.metrics import LLM_REQUEST_LATENCY, TIMEOUTS
+from ..utils.tracing import get_tracer, KIND_CLIENT
+from ..utils.profiling import executor_call
+from ..utils.single_flight import SingleFlight, flight_key
+
+# Shared by every client instance, so identical prompts from different sessions coalesce
+_generate_flight = SingleFlight("llm_call")
+
+# Clients report failures as messages rather than exceptions; these start every such message
+ERROR_RESPONSE_PREFIXES = ("Model", "API Error", "Request", "Cannot", "Connection",
+                           "Gemini API Error", "An unexpected error")
+
+def is_error_response(response: str) -> bool:
+    """Whether a generate_response result is a client error message rather than model output."""
+    return bool(response) and response.startswith(ERROR_RESPONSE_PREFIXES)
 
 class BaseClient(ABC):
+    # Label used for this provider in metrics and traces
+    provider = "unknown"
+
     def __init__(self, model_name: str = None):
         self.model_name = model_name
-        
+
     @abstractmethod
     def check_model_availability(self) -> bool:
         """
@@ -12,25 +33,86 @@ class BaseClient(ABC):
         Returns True if the model is available, False otherwise.
         """
         pass
-    
+
     @abstractmethod
-    def generate_response(seld, prompt: str, max_length: int = 1024) -> str:
+    def generate_response(self, prompt: str, max_length: int = 1024,
+                          cancel_token: Optional[CancellationToken] = None,
+                          timeout: Optional[float] = None,
+                          usage: Optional[dict] = None,
+                          context_tokens: Optional[int] = None) -> str:
         """
         Generate a response based on the provided prompt.
-        
+
         :param prompt: The input prompt to generate a response for.
         :param max_length: The maximum length of the generated response.
+        :param cancel_token: Optional token; cancelling it aborts the underlying request.
+        :param timeout: Seconds the whole call may take; defaults to GENERATION_CONFIG['timeout'].
+        :param usage: Optional dict filled with prompt_tokens, completion_tokens and eval_duration_ms
+            when the provider reports them.
+        :param context_tokens: Context window to run the model with (Ollama num_ctx); providers
+            with a fixed window ignore it.
         :return: The generated response as a string.
+        :raises OperationCancelledError: If the token is cancelled before the response completes.
         """
         pass
-    
+
+    async def agenerate_response(self, prompt: str, max_length: int = 1024,
+                                 cancel_token: Optional[CancellationToken] = None,
+                                 timeout: Optional[float] = None,
+                                 usage: Optional[dict] = None,
+                                 context_tokens: Optional[int] = None) -> str:
+        """
+        Run generate_response on a worker thread so concurrent calls overlap.
+
+        Cancelling the awaiting task cancels the token, which closes the HTTP request.
+        A timeout that has already run out (a spent deadline) raises TimeoutError
+        without starting the call, so callers fall back to their deterministic path.
+        An identical call (same provider, model, endpoint, prompt and limits)
+        already in flight is waited for, within timeout, instead of sent again;
+        an error message is not shared, so waiting calls then make their own.
+        """
+        usage = {} if usage is None else usage
+        if timeout is not None and timeout <= 0:
+            TIMEOUTS.inc(stage="llm_request")
+            raise TimeoutError("No time left for the model call")
+        key = flight_key(self.provider, self.model_name, getattr(self, "base_url", None),
+                         prompt, max_length, context_tokens)
+        return await _generate_flight.do(
+            key, lambda: self._agenerate_response(prompt, max_length, cancel_token, timeout, usage, context_tokens),
+            usage=usage, cancel_token=cancel_token, timeout=timeout,
+            shareable=lambda response: not is_error_response(response)
+        )
+
+    async def _agenerate_response(self, prompt: str, max_length: int, cancel_token: Optional[CancellationToken],
+                                  timeout: Optional[float], usage: dict, context_tokens: Optional[int]) -> str:
+        token = cancel_token.child() if cancel_token else CancellationToken()
+        loop = asyncio.get_running_loop()
+        attributes = {"llm.provider": self.provider, "llm.model": self.model_name, "llm.prompt_chars": len(prompt),
+                      "llm.max_output_tokens": max_length, "llm.context_tokens": context_tokens}
+        with get_tracer().start_span(f"{self.provider}.generate", kind=KIND_CLIENT, attributes=attributes) as span:
+            call = executor_call(self.generate_response, prompt, max_length=max_length,
+                                 cancel_token=token, timeout=timeout, usage=usage,
+                                 context_tokens=context_tokens)
+            start_time = time.perf_counter()
+            try:
+                return await loop.run_in_executor(None, call)
+            except asyncio.CancelledError:
+                token.cancel("awaiting task was cancelled")
+                raise
+            finally:
+                token.close()
+                LLM_REQUEST_LATENCY.observe(time.perf_counter() - start_time,
+                                            provider=self.provider, model=self.model_name or "unknown")
+                span.set_attribute("llm.prompt_tokens", usage.get("prompt_tokens"))
+                span.set_attribute("llm.completion_tokens", usage.get("completion_tokens"))
+
     def get_model_name(self) -> Optional[str]:
         """
         Get the name of the model.
-        
+
         :return: The name of the model if set, otherwise None.
         """
         return self.model_name if self.model_name else None
-    
+
     def set_model_name(self, model_name: str) -> None:
         self.model_name = model_name
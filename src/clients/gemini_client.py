@@ -1,10 +1,14 @@
 import logging
-import google.generativeai as genai
+from typing import Optional
 from .base_client import BaseClient
+from ..config import GENERATION_CONFIG
+from ..utils.cancellation import CancellationToken, OperationCancelledError, raise_if_cancelled
 
 logger = logging.getLogger(__name__)
 
 class GeminiClient(BaseClient):
+    provider = "gemini"
+
     def __init__(self, api_key: str = None, model_name: str = None):
         super().__init__(model_name)
         self.api_key = api_key 
@@ -12,9 +16,12 @@ class GeminiClient(BaseClient):
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY not found. Please provide API key.")
         
+        # Imported here so that Ollama-only deployments never load the Google SDK
+        import google.generativeai as genai
+        self._genai = genai
         genai.configure(api_key=self.api_key)
         self.model = genai.GenerativeModel(model_name)
-        logger.info(f"Initializing GeminiClient with model: {model_name}")
+        logger.info("Initializing GeminiClient with model: %s", model_name)
     
     def check_model_availability(self) -> bool:
         """Check if the Gemini API is accessible."""
@@ -23,34 +30,81 @@ class GeminiClient(BaseClient):
             response = self.model.generate_content("Test")
             return True
         except Exception as e:
-            logger.error(f"Gemini model availability check failed: {e}")
+            logger.error("Gemini model availability check failed: %s", e)
             return False
     
-    def generate_response(self, prompt: str, max_length: int = 1024) -> str:
+    def generate_response(self, prompt: str, max_length: int = 1024,
+                          cancel_token: Optional[CancellationToken] = None,
+                          timeout: Optional[float] = None,
+                          usage: Optional[dict] = None,
+                          context_tokens: Optional[int] = None) -> str:
         """Generate response using Gemini API."""
         try:
-            logger.info(f"Sending request to Gemini with model: {self.model_name}")
-            logger.debug(f"Prompt length: {len(prompt)} characters")
+            raise_if_cancelled(cancel_token)
+            logger.info("Sending request to Gemini with model: %s", self.model_name)
+            logger.debug("Prompt length: %s characters", len(prompt))
             
-            generation_config = genai.types.GenerationConfig(
+            generation_config = self._genai.types.GenerationConfig(
                 temperature=0.7,
                 top_p=0.9,
                 top_k=40,
                 max_output_tokens=max_length,
             )
+            request_options = {"timeout": GENERATION_CONFIG['timeout'] if timeout is None else timeout}
+            if request_options["timeout"] <= 0:
+                raise TimeoutError("No time left for the request")
             
-            response = self.model.generate_content(
-                prompt,
-                generation_config=generation_config
-            )
+            if cancel_token is None:
+                response = self.model.generate_content(
+                    prompt,
+                    generation_config=generation_config,
+                    request_options=request_options
+                )
+                generated_text = response.text.strip()
+                usage_metadata = getattr(response, "usage_metadata", None)
+            else:
+                # Stream so that a cancelled request stops consuming chunks right away
+                response = self.model.generate_content(
+                    prompt,
+                    generation_config=generation_config,
+                    stream=True,
+                    request_options=request_options
+                )
+                generated_text = self._read_stream(response, cancel_token).strip()
+                usage_metadata = getattr(response, "usage_metadata", None)
+            
+            if usage is not None and usage_metadata is not None:
+                usage.update({
+                    "prompt_tokens": getattr(usage_metadata, "prompt_token_count", None),
+                    "completion_tokens": getattr(usage_metadata, "candidates_token_count", None)
+                })
             
-            generated_text = response.text.strip()
-            logger.info(f"Generated response length: {len(generated_text)} characters")
+            logger.info("Generated response length: %s characters", len(generated_text))
             return generated_text
             
         except Exception as e:
-            logger.error(f"Error generating response with Gemini: {e}")
+            if cancel_token is not None and cancel_token.is_cancelled:
+                logger.info("Gemini request cancelled: %s", cancel_token.reason)
+                raise OperationCancelledError(cancel_token.reason) from e
+            logger.error("Error generating response with Gemini: %s", e)
             return f"Gemini API Error: {str(e)}"
+
+    @staticmethod
+    def _read_stream(response, cancel_token: CancellationToken) -> str:
+        """Collect the text of a streamed response, stopping when cancelled."""
+        chunks = []
+        try:
+            for chunk in response:
+                raise_if_cancelled(cancel_token)
+                chunks.append(chunk.text)
+        finally:
+            # Closing the chunk iterator releases the underlying stream early
+            iterator = getattr(response, "_iterator", None)
+            close = getattr(iterator, "close", None) or getattr(iterator, "cancel", None)
+            if cancel_token.is_cancelled and close:
+                close()
+        raise_if_cancelled(cancel_token)
+        return "".join(chunks)
     
     def get_model_info(self) -> dict:
         """Get information about the current model."""
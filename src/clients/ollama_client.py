@@ -1,26 +1,37 @@
+import json
+import time
+import socket
 import logging
 import requests
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from .base_client import BaseClient
+from ..config import GENERATION_CONFIG, DEADLINE_CONFIG
+from ..utils.cancellation import CancellationToken, OperationCancelledError, raise_if_cancelled
+from ..utils.metrics import TIMEOUTS
 
 logger = logging.getLogger(__name__)
 
 class OllamaClient(BaseClient):
+    provider = "ollama"
+
     def __init__(self, model_name: str = None, base_url: str = None or "http://localhost:11434"):
             self.model_name = model_name
             self.base_url = base_url
             self.api_url = f"{self.base_url}/api/generate"
             self.tags_url = f"{self.base_url}/api/tags"
-            logger.info(f"Initializing OllamaClient with model: {model_name}")
+            logger.info("Initializing OllamaClient with model: %s", model_name)
             
-    def check_model_availability(self) -> bool:
+    def check_model_availability(self, timeout: Optional[float] = None) -> bool:
             """Check if the specified model is available."""
             try:
-                response = requests.get(self.tags_url, timeout=10)
+                check_timeout = DEADLINE_CONFIG['availability_check_timeout']
+                if timeout is not None:
+                    check_timeout = min(check_timeout, timeout)
+                response = requests.get(self.tags_url, timeout=check_timeout)
                 if response.status_code == 200:
                     models = response.json().get("models", [])
                     available_models = [model["name"] for model in models]
-                    logger.info(f"Available models: {available_models}")
+                    logger.info("Available models: %s", available_models)
                     
                     # Check for exact match or partial match
                     model_available = any(
@@ -29,27 +40,40 @@ class OllamaClient(BaseClient):
                     )
                     
                     if not model_available:
-                        logger.warning(f"Model '{self.model_name}' not found in available models")
+                        logger.warning("Model '%s' not found in available models", self.model_name)
                     
                     return model_available
                 return False
             except Exception as e:
-                logger.error(f"Error checking model availability: {e}")
+                logger.error("Error checking model availability: %s", e)
                 return False
             
-    def generate_response(self, prompt: str, max_length: int = 1024) -> str:
+    def generate_response(self, prompt: str, max_length: int = 1024,
+                          cancel_token: Optional[CancellationToken] = None,
+                          timeout: Optional[float] = None,
+                          usage: Optional[dict] = None,
+                          context_tokens: Optional[int] = None) -> str:
         #Generate response using OLLAMA API.
             try:
+                raise_if_cancelled(cancel_token)
+                # The timeout bounds the whole call, including the availability check
+                timeout = GENERATION_CONFIG['timeout'] if timeout is None else timeout
+                if timeout <= 0:
+                    # requests rejects a zero timeout with ValueError, which would read as an unavailable model
+                    raise requests.exceptions.Timeout("No time left for the request")
+                expires_at = time.monotonic() + timeout
+
                 # Check model availability first
-                if not self.check_model_availability():
+                if not self.check_model_availability(timeout=timeout):
                     error_msg = f"Model '{self.model_name}' not available. Please pull the model first with: ollama pull {self.model_name}"
                     logger.error(error_msg)
                     return error_msg
                 
+                # Stream the response so a cancelled request can be dropped between tokens
                 payload = {
                     "model": self.model_name,
                     "prompt": prompt,
-                    "stream": False,
+                    "stream": True,
                     "options": {
                         "temperature": 0.7,
                         "num_predict": max_length,
@@ -57,40 +81,110 @@ class OllamaClient(BaseClient):
                         "top_k": 40,
                     }
                 }
+                if context_tokens:
+                    payload["options"]["num_ctx"] = context_tokens
                 
-                logger.info(f"Sending request to Ollama with model: {self.model_name}")
-                logger.debug(f"Prompt length: {len(prompt)} characters")
+                logger.info("Sending request to Ollama with model: %s", self.model_name)
+                logger.debug("Prompt length: %s characters", len(prompt))
                 
+                raise_if_cancelled(cancel_token)
+                remaining = expires_at - time.monotonic()
+                if remaining <= 0:
+                    raise requests.exceptions.Timeout("No time left before sending the request")
                 response = requests.post(
                     self.api_url,
                     json=payload,
-                    timeout=180  # Increased timeout for larger models
+                    timeout=remaining,
+                    stream=True
                 )
+                # Closing the connection makes Ollama stop decoding for this request
+                unregister = cancel_token.register(lambda: self._abort_response(response)) if cancel_token else None
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    generated_text = result.get("response", "").strip()
-                    logger.info(f"Generated response length: {len(generated_text)} characters")
-                    return generated_text
-                else:
-                    error_msg = f"Ollama API error: {response.status_code} - {response.text}"
-                    logger.error(error_msg)
-                    return f"API Error: {response.status_code}. Please check if Ollama is running and the model exists."
+                try:
+                    if response.status_code == 200:
+                        generated_text = self._read_stream(response, cancel_token, expires_at, usage).strip()
+                        logger.info("Generated response length: %s characters", len(generated_text))
+                        return generated_text
+                    else:
+                        error_msg = f"Ollama API error: {response.status_code} - {response.text}"
+                        logger.error(error_msg)
+                        return f"API Error: {response.status_code}. Please check if Ollama is running and the model exists."
+                finally:
+                    if unregister:
+                        unregister()
+                    response.close()
                     
-            except requests.exceptions.Timeout:
-                error_msg = "Request timeout - model might be too large or system is slow"
-                logger.error(error_msg)
-                return "Request timed out. Please try again or use a smaller model."
-            except requests.exceptions.ConnectionError:
-                error_msg = "Cannot connect to Ollama - make sure it's running"
-                logger.error(error_msg)
-                return "Cannot connect to Ollama. Please ensure Ollama is running with 'ollama serve'."
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Error connecting to Ollama: {e}")
-                return "Connection error. Please check if Ollama is running properly."
             except Exception as e:
-                logger.error(f"Error generating response: {e}")
-                return "An unexpected error occurred while generating the response."
+                if cancel_token is not None and cancel_token.is_cancelled:
+                    logger.info("Ollama request cancelled: %s", cancel_token.reason)
+                    raise OperationCancelledError(cancel_token.reason) from e
+                return self._handle_request_error(e)
+
+    def _read_stream(self, response, cancel_token: Optional[CancellationToken] = None,
+                     expires_at: Optional[float] = None, usage: Optional[dict] = None) -> str:
+        """Collect the text of a streamed /api/generate response."""
+        # The read timeout only bounds the gap between chunks, so the overall
+        # deadline is checked as chunks arrive
+        chunks = []
+        for line in response.iter_lines():
+            raise_if_cancelled(cancel_token)
+            if expires_at is not None and time.monotonic() > expires_at:
+                raise requests.exceptions.Timeout("Generation exceeded its time budget")
+            if not line:
+                continue
+            chunk = json.loads(line)
+            if chunk.get("error"):
+                raise requests.exceptions.RequestException(chunk["error"])
+            chunks.append(chunk.get("response", ""))
+            if chunk.get("done"):
+                if usage is not None:
+                    usage.update(self._usage_from_chunk(chunk))
+                break
+        raise_if_cancelled(cancel_token)
+        return "".join(chunks)
+
+    @staticmethod
+    def _usage_from_chunk(chunk: Dict[str, Any]) -> Dict[str, Any]:
+        """Token counts and timings from the final chunk of a stream (durations are in nanoseconds)."""
+        usage = {
+            "prompt_tokens": chunk.get("prompt_eval_count"),
+            "completion_tokens": chunk.get("eval_count")
+        }
+        for key in ("eval_duration", "prompt_eval_duration", "total_duration"):
+            if chunk.get(key) is not None:
+                usage[f"{key}_ms"] = chunk[key] / 1e6
+        return usage
+
+    @staticmethod
+    def _abort_response(response) -> None:
+        """Abort an in-flight streamed response from another thread."""
+        # Shutting the socket down unblocks a reader waiting for the next token;
+        # close() alone does not interrupt a blocking recv on another thread
+        connection = getattr(response.raw, "_connection", None)
+        sock = getattr(connection, "sock", None)
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        response.close()
+
+    def _handle_request_error(self, error: Exception) -> str:
+        """Map a request failure to a user-facing error message."""
+        if isinstance(error, requests.exceptions.Timeout):
+            TIMEOUTS.inc(stage="llm_request")
+            error_msg = "Request timeout - model might be too large or system is slow"
+            logger.error(error_msg)
+            return "Request timed out. Please try again or use a smaller model."
+        if isinstance(error, requests.exceptions.ConnectionError):
+            error_msg = "Cannot connect to Ollama - make sure it's running"
+            logger.error(error_msg)
+            return "Cannot connect to Ollama. Please ensure Ollama is running with 'ollama serve'."
+        if isinstance(error, requests.exceptions.RequestException):
+            logger.error("Error connecting to Ollama: %s", error)
+            return "Connection error. Please check if Ollama is running properly."
+        logger.error("Error generating response: %s", error)
+        return "An unexpected error occurred while generating the response."
         
     def get_available_models(self) -> list:
         """Get a list of available models from the Ollama server."""
@@ -100,8 +194,8 @@ class OllamaClient(BaseClient):
                 models = response.json().get("models", [])
                 return [model["name"] for model in models]
             else:
-                logger.error(f"Failed to fetch models: {response.status_code} - {response.text}")
+                logger.error("Failed to fetch models: %s - %s", response.status_code, response.text)
                 return []
         except Exception as e:
-            logger.error(f"Error fetching available models: {e}")
+            logger.error("Error fetching available models: %s", e)
             return []
\ No newline at end of file
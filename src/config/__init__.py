@@ -1,16 +1,33 @@
 from .settings import (
-    setup_logging, 
     GEMINI_API_KEY, 
     OLLAMA_BASE_URL,
     DEFAULT_OLLAMA_MODEL, 
     DEFAULT_GEMINI_MODEL,
     GENERATION_CONFIG,
+    PROMPT_BUDGET_CONFIG,
+    RETRIEVAL_CONFIG,
+    CHUNKED_EXTRACTION_CONFIG,
+    BOILERPLATE_CONFIG,
+    NEAR_DUPLICATE_CONFIG,
+    MATCH_SCORING_CONFIG,
+    EXTRACTION_BATCH_CONFIG,
+    SINGLE_FLIGHT_CONFIG,
+    DEADLINE_CONFIG,
+    ADMISSION_CONFIG,
+    JOB_CONFIG,
+    METRICS_CONFIG,
+    TRACING_CONFIG,
+    PROFILING_CONFIG,
     PDF_CONFIG,
+    PDF_WORKER_CONFIG,
     SKILL_KEYWORDS,
     EXPERIENCE_KEYWORDS,
     EDUCATION_KEYWORDS,
-    REQUIREMENT_KEYWORDS
+    RESUME_SECTION_HEADINGS,
+    REQUIREMENT_KEYWORDS,
+    LOGGING_CONFIG
 )
+from .logging_config import setup_logging, shutdown_logging, JsonFormatter
 
 __all__ = [
     'setup_logging', 
@@ -19,9 +36,28 @@ __all__ = [
     'DEFAULT_OLLAMA_MODEL', 
     'DEFAULT_GEMINI_MODEL',
     'GENERATION_CONFIG',
+    'PROMPT_BUDGET_CONFIG',
+    'RETRIEVAL_CONFIG',
+    'CHUNKED_EXTRACTION_CONFIG',
+    'BOILERPLATE_CONFIG',
+    'NEAR_DUPLICATE_CONFIG',
+    'MATCH_SCORING_CONFIG',
+    'EXTRACTION_BATCH_CONFIG',
+    'SINGLE_FLIGHT_CONFIG',
+    'DEADLINE_CONFIG',
+    'ADMISSION_CONFIG',
+    'JOB_CONFIG',
+    'METRICS_CONFIG',
+    'TRACING_CONFIG',
+    'PROFILING_CONFIG',
     'PDF_CONFIG',
+    'PDF_WORKER_CONFIG',
     'SKILL_KEYWORDS',
     'EXPERIENCE_KEYWORDS', 
     'EDUCATION_KEYWORDS',
-    'REQUIREMENT_KEYWORDS'
+    'RESUME_SECTION_HEADINGS',
+    'REQUIREMENT_KEYWORDS',
+    'LOGGING_CONFIG',
+    'shutdown_logging',
+    'JsonFormatter'
 ]
\ No newline at end of file
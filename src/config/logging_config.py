@@ -0,0 +1,107 @@
+import copy
+import json
+import queue
+import atexit
+import logging
+import threading
+import logging.handlers
+from datetime import datetime, timezone
+from typing import Optional, Union
+from .settings import LOGGING_CONFIG
+
+# Attributes every LogRecord has; anything else was passed through extra=
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with any extra= fields as top-level keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Queues records with their message already merged, but leaves the formatting to the writer.
+
+    The stock QueueHandler formats records on the calling thread; here only the
+    %-arguments are merged (they may not be picklable or may change later) and
+    any traceback is rendered, so the rest of the work happens off the request path.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[_QueueHandler] = None
+_setup_lock = threading.Lock()
+
+def setup_logging(level: Union[int, str, None] = None, json_format: Optional[bool] = None,
+                  path: Optional[str] = None) -> logging.Logger:
+    """Route all logging through a queue to a background writer thread.
+
+    Handlers write to stderr and to a size-rotated file (LOGGING_CONFIG['path'];
+    empty disables the file). Safe to call on every Streamlit rerun: the pipeline
+    is set up once per process, and later calls only change the level.
+    """
+    global _listener, _queue_handler
+    level = level or LOGGING_CONFIG['level']
+    root = logging.getLogger()
+    with _setup_lock:
+        root.setLevel(level)
+        if _listener is not None:
+            return logging.getLogger(__name__)
+
+        if json_format is None:
+            json_format = LOGGING_CONFIG['format'] == 'json'
+        formatter = JsonFormatter() if json_format else logging.Formatter(LOGGING_CONFIG['text_format'])
+        handlers = [logging.StreamHandler()]
+        path = LOGGING_CONFIG['path'] if path is None else path
+        if path:
+            handlers.append(logging.handlers.RotatingFileHandler(
+                path, maxBytes=LOGGING_CONFIG['max_bytes'], backupCount=LOGGING_CONFIG['backup_count'],
+                encoding="utf-8", delay=True
+            ))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        _queue_handler = _QueueHandler(log_queue)
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        root.addHandler(_queue_handler)
+        # Drain the queue on exit so the last records are not lost
+        atexit.register(shutdown_logging)
+    return logging.getLogger(__name__)
+
+def shutdown_logging() -> None:
+    """Flush queued records, stop the writer thread and remove the queue handler."""
+    global _listener, _queue_handler
+    with _setup_lock:
+        if _listener is None:
+            return
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+        _queue_handler = None
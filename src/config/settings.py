@@ -1,20 +1,19 @@
 import os
-import logging
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def setup_logging(level=logging.INFO):
-    """Setup logging configuration."""
-    logging.basicConfig(
-        level=level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.StreamHandler(),
-            logging.FileHandler('cv_generator.log', mode='a')
-        ]
-    )
-    return logging.getLogger(__name__)
+# Logging (LOG_LEVEL, LOG_FORMAT, LOG_FILE)
+# Records are handed to a background thread through a queue, so request threads
+# never wait on file I/O; the file rotates at max_bytes
+LOGGING_CONFIG = {
+    'level': os.getenv('LOG_LEVEL', 'INFO').upper(),
+    'format': os.getenv('LOG_FORMAT', 'text').lower(),  # text or json
+    'text_format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    'path': os.getenv('LOG_FILE', 'cv_generator.log'),
+    'max_bytes': 10 * 1024 * 1024,
+    'backup_count': 5
+}
 
 # API Configuration
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
@@ -33,13 +32,252 @@ GENERATION_CONFIG = {
     'timeout': 180
 }
 
+# Prompt Budgets
+# Token counts are estimated from characters with a per-model-family ratio.
+# Each stage's input is cut to fit max_input_tokens and the model's context;
+# num_predict / max_output_tokens comes from output_tokens (plus
+# reasoning_tokens for models that think before answering), and Ollama's
+# num_ctx is the smallest context bucket that holds prompt and output.
+# Ollama reloads a model whenever num_ctx changes, hence a few fixed buckets.
+PROMPT_BUDGET_CONFIG = {
+    'chars_per_token': {
+        'llama': 3.8, 'deepseek': 3.6, 'qwen': 3.4, 'mistral': 3.6,
+        'gemma': 4.0, 'phi': 3.6, 'gemini': 4.0
+    },
+    'default_chars_per_token': 3.5,
+    'context_windows': {
+        'llama3.2': 131072, 'llama3.1': 131072, 'llama3': 8192, 'llama2': 4096,
+        'deepseek-r1': 131072, 'qwen2.5': 32768, 'mistral': 32768,
+        'gemma2': 8192, 'phi3': 4096, 'gemini': 32768
+    },
+    'default_context_window': 4096,
+    'context_buckets': [2048, 4096, 8192, 16384],
+    'max_context_tokens': int(os.getenv('PROMPT_MAX_CONTEXT_TOKENS', '8192')),
+    'safety_margin': 0.1,
+    'max_input_tokens': {
+        'resume_extraction': 1024,
+        'job_extraction': 1024,
+        'generation': 1024,
+        'paragraph': 768
+    },
+    'output_tokens': {
+        'resume_extraction': 384,
+        'job_extraction': 320,
+        'generation': 640,   # A 250-350 word letter with greeting and sign-off
+        'paragraph': 192     # One 50-100 word paragraph of the letter
+    },
+    'reasoning_models': ['deepseek-r1', 'qwq'],
+    'reasoning_tokens': 1024
+}
+
+# Evidence Retrieval
+# When a resume does not fit the extraction budget, its lines are ranked
+# against the job posting with BM25 and the best ones are kept instead of the
+# first N characters. The cover letter prompt gets the resume items and job
+# requirements that best match each other, within per-section token budgets.
+RETRIEVAL_CONFIG = {
+    'bm25_k1': 1.5,
+    'bm25_b': 0.75,
+    'header_lines': 3,          # Name and contact lines, always kept ahead of ranked evidence
+    'min_unit_tokens': 4,       # Shorter lines are merged into the next one
+    'generation_evidence_tokens': {
+        'requirements': 128,
+        'skills': 64,
+        'experience': 192
+    }
+}
+
+# Long Resumes
+# A resume over the extraction budget is split at its section headings into
+# chunks that each fit the budget; the chunks are extracted concurrently, at
+# most max_concurrency at a time (the backend's parallel slots), and merged.
+# Beyond max_chunks, the chunks least relevant to the job are dropped.
+CHUNKED_EXTRACTION_CONFIG = {
+    'enabled': os.getenv('RESUME_CHUNKING', 'true').lower() in ('1', 'true', 'yes'),
+    'max_chunks': 6,
+    'max_concurrency': int(os.getenv('OLLAMA_NUM_PARALLEL', '1'))
+}
+
+# Job Posting Boilerplate
+# Paragraphs whose word shingles mostly match known boilerplate are removed
+# from postings before extraction, and repeated lines are collapsed. The index
+# starts from the phrases below and learns paragraphs (e.g. company blurbs)
+# that recur verbatim across learn_min_postings different postings.
+BOILERPLATE_CONFIG = {
+    'enabled': os.getenv('STRIP_BOILERPLATE', 'true').lower() in ('1', 'true', 'yes'),
+    'shingle_size': 3,
+    'match_threshold': 0.5,       # Share of a paragraph's shingles found in the index
+    'min_paragraph_words': 4,
+    'learn_min_postings': 3,
+    'learn_min_words': 25,        # Shorter paragraphs (e.g. requirement bullets) are never learned
+    # Postings whose other paragraphs overlap more than this are reposts of one role and count once,
+    # so a role description repeated across reposts is not learned as boilerplate
+    'learn_max_resemblance': 0.5,
+    'max_learned_paragraphs': 5000,   # Paragraphs whose sightings are tracked
+    'max_learned_boilerplate': 500,   # Learned paragraphs kept in the index, least recently matched dropped
+    'min_remaining_chars': 100,   # Keep the original posting if stripping would leave less
+    'phrases': [
+        "We are an equal opportunity employer and all qualified applicants will receive consideration for "
+        "employment without regard to race, color, religion, sex, sexual orientation, gender identity, "
+        "national origin, age, disability, protected veteran status, or any other characteristic protected by law.",
+        "We celebrate diversity and are committed to creating an inclusive environment for all employees.",
+        "Reasonable accommodations are available for individuals with disabilities during the application and "
+        "interview process. Please contact us to request an accommodation.",
+        "This employer participates in E-Verify and will provide the federal government with your Form I-9 "
+        "information to confirm that you are authorized to work in the U.S.",
+        "We use cookies to improve your experience on our site. By continuing to browse you agree to our use of "
+        "cookies. Accept all cookies. Reject all. Manage cookie preferences. Cookie settings. Privacy policy.",
+        "Apply now. Save job. Share this job. Report this job. Sign in to apply. Easy apply. Show more. Show less. "
+        "See who you know. Get notified about new jobs.",
+        "We offer a competitive salary and benefits package including health, dental and vision insurance, 401(k) "
+        "matching, paid time off, paid parental leave, flexible working hours, remote work options, wellness "
+        "programs, and a learning and development budget.",
+        "The base pay range for this role depends on location, skills, experience and qualifications. The salary "
+        "range may be adjusted, and total compensation may include bonus, equity and benefits.",
+        "We do not accept unsolicited resumes from recruiters or staffing agencies, and will not pay fees for "
+        "candidates submitted without a signed agreement.",
+        "By submitting your application you consent to the processing of your personal data in accordance with "
+        "our candidate privacy notice.",
+        "Even if you do not meet every qualification, we encourage you to apply. We value diverse perspectives "
+        "and experiences."
+    ]
+}
+
+# Near-Duplicate Job Postings
+# Postings are fingerprinted with MinHash signatures of their word shingles
+# and indexed with LSH banding. A posting whose estimated Jaccard similarity to
+# an earlier one reaches the threshold (e.g. the same posting with a different
+# tracking line, location or date) reuses that posting's extraction.
+NEAR_DUPLICATE_CONFIG = {
+    'enabled': os.getenv('JOB_DEDUP', 'true').lower() in ('1', 'true', 'yes'),
+    'threshold': float(os.getenv('JOB_DEDUP_THRESHOLD', '0.9')),
+    'shingle_size': 3,
+    'num_perm': 128,
+    'bands': 32,                  # 32 bands of 4 rows: candidates from ~0.4 similarity up
+    'max_entries': 1000,
+    'seed': 1
+}
+
+# Resume-to-Job Match Scoring
+# Fit score = text_weight * TF-IDF cosine similarity of resume and posting
+#           + skill_weight * share of the posting's skills the resume has,
+# with skills from SKILL_KEYWORDS plus the resume's own extracted skills.
+MATCH_SCORING_CONFIG = {
+    'text_weight': 0.4,
+    'skill_weight': 0.6,
+    'top_k': 5
+}
+
+# Extraction Micro-Batching
+# Job extraction requests that arrive within window_seconds of each other for
+# the same provider and model are sent as one prompt asking for a JSON array,
+# sharing the instructions and per-call overhead. Items the batch response does
+# not cover are extracted one at a time. Off by default: a request waits up to
+# window_seconds for company, which only pays off under concurrent load.
+EXTRACTION_BATCH_CONFIG = {
+    'enabled': os.getenv('EXTRACTION_BATCHING', 'false').lower() in ('1', 'true', 'yes'),
+    'providers': [name.strip() for name in os.getenv('EXTRACTION_BATCH_PROVIDERS', 'gemini').split(',') if name.strip()],
+    'window_seconds': float(os.getenv('EXTRACTION_BATCH_WINDOW', '0.05')),
+    'max_batch_size': 4
+}
+
+# Single-Flight Coalescing
+# Identical calls in flight at the same time (the same resume and posting
+# submitted twice, the same extraction or prompt from two sessions) run once
+# and share the result. Nothing is cached after the call finishes.
+SINGLE_FLIGHT_CONFIG = {
+    'enabled': os.getenv('SINGLE_FLIGHT', 'true').lower() in ('1', 'true', 'yes')
+}
+
+# Request Deadlines
+# A request's time budget is shared out across the pipeline stages by weight;
+# time a stage does not use rolls forward to the stages after it.
+DEADLINE_CONFIG = {
+    'request_seconds': float(os.getenv('REQUEST_DEADLINE_SECONDS', '240')),
+    'stage_weights': {
+        'pdf_parse': 0.1,
+        'extraction': 0.35,
+        'generation': 0.55
+    },
+    'availability_check_timeout': 10
+}
+
+# Admission Control
+ADMISSION_CONFIG = {
+    'backend_slots': int(os.getenv('OLLAMA_NUM_PARALLEL', '1')),
+    'degrade_queue_depth': 3,
+    'reject_queue_depth': 10,
+    'wait_slo_seconds': 90,
+    'reject_wait_seconds': 300,
+    'initial_latency_seconds': 45,
+    'latency_smoothing': 0.2
+}
+
+# Background Jobs
+JOB_CONFIG = {
+    'max_workers': int(os.getenv('JOB_MAX_WORKERS', '4')),
+    # Jobs waiting for a worker beyond this are rejected; admission control usually rejects sooner
+    'max_queued_jobs': int(os.getenv('JOB_MAX_QUEUED', '20')),
+    'result_ttl_seconds': 3600,
+    'abandon_after_seconds': 30
+}
+
+# Metrics
+# Prometheus text format is served on http://host:port/metrics while the app runs
+METRICS_CONFIG = {
+    'enabled': os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes'),
+    'host': os.getenv('METRICS_HOST', '127.0.0.1'),
+    'port': int(os.getenv('METRICS_PORT', '9464')),
+    'latency_buckets': [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 240]
+}
+
+# Tracing
+# When enabled, each request's span tree is appended to a JSON-lines file in OTLP/JSON format
+TRACING_CONFIG = {
+    'enabled': os.getenv('TRACING_ENABLED', 'false').lower() in ('1', 'true', 'yes'),
+    'path': os.getenv('TRACING_PATH', 'cv_generator_traces.jsonl'),
+    'max_bytes': 10 * 1024 * 1024,
+    'backup_count': 3
+}
+
+# Profiling
+# When enabled, one in every sample_every requests is profiled and its
+# artifacts are written to output_dir, named by the request's trace id
+PROFILING_CONFIG = {
+    'enabled': os.getenv('PROFILE_REQUESTS', 'false').lower() in ('1', 'true', 'yes'),
+    'sample_every': int(os.getenv('PROFILE_SAMPLE_EVERY', '10')),
+    'output_dir': os.getenv('PROFILE_DIR', 'profiles'),
+    'memory': os.getenv('PROFILE_MEMORY', 'true').lower() in ('1', 'true', 'yes'),
+    'memory_frames': 10
+}
+
 # PDF Processing
+# backend names a registered text extraction backend in src.utils.pdf_utils, or 'auto'
+# for the first installed one in backend_preference (fastest first). A document
+# yielding fewer than min_chars_per_page characters per page is retried with the next.
 PDF_CONFIG = {
+    'backend': os.getenv('PDF_BACKEND', 'auto'),
+    'backend_preference': ['pymupdf', 'pdfium', 'pypdf', 'pypdf2', 'pdfminer'],
+    'min_chars_per_page': 50,
     'max_pages': 50,
     'min_text_length': 50,
+    'max_file_bytes': 20 * 1024 * 1024,
     'temp_file_suffix': '.pdf'
 }
 
+# Sandboxed PDF parsing
+# Uploads are parsed in a pool of worker processes with CPU-time and address-space
+# limits and a wall-clock timeout; a worker that hits one is killed and replaced,
+# and every worker is replaced after max_documents_per_worker documents
+PDF_WORKER_CONFIG = {
+    'enabled': os.getenv('PDF_SANDBOX', 'true').lower() in ('1', 'true', 'yes'),
+    'workers': int(os.getenv('PDF_WORKERS', '2')),
+    'cpu_seconds': 20,
+    'memory_mb': int(os.getenv('PDF_WORKER_MEMORY_MB', '1024')),
+    'timeout_seconds': 30,
+    'max_documents_per_worker': 50
+}
+
 # Extraction Keywords
 SKILL_KEYWORDS = [
     'python', 'java', 'javascript', 'react', 'node', 'sql', 'aws', 'docker', 
@@ -56,6 +294,13 @@ EDUCATION_KEYWORDS = [
     'certification', 'diploma', 'institute', 'school'
 ]
 
+# Headings that start a new resume section
+RESUME_SECTION_HEADINGS = [
+    'summary', 'profile', 'objective', 'experience', 'work experience', 'professional experience',
+    'employment', 'work history', 'education', 'skills', 'technical skills', 'projects',
+    'certifications', 'publications', 'awards', 'languages', 'volunteering', 'interests', 'references'
+]
+
 REQUIREMENT_KEYWORDS = [
     'required', 'must have', 'experience with', 'proficient', 'knowledge of', 
     'familiar with', 'skilled in', 'expertise in'
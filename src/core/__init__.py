@@ -1,7 +1,35 @@
 from .processor import (
-    process_cover_letter_request
+    process_cover_letter_request,
+    run_cover_letter_pipeline,
+    regenerate_letter_paragraph,
+    MODE_LLM,
+    MODE_TEMPLATE,
+    PIPELINE_MODES
+)
+from .jobs import (
+    JobManager,
+    get_job_manager
+)
+from .admission import (
+    AdmissionController,
+    get_admission_controller
+)
+from .instrumentation import (
+    StageRecorder,
+    STAGE_PROGRESS_WEIGHTS
 )
 
 __all__ = [
-    "process_cover_letter_request"
+    "process_cover_letter_request",
+    "run_cover_letter_pipeline",
+    "regenerate_letter_paragraph",
+    "MODE_LLM",
+    "MODE_TEMPLATE",
+    "PIPELINE_MODES",
+    "JobManager",
+    "get_job_manager",
+    "AdmissionController",
+    "get_admission_controller",
+    "StageRecorder",
+    "STAGE_PROGRESS_WEIGHTS"
 ]
\ No newline at end of file
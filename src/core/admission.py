@@ -0,0 +1,121 @@
+import logging
+import threading
+from typing import Optional
+from src.config import ADMISSION_CONFIG
+from src.models import AdmissionDecision
+from src.utils.metrics import ADMISSIONS, QUEUE_DEPTH, IN_FLIGHT
+
+logger = logging.getLogger(__name__)
+
+ADMITTED = "admitted"
+DEGRADED = "degraded"
+REJECTED = "rejected"
+
+class AdmissionController:
+    """Process-wide admission control for cover letter requests.
+
+    Streamlit runs every session in its own thread and event loop, so the
+    controller keeps plain counters behind a lock instead of an asyncio queue.
+    Requests beyond the backend's parallel slots are considered queued, and the
+    predicted wait comes from a smoothed average of recent request latencies.
+    """
+
+    def __init__(self, config: Optional[dict] = None):
+        self.config = {**ADMISSION_CONFIG, **(config or {})}
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._avg_latency = float(self.config['initial_latency_seconds'])
+        self._counts = {ADMITTED: 0, DEGRADED: 0, REJECTED: 0}
+
+    @property
+    def slots(self) -> int:
+        return max(int(self.config['backend_slots']), 1)
+
+    def _queue_depth(self) -> int:
+        return max(self._in_flight - self.slots, 0)
+
+    def _predicted_wait(self) -> float:
+        # A new request starts once everything ahead of it frees a slot
+        requests_ahead = max(self._in_flight - self.slots + 1, 0)
+        return requests_ahead * self._avg_latency / self.slots
+
+    def admit(self) -> AdmissionDecision:
+        """Decide whether a new request is admitted, degraded or rejected."""
+        with self._lock:
+            queue_depth = self._queue_depth()
+            predicted_wait = self._predicted_wait()
+            action = ADMITTED
+            reason = None
+            retry_after = None
+
+            if (queue_depth >= self.config['reject_queue_depth']
+                    or predicted_wait > self.config['reject_wait_seconds']):
+                action = REJECTED
+                reason = f"{queue_depth} requests queued, predicted wait {predicted_wait:.0f}s"
+                # Time until the queue drains back below the degradation threshold
+                excess = queue_depth - self.config['degrade_queue_depth'] + 1
+                retry_after = max(round(excess * self._avg_latency / self.slots), 1)
+            elif (queue_depth >= self.config['degrade_queue_depth']
+                    or predicted_wait > self.config['wait_slo_seconds']):
+                action = DEGRADED
+                reason = f"{queue_depth} requests queued, predicted wait {predicted_wait:.0f}s"
+
+            if action != REJECTED:
+                self._in_flight += 1
+            self._counts[action] += 1
+            self._update_gauges()
+
+            decision = AdmissionDecision(
+                action=action,
+                queue_depth=queue_depth,
+                in_flight=self._in_flight,
+                predicted_wait_seconds=predicted_wait,
+                retry_after_seconds=retry_after,
+                reason=reason
+            )
+
+        ADMISSIONS.inc(action=action)
+        if action != ADMITTED:
+            logger.warning("Request %s: %s", action, reason)
+        return decision
+
+    def release(self, decision: AdmissionDecision, elapsed_seconds: Optional[float] = None) -> None:
+        """Release the slot held by an admitted or degraded request."""
+        if decision.action == REJECTED:
+            return
+
+        with self._lock:
+            self._in_flight = max(self._in_flight - 1, 0)
+            self._update_gauges()
+            # Degraded requests skip two LLM calls, so they would skew the estimate low
+            if elapsed_seconds is not None and decision.action == ADMITTED:
+                alpha = self.config['latency_smoothing']
+                self._avg_latency = (1 - alpha) * self._avg_latency + alpha * elapsed_seconds
+
+    def _update_gauges(self) -> None:
+        """Publish the current load to the metrics registry. Caller holds the lock."""
+        IN_FLIGHT.set(self._in_flight)
+        QUEUE_DEPTH.set(self._queue_depth())
+
+    def get_stats(self) -> dict:
+        """Get admission counters and current load."""
+        with self._lock:
+            return {
+                'in_flight': self._in_flight,
+                'queue_depth': self._queue_depth(),
+                'avg_latency_seconds': self._avg_latency,
+                'admitted': self._counts[ADMITTED],
+                'degraded': self._counts[DEGRADED],
+                'rejected': self._counts[REJECTED]
+            }
+
+_controller: Optional[AdmissionController] = None
+_controller_lock = threading.Lock()
+
+def get_admission_controller() -> AdmissionController:
+    """Get the process-wide admission controller."""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdmissionController()
+        return _controller
@@ -0,0 +1,131 @@
+import time
+import logging
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+from src.models import ProcessingStatus, ExtractionResult
+from src.utils.cancellation import OperationCancelledError
+from src.utils.metrics import STAGE_LATENCY, FALLBACKS
+from src.utils.tracing import get_tracer, Span
+
+logger = logging.getLogger(__name__)
+
+# Share of the overall progress each stage accounts for once it completes
+STAGE_PROGRESS_WEIGHTS = {
+    "pdf_save": 5.0,
+    "pdf_parse": 10.0,
+    "resume_extraction": 20.0,
+    "job_extraction": 20.0,
+    "generation": 40.0,
+    "post_processing": 5.0
+}
+
+STARTED = "started"
+COMPLETED = "completed"
+FAILED = "failed"
+
+class StageRecord:
+    """What a running stage reports back to the recorder.
+
+    usage is the dict the stage passes as usage= to the services and model
+    clients it calls, which fill it in as they go: clients add prompt_tokens,
+    completion_tokens and eval_duration_ms; services set fallback_used when
+    they fall back to deterministic parsing, plus any of chars_saved,
+    tokens_saved, reused_similarity, batched and coalesced described in their
+    docstrings. Services create their own dict when none is passed.
+    """
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.usage: dict = {}
+        self.fallback_used = False
+        self.extraction: Optional[ExtractionResult] = None
+        self.message: Optional[str] = None
+
+class StageRecorder:
+    """Emits a ProcessingStatus event when each pipeline stage starts and ends.
+
+    Events carry wall time, model token counts and whether a fallback was used.
+    They are passed to on_event as they happen and kept in events, and stage
+    latencies are observed in the metrics registry under the client's provider and model.
+    Each stage also runs inside a trace span of the same name.
+    """
+
+    def __init__(self, on_event: Optional[Callable[[ProcessingStatus], None]] = None, client=None):
+        self.on_event = on_event
+        self.provider = getattr(client, "provider", None) or "none"
+        self.model = getattr(client, "model_name", None) or "none"
+        self.events: List[ProcessingStatus] = []
+        self._completed: Dict[str, float] = {}
+
+    @property
+    def progress(self) -> float:
+        return min(sum(self._completed.values()), 100.0)
+
+    @contextmanager
+    def stage(self, stage: str, message: str):
+        """Record the stage run inside the with block."""
+        record = StageRecord(stage)
+        self._emit(ProcessingStatus(stage=stage, progress=self.progress, message=message, event=STARTED))
+        with get_tracer().start_span(stage) as span:
+            start_time = time.perf_counter()
+            try:
+                yield record
+            except OperationCancelledError:
+                self._finish(record, start_time, FAILED, "Cancelled", span)
+                raise
+            except Exception as e:
+                self._finish(record, start_time, FAILED, f"Failed: {e}", span)
+                raise
+            else:
+                self._completed[stage] = STAGE_PROGRESS_WEIGHTS.get(stage, 0.0)
+                self._finish(record, start_time, COMPLETED, record.message or message, span)
+
+    def skip(self, stage: str, message: str, fallback_used: bool = False) -> None:
+        """Count a stage that was not needed as done so progress still reaches 100%."""
+        self._completed[stage] = STAGE_PROGRESS_WEIGHTS.get(stage, 0.0)
+        self._emit(ProcessingStatus(stage=stage, progress=self.progress, message=message,
+                                    event=COMPLETED, duration_ms=0.0, fallback_used=fallback_used))
+
+    def finished_events(self) -> List[ProcessingStatus]:
+        """The completed and failed events, one per stage run."""
+        return [event for event in self.events if event.event != STARTED]
+
+    def _finish(self, record: StageRecord, start_time: float, event: str, message: str,
+                span: Optional[Span] = None) -> None:
+        duration_ms = (time.perf_counter() - start_time) * 1000
+        usage = record.usage
+        fallback_used = record.fallback_used or bool(usage.get("fallback_used"))
+        STAGE_LATENCY.observe(duration_ms / 1000, stage=record.stage, provider=self.provider, model=self.model)
+        if fallback_used:
+            FALLBACKS.inc(stage=record.stage)
+        if span is not None:
+            span.set_attribute("fallback_used", fallback_used)
+            span.set_attribute("llm.prompt_tokens", usage.get("prompt_tokens"))
+            span.set_attribute("llm.completion_tokens", usage.get("completion_tokens"))
+            span.set_attribute("prompt.tokens_saved", usage.get("tokens_saved"))
+            span.set_attribute("extraction.reused_similarity", usage.get("reused_similarity"))
+            span.set_attribute("coalesced", usage.get("coalesced"))
+        self._emit(ProcessingStatus(
+            stage=record.stage,
+            progress=self.progress,
+            message=message,
+            event=event,
+            duration_ms=round(duration_ms, 1),
+            prompt_tokens=usage.get("prompt_tokens"),
+            completion_tokens=usage.get("completion_tokens"),
+            eval_duration_ms=usage.get("eval_duration_ms"),
+            chars_saved=usage.get("chars_saved"),
+            tokens_saved=usage.get("tokens_saved"),
+            fallback_used=fallback_used,
+            extraction=record.extraction
+        ))
+        logger.info("Stage %s %s in %.0fms (prompt tokens: %s, completion tokens: %s)",
+                    record.stage, event, duration_ms, usage.get('prompt_tokens'), usage.get('completion_tokens'))
+
+    def _emit(self, status: ProcessingStatus) -> None:
+        self.events.append(status)
+        if self.on_event:
+            try:
+                self.on_event(status)
+            except Exception as e:
+                logger.warning("Stage event callback failed: %s", e)
@@ -0,0 +1,291 @@
+import io
+import time
+import uuid
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+from src.config import JOB_CONFIG
+from src.models import AdmissionDecision, JobStatus, PipelineResult, ProcessingStatus
+from src.utils.cancellation import CancellationToken, OperationCancelledError
+from .processor import run_cover_letter_pipeline, regenerate_letter_paragraph, rejected_result, MODE_LLM
+from .admission import get_admission_controller, REJECTED
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+class _Job:
+    def __init__(self, job_id: str, pdf_bytes: bytes, job_description: str, client, mode: str,
+                 abandon_after: Optional[float] = None):
+        self.status = JobStatus(job_id=job_id, state=QUEUED)
+        self.cancel_token = CancellationToken()
+        self.abandon_after = abandon_after
+        self.last_polled = time.monotonic()
+        self.pdf_bytes = pdf_bytes
+        self.job_description = job_description
+        self.client = client
+        self.mode = mode
+        self.result: Optional[PipelineResult] = None
+        self.future = None
+        self.finished_monotonic: Optional[float] = None
+        # Admission taken at submit time, released by the pipeline (or here if the job never runs)
+        self.admission: Optional[AdmissionDecision] = None
+        # Set for paragraph rewrites: the finished result, paragraph index and instructions
+        self.rewrite: Optional[Tuple[PipelineResult, int, Optional[str]]] = None
+
+class JobManager:
+    """Runs cover letter pipelines on background threads, independent of Streamlit reruns.
+
+    A Streamlit rerun throws away everything the script was doing, so the UI
+    submits a job, keeps only the job id in session state and polls for the
+    result. Results are kept until they are fetched or their TTL expires.
+    Jobs submitted with abandon_after are cancelled when nobody has polled them
+    for that long, e.g. because the user closed the page.
+
+    LLM jobs pass admission control when they are submitted, so jobs waiting
+    for a worker count towards the controller's queue depth and predicted
+    wait, and a job the controller rejects finishes at once with the retry-after
+    hint. At most max_queued_jobs jobs wait for a worker; beyond that new jobs
+    are rejected the same way. Paragraph rewrites of a finished letter run as
+    jobs too, under the same admission control, whatever mode the letter was
+    made in.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, result_ttl_seconds: Optional[float] = None,
+                 max_queued_jobs: Optional[int] = None, admission_controller=None):
+        self.max_workers = max_workers or JOB_CONFIG['max_workers']
+        self.result_ttl_seconds = result_ttl_seconds or JOB_CONFIG['result_ttl_seconds']
+        self.max_queued_jobs = max_queued_jobs or JOB_CONFIG['max_queued_jobs']
+        self.admission_controller = admission_controller or get_admission_controller()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="cover-letter-job")
+        self._jobs: Dict[str, _Job] = {}
+        self._lock = threading.Lock()
+        self._reaper = threading.Thread(target=self._reap_loop, name="cover-letter-job-reaper", daemon=True)
+        self._reaper.start()
+
+    def submit(self, pdf_file, job_description: str, client, mode: str = MODE_LLM,
+               abandon_after: Optional[float] = None) -> str:
+        """Submit a cover letter job and return its id.
+
+        A job rejected by admission control, or by the bound on queued jobs,
+        is returned already completed, with the rejection as its result.
+        """
+        # Copy the upload so the job does not depend on the caller's file object
+        pdf_file.seek(0)
+        pdf_bytes = pdf_file.read()
+
+        job = _Job(uuid.uuid4().hex, pdf_bytes, job_description, client, mode, abandon_after)
+        return self._enqueue(job)
+
+    def submit_paragraph_rewrite(self, result: PipelineResult, paragraph_index: int, client,
+                                 instructions: Optional[str] = None, abandon_after: Optional[float] = None) -> str:
+        """Submit a rewrite of one body paragraph of a finished letter and return the job id.
+
+        The job's result is the updated copy of result (see regenerate_letter_paragraph).
+        If the rewrite is rejected at capacity, the result is unchanged apart from its message.
+        """
+        job = _Job(uuid.uuid4().hex, b"", "", client, result.mode, abandon_after)
+        job.rewrite = (result, paragraph_index, instructions)
+        return self._enqueue(job)
+
+    def _enqueue(self, job: _Job) -> str:
+        """Admit the job and hand it to a worker, or complete it as rejected."""
+        job_id = job.status.job_id
+        # A rewrite is a model call even when the letter came from the template
+        if job.rewrite is not None or job.mode == MODE_LLM:
+            job.admission = self.admission_controller.admit()
+
+        with self._lock:
+            self._purge_expired()
+            queued = sum(1 for queued_job in self._jobs.values() if queued_job.status.state == QUEUED)
+            if job.admission is not None and job.admission.action == REJECTED:
+                self._finish_rejected(job, job.admission)
+            elif queued >= self.max_queued_jobs:
+                logger.warning("Rejecting job %s: %s jobs already wait for a worker", job_id, queued)
+                retry_after = self.admission_controller.get_stats()['avg_latency_seconds'] * queued / self.max_workers
+                self._release_admission(job)
+                self._finish_rejected(job, AdmissionDecision(action=REJECTED, queue_depth=queued,
+                                                             retry_after_seconds=max(round(retry_after), 1),
+                                                             reason=f"{queued} jobs queued"))
+            else:
+                job.future = self._executor.submit(self._run_job, job)
+            self._jobs[job_id] = job
+
+        logger.info("Submitted background job %s (%s)", job_id, job.status.state)
+        return job_id
+
+    def get_status(self, job_id: str) -> Optional[JobStatus]:
+        """Get a snapshot of the job status, or None if the job is unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job:
+                return None
+            job.last_polled = time.monotonic()
+            return job.status.copy(update={"events": list(job.status.events)})
+
+    def get_result(self, job_id: str, remove: bool = True) -> Optional[PipelineResult]:
+        """Fetch the result of a finished job, removing it from the store by default."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job or job.status.state not in FINISHED_STATES:
+                return None
+            if remove:
+                del self._jobs[job_id]
+            return job.result
+
+    def cancel(self, job_id: str, reason: str = "cancelled by user") -> bool:
+        """Cancel a job, closing its in-flight model request, and discard its result."""
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+            if not job:
+                return False
+            started = not job.future.cancel() if job.future else False
+            if job.status.state not in FINISHED_STATES:
+                job.status.state = CANCELLED
+                job.status.finished_at = datetime.now()
+            if not started:
+                self._release_admission(job)
+
+        # Outside the lock: the token's callbacks close HTTP connections
+        job.cancel_token.cancel(reason)
+        logger.info("Cancelled background job %s (started: %s)", job_id, started)
+        return True
+
+    def get_stats(self) -> dict:
+        """Get job counts by state."""
+        with self._lock:
+            counts = {state: 0 for state in (QUEUED, RUNNING) + FINISHED_STATES}
+            for job in self._jobs.values():
+                counts[job.status.state] += 1
+            return counts
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def _release_admission(self, job: _Job) -> None:
+        """Release the admission of a job that will not run. Caller holds the lock."""
+        if job.admission is not None:
+            self.admission_controller.release(job.admission)
+            job.admission = None
+
+    def _finish_rejected(self, job: _Job, decision: AdmissionDecision) -> None:
+        """Complete a job that was turned away at capacity. Caller holds the lock."""
+        job.result = rejected_result(decision, job.mode)
+        if job.rewrite is not None:
+            # The letter stays as it was
+            job.result = job.rewrite[0].copy(update={'message': job.result.message})
+        job.status.state = COMPLETED
+        job.status.finished_at = datetime.now()
+        job.finished_monotonic = time.monotonic()
+        job.admission = None
+        job.pdf_bytes = b""
+        job.rewrite = None
+
+    def _run_job(self, job: _Job) -> None:
+        with self._lock:
+            if job.status.state == CANCELLED:
+                self._release_admission(job)
+                return
+            job.status.state = RUNNING
+            job.status.started_at = datetime.now()
+            # The pipeline releases it from here on
+            admission, job.admission = job.admission, None
+
+        def on_draft(draft: str) -> None:
+            with self._lock:
+                job.status.draft = draft
+
+        def on_event(event: ProcessingStatus) -> None:
+            with self._lock:
+                job.status.events.append(event)
+                job.status.progress = event.progress
+
+        try:
+            if job.rewrite is not None:
+                source, paragraph_index, instructions = job.rewrite
+                result = asyncio.run(regenerate_letter_paragraph(
+                    source, paragraph_index, job.client, instructions=instructions,
+                    cancel_token=job.cancel_token, on_event=on_event
+                ))
+            else:
+                result = asyncio.run(run_cover_letter_pipeline(
+                    io.BytesIO(job.pdf_bytes), job.job_description, job.client,
+                    mode=job.mode, on_draft=on_draft, cancel_token=job.cancel_token, on_event=on_event,
+                    admission_controller=self.admission_controller, admission=admission
+                ))
+            with self._lock:
+                job.result = result
+                if job.status.state != CANCELLED:
+                    job.status.state = COMPLETED
+        except OperationCancelledError:
+            logger.info("Background job %s stopped after cancellation", job.status.job_id)
+            with self._lock:
+                job.status.state = CANCELLED
+        except Exception as e:
+            logger.error("Background job %s failed: %s", job.status.job_id, e)
+            with self._lock:
+                job.status.error_message = str(e)
+                if job.status.state != CANCELLED:
+                    job.status.state = FAILED
+        finally:
+            if job.rewrite is not None and admission is not None:
+                # Rewrites are one short call, so they leave the latency estimate alone
+                self.admission_controller.release(admission)
+            with self._lock:
+                job.status.finished_at = datetime.now()
+                job.finished_monotonic = time.monotonic()
+                # The input is no longer needed once the job is done
+                job.pdf_bytes = b""
+                job.rewrite = None
+
+    def _reap_loop(self, interval: float = 5.0) -> None:
+        while True:
+            time.sleep(interval)
+            try:
+                self._reap_abandoned()
+            except Exception as e:
+                logger.warning("Background job reaper failed: %s", e)
+
+    def _reap_abandoned(self) -> None:
+        """Cancel unfinished jobs whose submitter stopped polling."""
+        now = time.monotonic()
+        with self._lock:
+            abandoned = [
+                job_id for job_id, job in self._jobs.items()
+                if job.abandon_after is not None
+                and job.status.state not in FINISHED_STATES
+                and now - job.last_polled > job.abandon_after
+            ]
+        for job_id in abandoned:
+            self.cancel(job_id, reason="abandoned by client")
+
+    def _purge_expired(self) -> None:
+        """Drop finished jobs whose results were never fetched. Caller holds the lock."""
+        now = time.monotonic()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_monotonic is not None and now - job.finished_monotonic > self.result_ttl_seconds
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+        if expired:
+            logger.info("Purged %s expired background jobs", len(expired))
+
+_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+def get_job_manager() -> JobManager:
+    """Get the process-wide background job manager."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
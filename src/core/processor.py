@@ -1,82 +1,441 @@
 import os
 import logging
 import re
+import time
 import tempfile
 import asyncio
-from typing import Optional
-from src.utils.pdf_utils import extract_text_from_pdf
-from src.services import ResumeExtractor, JobExtractor, CoverLetterGenerator
+from typing import Optional, Callable, Awaitable
+from src.config import DEADLINE_CONFIG
+from src.utils.pdf_worker import parse_pdf, parse_pdf_text
+from src.services import ResumeExtractor, JobExtractor, CoverLetterGenerator, TemplateLetterComposer
 from src.utils.text_utils import remove_thinking_tags
+from src.utils.cancellation import CancellationToken, OperationCancelledError, raise_if_cancelled
+from src.utils.deadline import Deadline
+from src.utils.metrics import TIMEOUTS
+from src.utils.tracing import get_tracer
+from src.utils.profiling import get_request_profiler, executor_call
+from src.utils.single_flight import SingleFlight, flight_key
+from src.models import AdmissionDecision, PipelineResult, ProcessingStatus
+from .admission import get_admission_controller, DEGRADED, REJECTED
+from .instrumentation import StageRecorder, StageRecord
 
 logger = logging.getLogger(__name__)
 
-async def process_cover_letter_request(pdf_file, job_description: str, client) -> Optional[str]:
-    """Enhanced core function to process cover letter generation."""
+MODE_LLM = "llm"
+MODE_TEMPLATE = "template"
+PIPELINE_MODES = (MODE_LLM, MODE_TEMPLATE)
+
+# Identical requests in flight at once (a double-click, or two sessions with the same resume and job) run once
+_request_flight = SingleFlight("cover_letter_request")
+
+async def process_cover_letter_request(pdf_file, job_description: str, client, mode: str = MODE_LLM,
+                                       cancel_token: Optional[CancellationToken] = None,
+                                       deadline: Optional[float] = None,
+                                       on_event: Optional[Callable[[ProcessingStatus], None]] = None) -> Optional[str]:
+    """Enhanced core function to process cover letter generation.
+
+    deadline is the request's total time budget in seconds (DEADLINE_CONFIG['request_seconds']
+    by default). on_event receives a ProcessingStatus when each stage starts and finishes.
+    Raises OperationCancelledError if cancel_token is cancelled while the request runs.
+    """
+    result = await run_cover_letter_pipeline(pdf_file, job_description, client, mode=mode,
+                                             cancel_token=cancel_token, deadline=deadline, on_event=on_event)
+    return result.content
+
+async def run_cover_letter_pipeline(pdf_file, job_description: str, client, mode: str = MODE_LLM,
+                                    on_draft: Optional[Callable[[str], None]] = None,
+                                    cancel_token: Optional[CancellationToken] = None,
+                                    deadline: Optional[float] = None,
+                                    admission_controller=None,
+                                    on_event: Optional[Callable[[ProcessingStatus], None]] = None,
+                                    admission: Optional[AdmissionDecision] = None) -> PipelineResult:
+    """Run the cover letter pipeline under admission control and a time budget.
+
+    Under overload the request is degraded to deterministic extraction, leaving
+    only the generation call, and past a further threshold it is rejected with a
+    retry-after hint instead of being queued behind the backend. A rejected
+    request returns without reading the upload, so rejecting stays cheap.
+    The deadline is split across PDF parsing, extraction and generation; a stage
+    that runs out of time falls back to its deterministic counterpart.
+    In "template" mode no model is called and admission control is skipped.
+    admission is a decision already taken for this request (JobManager.submit
+    admits jobs before queuing them); the pipeline then uses and releases it
+    instead of asking the controller again.
+    Stage events (timing, token counts, fallbacks) are passed to on_event, and the
+    request is traced as a span tree with one child span per stage and model call.
+    A request identical to one already in flight (same resume, job description,
+    mode and model) waits for it and gets a copy of its result, with coalesced set;
+    its stage events and draft are passed on once that request finishes. If that
+    request outlasts this one's deadline, this one gets the template letter.
+    """
+    if mode not in PIPELINE_MODES:
+        raise ValueError(f"Unknown pipeline mode '{mode}'. Expected one of: {', '.join(PIPELINE_MODES)}")
+
+    with get_tracer().start_span("cover_letter_request", attributes={"mode": mode}) as span:
+        span.set_attribute("llm.provider", getattr(client, "provider", None))
+        span.set_attribute("llm.model", getattr(client, "model_name", None))
+        key = _request_key(pdf_file, job_description, client, mode)
+        shared = {}
+        controller = admission_controller or get_admission_controller()
+        unused_admission = [admission] if admission is not None else []
+        try:
+            with get_request_profiler().profile(span.trace_id) as profile:
+                run = lambda: _run_request(pdf_file, job_description, client, mode, on_draft, cancel_token, deadline,
+                                           controller, unused_admission.pop() if unused_admission else None, on_event)
+                timeout = deadline if deadline is not None else DEADLINE_CONFIG['request_seconds']
+                try:
+                    result = await (_request_flight.do(key, run, usage=shared, cancel_token=cancel_token,
+                                                       timeout=timeout) if key else run())
+                except TimeoutError:
+                    result = _shared_timeout_result(pdf_file, job_description, mode)
+        finally:
+            # A request that shared another's result, or failed before running, still holds its admission
+            for decision in unused_admission:
+                controller.release(decision)
+        if shared.get("coalesced"):
+            _replay_shared_result(result, on_draft, on_event)
+            span.set_attribute("coalesced", True)
+        if profile is not None:
+            span.set_attribute("profile.path", profile.stats_path)
+        span.set_attribute("admission", result.admission)
+        span.set_attribute("degraded", result.degraded)
+        span.set_attribute("timed_out_stages", ",".join(result.timed_out_stages))
+        return result
+
+async def _run_request(pdf_file, job_description: str, client, mode: str,
+                       on_draft: Optional[Callable[[str], None]], cancel_token: Optional[CancellationToken],
+                       deadline: Optional[float], controller, admission: Optional[AdmissionDecision],
+                       on_event: Optional[Callable[[ProcessingStatus], None]]) -> PipelineResult:
+    request_deadline = Deadline(deadline if deadline is not None else DEADLINE_CONFIG['request_seconds'])
+    result = PipelineResult(mode=mode)
+    recorder = StageRecorder(on_event, client)
+
+    if mode == MODE_TEMPLATE:
+        await _run_pipeline(pdf_file, job_description, client, result,
+                            cancel_token=cancel_token, deadline=request_deadline, recorder=recorder)
+        result.stages = recorder.finished_events()
+        return result
+
+    decision = admission or controller.admit()
+    if decision.action == REJECTED:
+        return rejected_result(decision, mode)
+
+    result.admission = decision.action
+
+    result.degraded = decision.action == DEGRADED
+    start_time = time.monotonic()
+    try:
+        await _run_pipeline(pdf_file, job_description, client, result, on_draft, cancel_token, request_deadline, recorder)
+    finally:
+        controller.release(decision, time.monotonic() - start_time)
+        result.stages = recorder.finished_events()
+
+    notes = []
+    if result.degraded:
+        notes.append("High demand: used quick resume and job analysis to avoid a long wait.")
+    if result.timed_out_stages:
+        notes.append(f"Time budget ran out during {', '.join(result.timed_out_stages)}; used quick analysis instead.")
+    result.message = " ".join(notes) or None
+    return result
+
+async def regenerate_letter_paragraph(result: PipelineResult, paragraph_index: int, client,
+                                      instructions: Optional[str] = None,
+                                      cancel_token: Optional[CancellationToken] = None,
+                                      deadline: Optional[float] = None,
+                                      on_event: Optional[Callable[[ProcessingStatus], None]] = None) -> PipelineResult:
+    """Rewrite one body paragraph of a finished letter with a single small model call.
+
+    The resume and job extractions kept on result are reused, so nothing is
+    parsed or extracted again. Returns a copy of result with the new letter and
+    a "paragraph_regeneration" stage event appended to its stages. If the call
+    fails or runs out of time the letter is unchanged and the event has
+    fallback_used set. Raises ValueError if result has no letter or extractions,
+    or no such paragraph.
+    """
+    if not result.content or result.resume_info is None or result.job_info is None:
+        raise ValueError("The result has no letter and extractions to rewrite a paragraph of")
+    request_deadline = Deadline(deadline if deadline is not None else DEADLINE_CONFIG['request_seconds'])
+    updated = result.copy(deep=True, update={'message': None, 'coalesced': False, 'timed_out_stages': []})
+    recorder = StageRecorder(on_event, client)
+
+    with get_tracer().start_span("paragraph_regeneration_request", attributes={"paragraph": paragraph_index}):
+        with recorder.stage("paragraph_regeneration", f"Rewriting paragraph {paragraph_index + 1}") as stage:
+            updated.content = await _run_with_deadline(
+                CoverLetterGenerator.regenerate_paragraph(client, result.content, paragraph_index,
+                                                          result.resume_info, result.job_info, instructions,
+                                                          cancel_token=cancel_token, deadline=request_deadline,
+                                                          usage=stage.usage),
+                request_deadline, "paragraph_regeneration", updated, lambda: result.content, stage
+            )
+    updated.stages = [*result.stages, *recorder.finished_events()]
+    if updated.stages[-1].fallback_used:
+        updated.message = "Could not rewrite the paragraph; the letter is unchanged."
+    return updated
+
+def rejected_result(decision: AdmissionDecision, mode: str = MODE_LLM) -> PipelineResult:
+    """Result of a request turned away at capacity, with the retry-after hint."""
+    retry_after = decision.retry_after_seconds or 1
+    message = f"The service is at capacity. Please retry in {retry_after:.0f} seconds."
+    return PipelineResult(mode=mode, admission=REJECTED, content=f"Error: {message}",
+                          retry_after_seconds=retry_after, message=message)
+
+def _request_key(pdf_file, job_description: str, client, mode: str) -> Optional[str]:
+    """Hash of everything that determines a request's letter; None when there is nothing worth sharing."""
+    # Template letters cost no model call
+    if mode != MODE_LLM or not pdf_file or not job_description or not job_description.strip():
+        return None
+    try:
+        pdf_file.seek(0)
+        pdf_bytes = pdf_file.read()
+        pdf_file.seek(0)
+    except Exception as e:
+        logger.warning("Could not read the upload to coalesce identical requests: %s", e)
+        return None
+    return flight_key(getattr(client, "provider", None), getattr(client, "model_name", None),
+                      getattr(client, "base_url", None), mode, pdf_bytes, job_description.strip())
+
+def _replay_shared_result(result: PipelineResult, on_draft: Optional[Callable[[str], None]],
+                          on_event: Optional[Callable[[ProcessingStatus], None]]) -> None:
+    """Pass a result shared from an identical request to this request's callbacks."""
+    logger.info("Identical cover letter request was already in flight; sharing its result")
+    result.coalesced = True
+    result.message = " ".join(filter(None, [result.message, "An identical request was already running; showing its result."]))
+    try:
+        if on_draft and result.draft:
+            on_draft(result.draft)
+        for event in result.stages if on_event else []:
+            on_event(event)
+    except Exception as e:
+        logger.warning("Stage event callback failed: %s", e)
+
+def _shared_timeout_result(pdf_file, job_description: str, mode: str) -> PipelineResult:
+    """Template letter for a request whose identical in-flight request outlasted its deadline."""
+    TIMEOUTS.inc(stage="request")
+    draft = _compose_draft_from_upload(pdf_file, job_description)
+    return PipelineResult(mode=mode, content=draft or "Error: The request took too long. Please try again.",
+                          draft=draft, timed_out_stages=["request"],
+                          message="An identical request was still running when time ran out; used quick analysis instead.")
+
+def _compose_template_letter(pdf_text: str, job_description: str) -> str:
+    """Compose a letter from deterministic extraction without any model call."""
+    resume_info = ResumeExtractor._fallback_resume_extraction(pdf_text)
+    job_info = JobExtractor._fallback_job_extraction(job_description.strip())
+    return TemplateLetterComposer.compose_cover_letter(resume_info, job_info)
+
+def _compose_draft_from_upload(pdf_file, job_description: str) -> Optional[str]:
+    try:
+        pdf_text = _extract_resume_text(pdf_file)
+        if not pdf_text or not job_description or not job_description.strip():
+            return None
+        return _compose_template_letter(pdf_text, job_description)
+    except Exception as e:
+        logger.warning("Could not compose template draft: %s", e)
+        return None
+
+def _extract_resume_text(pdf_file) -> Optional[str]:
+    """Save the uploaded PDF to a temporary file and extract its text."""
+    temp_pdf_path = None
+    try:
+        temp_pdf_path = _save_upload(pdf_file)
+        return parse_pdf_text(temp_pdf_path)
+    finally:
+        _remove_temp_file(temp_pdf_path)
+
+def _save_upload(pdf_file) -> str:
+    """Save the uploaded PDF to a temporary file and return its path."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_pdf:
+        # Reset file pointer if needed
+        pdf_file.seek(0)
+        temp_pdf.write(pdf_file.read())
+        return temp_pdf.name
+
+def _remove_temp_file(temp_pdf_path: Optional[str]) -> None:
+    if temp_pdf_path:
+        try:
+            os.unlink(temp_pdf_path)
+            logger.debug("Temporary PDF file cleaned up")
+        except Exception as e:
+            logger.warning("Could not delete temporary file: %s", e)
+
+async def _run_pipeline(pdf_file, job_description: str, client, result: PipelineResult,
+                        on_draft: Optional[Callable[[str], None]] = None,
+                        cancel_token: Optional[CancellationToken] = None,
+                        deadline: Optional[Deadline] = None,
+                        recorder: Optional[StageRecorder] = None) -> PipelineResult:
+    """Run the pipeline stages, filling in the letter (or error message) and the template draft."""
+    deadline = deadline or Deadline(DEADLINE_CONFIG['request_seconds'])
+    recorder = recorder or StageRecorder()
     try:
         # Input validation
         if not job_description or job_description.strip() == "":
             logger.error("Job description is empty")
-            return None
-        
+            return result
+
         if not pdf_file:
             logger.error("PDF file is missing")
-            return None
-            
-        logger.info(f"Processing job description with {len(job_description)} characters")
-        
-        # Step 1: Save uploaded PDF to a temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_pdf:
-            # Reset file pointer if needed
-            pdf_file.seek(0)
-            temp_pdf.write(pdf_file.read())
-            temp_pdf_path = temp_pdf.name
-        
-        # Step 2: Extract text from the PDF resume
-        pdf_text = extract_text_from_pdf(temp_pdf_path)
+            return result
+
+        logger.info("Processing job description with %s characters", len(job_description))
+
+        # Step 1-2: Save the uploaded PDF and extract the resume text
+        raise_if_cancelled(cancel_token)
+        pdf_deadline = deadline.split(_remaining_stage_weights('pdf_parse'), 'pdf_parse')
+        loop = asyncio.get_running_loop()
+        temp_pdf_path = None
+        try:
+            with recorder.stage("pdf_save", "Saving uploaded resume"):
+                temp_pdf_path = await asyncio.wait_for(
+                    loop.run_in_executor(None, executor_call(_save_upload, pdf_file)),
+                    timeout=pdf_deadline.remaining()
+                )
+            with recorder.stage("pdf_parse", "Extracting text from resume PDF") as stage:
+                # The page count comes from the same parse as the text
+                pdf_text, pdf_info = await asyncio.wait_for(
+                    loop.run_in_executor(None, executor_call(parse_pdf, temp_pdf_path, pdf_deadline.remaining())),
+                    timeout=pdf_deadline.remaining()
+                )
+                stage.message = (f"Extracted {len(pdf_text or '')} characters from {pdf_info['num_pages']} pages "
+                                 f"of resume PDF")
+        except asyncio.TimeoutError:
+            logger.error("PDF parsing exceeded its %.1fs budget", pdf_deadline.budget)
+            result.timed_out_stages.append("pdf_parse")
+            TIMEOUTS.inc(stage="pdf_parse")
+            result.content = "Error: Reading the PDF took too long. Please try a smaller or simpler PDF."
+            return result
+        finally:
+            _remove_temp_file(temp_pdf_path)
+        raise_if_cancelled(cancel_token)
         if not pdf_text:
-            return "Error: Could not extract sufficient text from PDF. Please ensure the PDF is readable."
-        
+            result.content = "Error: Could not extract sufficient text from PDF. Please ensure the PDF is readable."
+            return result
+
+        if result.mode == MODE_TEMPLATE:
+            logger.info("Template mode: composing cover letter without a model call")
+            for skipped in ("resume_extraction", "job_extraction"):
+                recorder.skip(skipped, "Quick analysis is part of the template letter", fallback_used=True)
+            with recorder.stage("generation", "Composing template cover letter") as stage:
+                result.draft = _compose_template_letter(pdf_text, job_description)
+                stage.fallback_used = True
+            recorder.skip("post_processing", "Template letters need no clean-up")
+            result.content = result.draft
+            return result
+
+        if on_draft:
+            result.draft = _compose_template_letter(pdf_text, job_description)
+            on_draft(result.draft)
+
         # Step 3: Process the resume and job description concurrently
-        logger.info("Starting parallel extraction of resume and job information")
-        resume_info, job_info = await asyncio.gather(
-            ResumeExtractor.extract_resume_info(client, pdf_text),
-            JobExtractor.extract_job_description_info(client, job_description.strip()),
-            return_exceptions=True
-        )
-        
+        if result.degraded:
+            logger.info("Degraded mode: using deterministic extraction")
+            with recorder.stage("resume_extraction", "Quick resume analysis") as stage:
+                resume_info = ResumeExtractor._fallback_resume_extraction(pdf_text)
+                stage.fallback_used = True
+                stage.extraction = ResumeExtractor.validate_extraction(resume_info)
+            with recorder.stage("job_extraction", "Quick job description analysis") as stage:
+                job_info = JobExtractor._fallback_job_extraction(job_description.strip())
+                stage.fallback_used = True
+                stage.extraction = JobExtractor.validate_extraction(job_info)
+        else:
+            logger.info("Starting parallel extraction of resume and job information")
+            extraction_deadline = deadline.split(_remaining_stage_weights('extraction'), 'extraction')
+            resume_info, job_info = await asyncio.gather(
+                _run_extraction_stage(
+                    recorder, "resume_extraction", "Analyzing resume",
+                    lambda usage: ResumeExtractor.extract_resume_info(client, pdf_text, cancel_token=cancel_token,
+                                                                      deadline=extraction_deadline, usage=usage,
+                                                                      job_text=job_description.strip()),
+                    extraction_deadline, result,
+                    lambda: ResumeExtractor._fallback_resume_extraction(pdf_text),
+                    ResumeExtractor.validate_extraction
+                ),
+                _run_extraction_stage(
+                    recorder, "job_extraction", "Analyzing job description",
+                    lambda usage: JobExtractor.extract_job_description_info(client, job_description.strip(),
+                                                                            cancel_token=cancel_token,
+                                                                            deadline=extraction_deadline, usage=usage),
+                    extraction_deadline, result,
+                    lambda: JobExtractor._fallback_job_extraction(job_description.strip()),
+                    JobExtractor.validate_extraction
+                ),
+                return_exceptions=True
+            )
+            raise_if_cancelled(cancel_token)
+
         # Handle extraction results
         if isinstance(resume_info, Exception):
-            logger.error(f"Resume extraction failed: {resume_info}")
+            logger.error("Resume extraction failed: %s", resume_info)
             resume_info = None
-            
+
         if isinstance(job_info, Exception):
-            logger.error(f"Job extraction failed: {job_info}")
+            logger.error("Job extraction failed: %s", job_info)
             job_info = None
-        
+
         if not resume_info or not job_info:
             logger.error("Failed to extract information from resume or job description")
-            return "Error: Could not extract sufficient information from the provided documents."
-        
-        # Step 4: Generate the cover letter
+            result.content = "Error: Could not extract sufficient information from the provided documents."
+            return result
+
+        # Kept so a paragraph can later be rewritten without extracting again
+        result.resume_info, result.job_info = resume_info, job_info
+
+        # Step 4: Generate the cover letter with whatever time is left
         logger.info("Generating cover letter")
-        cover_letter = await CoverLetterGenerator.generate_cover_letter(client, resume_info, job_info)
-        clean_cover_letter = re.sub(r'<think>.*?</think>', '', cover_letter, flags=re.DOTALL)
+        with recorder.stage("generation", "Writing cover letter") as stage:
+            cover_letter = await _run_with_deadline(
+                CoverLetterGenerator.generate_cover_letter(client, resume_info, job_info, cancel_token=cancel_token,
+                                                           deadline=deadline, usage=stage.usage),
+                deadline, "generation", result,
+                lambda: TemplateLetterComposer.compose_cover_letter(resume_info, job_info),
+                stage
+            )
+
+        with recorder.stage("post_processing", "Cleaning up cover letter"):
+            clean_cover_letter = re.sub(r'<think>.*?</think>', '', cover_letter, flags=re.DOTALL)
 
         if not clean_cover_letter:
             logger.error("Cover letter generation failed")
-            return "Error: Could not generate cover letter. Please try again."
-            
+            result.content = "Error: Could not generate cover letter. Please try again."
+            return result
+
         logger.info("Cover letter generated successfully")
-        return clean_cover_letter
+        result.content = clean_cover_letter
+        return result
 
+    except OperationCancelledError:
+        logger.info("Cover letter request cancelled")
+        raise
     except Exception as e:
-        logger.error(f"Error processing request: {e}")
-        return f"An unexpected error occurred: {str(e)}"
-    finally:
-        # Cleanup temporary file
-        if "temp_pdf_path" in locals():
-            try:
-                os.unlink(temp_pdf_path)
-                logger.debug("Temporary PDF file cleaned up")
-            except Exception as e:
-                logger.warning(f"Could not delete temporary file: {e}")
\ No newline at end of file
+        logger.error("Error processing request: %s", e)
+        result.content = f"An unexpected error occurred: {str(e)}"
+        return result
+
+async def _run_extraction_stage(recorder: StageRecorder, stage_name: str, message: str,
+                                extract: Callable[[dict], Awaitable], deadline: Deadline,
+                                result: PipelineResult, fallback: Callable[[], object],
+                                validate: Callable[[object], object]):
+    """Run one extraction under its deadline as a recorded stage."""
+    with recorder.stage(stage_name, message) as stage:
+        extraction = await _run_with_deadline(extract(stage.usage), deadline, stage_name, result, fallback, stage)
+        if extraction is not None:
+            stage.extraction = validate(extraction)
+        return extraction
+
+async def _run_with_deadline(stage: Awaitable, deadline: Deadline, stage_name: str,
+                             result: PipelineResult, fallback: Callable[[], object],
+                             record: Optional[StageRecord] = None):
+    """Await a stage until its deadline, then cancel it and use the deterministic fallback."""
+    try:
+        return await asyncio.wait_for(stage, timeout=deadline.remaining())
+    except asyncio.TimeoutError:
+        logger.warning("%s ran out of time after %.1fs, using fallback", stage_name, deadline.budget)
+        result.timed_out_stages.append(stage_name)
+        TIMEOUTS.inc(stage=stage_name)
+        if record is not None:
+            record.fallback_used = True
+        return fallback()
+
+def _remaining_stage_weights(stage: str) -> dict:
+    """Weights of the given stage and every stage after it."""
+    stages = list(DEADLINE_CONFIG['stage_weights'].items())
+    names = [name for name, _ in stages]
+    return dict(stages[names.index(stage):])
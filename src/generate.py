@@ -1,21 +1,16 @@
-import os
 import logging
 import re
-import PyPDF2
-import tempfile
 import asyncio
 from pydantic import BaseModel, Field
 from typing import List, Optional
 import json
 import requests
 from datetime import datetime
-import google.generativeai as genai
 from dotenv import load_dotenv
 from src.models.data_models import ResumeExtraction, JobDescriptionExtraction, CoverLetter
+from src.utils.pdf_utils import save_uploaded_pdf, extract_text_from_pdf, cleanup_temp_file
 load_dotenv()
 
-"""Logging Configuration"""
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
@@ -27,6 +22,9 @@ class GeminiClient:
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY not found in environment variables")
         
+        # Imported here so that Ollama-only deployments never load the Google SDK
+        import google.generativeai as genai
+        self._genai = genai
         genai.configure(api_key=self.api_key)
         self.model = genai.GenerativeModel(model_name)
         logger.info(f"Initializing GeminiClient with model: {model_name}")
@@ -46,7 +44,7 @@ class GeminiClient:
             logger.info(f"Sending request to Gemini with model: {self.model_name}")
             logger.debug(f"Prompt length: {len(prompt)} characters")
             
-            generation_config = genai.types.GenerationConfig(
+            generation_config = self._genai.types.GenerationConfig(
                 temperature=0.7,
                 top_p=0.9,
                 top_k=40,
@@ -425,33 +423,15 @@ async def process_cover_letter_request(pdf_file, job_description: str, ollama_cl
         logger.info(f"Processing job description with {len(job_description)} characters")
         
         # Step 1: Save uploaded PDF to a temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_pdf:
-            # Reset file pointer if needed
-            pdf_file.seek(0)
-            temp_pdf.write(pdf_file.read())
-            temp_pdf_path = temp_pdf.name
-        
-        # Step 2: Extract text from the PDF resume
-        try:
-            with open(temp_pdf_path, "rb") as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                pdf_text = ""
-                for page_num, page in enumerate(pdf_reader.pages):
-                    try:
-                        pdf_text += page.extract_text() + "\n"
-                    except Exception as e:
-                        logger.warning(f"Error extracting text from page {page_num}: {e}")
-                        
-            logger.info(f"Extracted PDF text length: {len(pdf_text)} characters")
-            
-            if len(pdf_text.strip()) < 50:
-                logger.error("PDF text extraction failed or too short")
-                return "Error: Could not extract sufficient text from PDF. Please ensure the PDF is readable."
-                
-        except Exception as e:
-            logger.error(f"Error reading PDF: {e}")
+        temp_pdf_path = save_uploaded_pdf(pdf_file)
+        if not temp_pdf_path:
             return "Error: Could not read the PDF file. Please try a different file."
-        
+
+        # Step 2: Extract text from the PDF resume
+        pdf_text = extract_text_from_pdf(temp_pdf_path)
+        if not pdf_text:
+            return "Error: Could not extract sufficient text from PDF. Please ensure the PDF is readable."
+
         # Step 3: Process the resume and job description concurrently
         logger.info("Starting parallel extraction of resume and job information")
         resume_info, job_info = await asyncio.gather(
@@ -491,11 +471,7 @@ async def process_cover_letter_request(pdf_file, job_description: str, ollama_cl
     finally:
         # Cleanup temporary file
         if "temp_pdf_path" in locals():
-            try:
-                os.unlink(temp_pdf_path)
-                logger.debug("Temporary PDF file cleaned up")
-            except Exception as e:
-                logger.warning(f"Could not delete temporary file: {e}")
+            cleanup_temp_file(temp_pdf_path)
 
 """Factory Function"""
 def create_ollama_client(model_name: str = "deepseek-r1:latest"):
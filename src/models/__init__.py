@@ -3,7 +3,10 @@ from .data_models import (
     JobDescriptionExtraction, 
     CoverLetter,
     ExtractionResult,
-    ProcessingStatus
+    ProcessingStatus,
+    AdmissionDecision,
+    PipelineResult,
+    JobStatus
 )
 
 __all__ = [
@@ -11,5 +14,8 @@ __all__ = [
     'JobDescriptionExtraction', 
     'CoverLetter',
     'ExtractionResult',
-    'ProcessingStatus'
+    'ProcessingStatus',
+    'AdmissionDecision',
+    'PipelineResult',
+    'JobStatus'
 ]
\ No newline at end of file
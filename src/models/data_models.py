@@ -51,8 +51,58 @@ class ProcessingStatus(BaseModel):
     progress: float = Field(ge=0.0, le=100.0, description="Progress percentage")
     message: str = Field(description="Status message")
     timestamp: datetime = Field(default_factory=datetime.now)
+    event: str = Field(default="completed", description="One of 'started', 'completed' or 'failed'")
+    duration_ms: Optional[float] = Field(default=None, description="Wall time of the stage")
+    prompt_tokens: Optional[int] = Field(default=None, description="Prompt tokens evaluated by the model")
+    completion_tokens: Optional[int] = Field(default=None, description="Tokens generated by the model")
+    eval_duration_ms: Optional[float] = Field(default=None, description="Model time spent generating tokens")
+    chars_saved: Optional[int] = Field(default=None, description="Input characters removed before prompting, e.g. boilerplate")
+    tokens_saved: Optional[int] = Field(default=None, description="Estimated prompt tokens saved by removing them")
+    fallback_used: bool = Field(default=False, description="Whether a deterministic fallback replaced the model output")
+    extraction: Optional[ExtractionResult] = Field(default=None, description="Extraction outcome for extraction stages")
     
     class Config:
         json_encoders = {
             datetime: lambda v: v.isoformat()
-        }
\ No newline at end of file
+        }
+
+class AdmissionDecision(BaseModel):
+    """Model for an admission control decision on a new request."""
+    action: str = Field(description="One of 'admitted', 'degraded' or 'rejected'")
+    queue_depth: int = Field(default=0, ge=0, description="Requests waiting for a backend slot")
+    in_flight: int = Field(default=0, ge=0, description="Requests currently being processed")
+    predicted_wait_seconds: float = Field(default=0.0, ge=0.0, description="Predicted wait before processing starts")
+    retry_after_seconds: Optional[float] = Field(default=None, description="Suggested retry delay for rejected requests")
+    reason: Optional[str] = Field(default=None, description="Why the request was degraded or rejected")
+
+class PipelineResult(BaseModel):
+    """Model for the outcome of a cover letter pipeline run."""
+    content: Optional[str] = Field(default=None, description="Generated cover letter or error message")
+    mode: str = Field(default="llm", description="Pipeline mode used to write the letter")
+    draft: Optional[str] = Field(default=None, description="Instant template draft composed while the letter was written")
+    admission: str = Field(default="admitted", description="Admission control decision for the request")
+    degraded: bool = Field(default=False, description="Whether deterministic extraction replaced LLM extraction")
+    timed_out_stages: List[str] = Field(default_factory=list, description="Stages that ran out of time and used a fallback")
+    stages: List[ProcessingStatus] = Field(default_factory=list, description="Finished stage events with timing and token counts")
+    retry_after_seconds: Optional[float] = Field(default=None, description="Suggested retry delay when rejected")
+    coalesced: bool = Field(default=False, description="Whether the result was shared from an identical request already in flight")
+    resume_info: Optional[ResumeExtraction] = Field(default=None, description="Resume extraction the letter was written from")
+    job_info: Optional[JobDescriptionExtraction] = Field(default=None, description="Job extraction the letter was written from")
+    message: Optional[str] = Field(default=None, description="User-facing note about how the request was handled")
+
+class JobStatus(BaseModel):
+    """Model for the status of a background cover letter job."""
+    job_id: str = Field(description="Unique job identifier")
+    state: str = Field(description="One of 'queued', 'running', 'completed', 'failed' or 'cancelled'")
+    draft: Optional[str] = Field(default=None, description="Instant template draft, available while the job runs")
+    progress: float = Field(default=0.0, ge=0.0, le=100.0, description="Progress percentage of the pipeline")
+    events: List[ProcessingStatus] = Field(default_factory=list, description="Stage events emitted so far")
+    error_message: Optional[str] = Field(default=None, description="Error message if the job failed")
+    submitted_at: datetime = Field(default_factory=datetime.now)
+    started_at: Optional[datetime] = Field(default=None)
+    finished_at: Optional[datetime] = Field(default=None)
+
+    class Config:
+        json_encoders = {
+            datetime: lambda v: v.isoformat()
+        }
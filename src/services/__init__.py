@@ -1,5 +1,8 @@
 from .resume_extractor import ResumeExtractor
 from .job_extractor import JobExtractor  
 from .cover_letter_generator import CoverLetterGenerator
+from .template_letter_composer import TemplateLetterComposer
+from .job_matcher import JobMatcher
+from .extraction_batcher import ExtractionBatcher, get_extraction_batcher
 
-__all__ = ['ResumeExtractor', 'JobExtractor', 'CoverLetterGenerator']
\ No newline at end of file
+__all__ = ['ResumeExtractor', 'JobExtractor', 'CoverLetterGenerator', 'TemplateLetterComposer', 'JobMatcher', 'ExtractionBatcher', 'get_extraction_batcher']
\ No newline at end of file
@@ -1,42 +1,55 @@
+import re
 import logging
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from ..models import ResumeExtraction, JobDescriptionExtraction, CoverLetter
-from ..utils import remove_thinking_tags, format_cover_letter, validate_response_quality
+from ..config import RETRIEVAL_CONFIG
+from ..utils import PromptBudget, select_relevant, remove_thinking_tags, format_cover_letter, validate_response_quality, CancellationToken, OperationCancelledError, Deadline, remaining_time
 
 logger = logging.getLogger(__name__)
 
+# The 4 body paragraphs the generation prompt asks for, and what each one does
+PARAGRAPH_ROLES = [
+    ("Opening", "Express interest in the specific position and company"),
+    ("Experience", "Highlight relevant experience and how it aligns with job requirements"),
+    ("Skills & Value", "Emphasize technical skills and what you can contribute"),
+    ("Closing", "Professional closing with call to action")
+]
+_CLOSINGS = ('sincerely', 'best regards', 'kind regards', 'respectfully', 'regards', 'best,', 'thank you,')
+_DATE_PATTERN = re.compile(r"\b20\d\d\b")
+
 class CoverLetterGenerator:
     """Service for generating professional cover letters."""
     
     @staticmethod
-    async def generate_cover_letter(client, resume_info: ResumeExtraction, job_info: JobDescriptionExtraction) -> Optional[str]:
+    async def generate_cover_letter(client, resume_info: ResumeExtraction, job_info: JobDescriptionExtraction,
+                                    cancel_token: Optional[CancellationToken] = None,
+                                    deadline: Optional[Deadline] = None,
+                                    usage: Optional[dict] = None) -> Optional[str]:
         """Enhanced LLM Call: Generate a professional cover letter."""
+        usage = {} if usage is None else usage
         if not resume_info or not job_info:
             logger.error("Missing resume or job information for cover letter generation")
             return None
             
         try:
-            # More detailed and structured prompt
+            evidence = CoverLetterGenerator._select_evidence(resume_info, job_info, client.get_model_name())
             prompt = f"""Write a professional, compelling cover letter for this job application. Use a formal business letter format.
 
 **Job Details:**
 - Position: {job_info.job_title}
 - Company: {job_info.company_name}
-- Key Requirements: {', '.join(job_info.requirements[:3])}
+- Key Requirements: {', '.join(evidence['requirements'])}
 
 **Candidate Profile:**
-- Top Skills: {', '.join(resume_info.skills[:4])}
-- Experience: {resume_info.experience[0] if resume_info.experience else 'Professional software development experience'}
+- Top Skills: {', '.join(evidence['skills'])}
+- Experience: {'; '.join(evidence['experience']) or 'Professional software development experience'}
 - Education: {resume_info.education[0] if resume_info.education else 'Computer Science degree'}
 
 **Instructions:**
 Write a professional cover letter with exactly 4 paragraphs:
 
-1. **Opening**: Express interest in the specific position and company
-2. **Experience**: Highlight relevant experience and how it aligns with job requirements
-3. **Skills & Value**: Emphasize technical skills and what you can contribute
-4. **Closing**: Professional closing with call to action
+{CoverLetterGenerator._paragraph_plan()}
 
 **Requirements:**
 - Professional, confident tone
@@ -48,7 +61,12 @@ Write a professional cover letter with exactly 4 paragraphs:
 
 Write the complete cover letter now:"""
 
-            response = client.generate_response(prompt, max_length=2000)
+            # The letter is a fixed length, so the output budget rather than the input bounds this call
+            budget = PromptBudget("generation", client.get_model_name())
+            response = await client.agenerate_response(prompt, max_length=budget.output_tokens,
+                                                        cancel_token=cancel_token,
+                                                        timeout=remaining_time(deadline), usage=usage,
+                                                        context_tokens=budget.context_tokens(prompt))
             
             if response and validate_response_quality(response, min_length=200):
                 # Clean the response
@@ -61,16 +79,189 @@ Write the complete cover letter now:"""
                     job_info.company_name
                 )
                 
-                logger.info(f"Generated cover letter length: {len(formatted_letter)} characters")
+                logger.info("Generated cover letter length: %s characters", len(formatted_letter))
                 return formatted_letter
                 
             logger.error("Failed to generate valid cover letter response")
+            usage['fallback_used'] = True
             return CoverLetterGenerator._generate_fallback_cover_letter(resume_info, job_info)
             
+        except OperationCancelledError:
+            raise
         except Exception as e:
-            logger.error(f"Error generating cover letter: {e}")
+            logger.error("Error generating cover letter: %s", e)
+            usage['fallback_used'] = True
             return CoverLetterGenerator._generate_fallback_cover_letter(resume_info, job_info)
     
+    @staticmethod
+    def _paragraph_plan() -> str:
+        return "\n\n".join(f"{number}. **{role}**: {purpose}"
+                             for number, (role, purpose) in enumerate(PARAGRAPH_ROLES, start=1))
+
+    @staticmethod
+    def _split_blocks(letter: str) -> List[str]:
+        """Blank-line separated blocks; a greeting or sign-off written next to a paragraph gets its own block."""
+        blocks = []
+        for block in re.split(r"\n\s*\n", letter or ""):
+            current = []
+            for line in block.strip().splitlines():
+                lowered = line.strip().lower()
+                if current and lowered.startswith(_CLOSINGS):
+                    blocks.append("\n".join(current))
+                    current = []
+                current.append(line.rstrip())
+                if len(current) == 1 and lowered.startswith("dear") and lowered.endswith((",", ":")):
+                    blocks.append(current.pop())
+            if current:
+                blocks.append("\n".join(current))
+        return [block for block in blocks if block.strip()]
+
+    @staticmethod
+    def _body_block_indices(blocks: List[str]) -> List[int]:
+        """Indices of the body paragraphs: every block after the greeting and before the sign-off.
+
+        Everything up to the "Dear ..." line (date, addresses, a subject line) is
+        preamble. Without a greeting, only leading date lines are skipped.
+        """
+        first_lines = [block.splitlines()[0].strip().lower() for block in blocks]
+        greeting = next((index for index, (block, first_line) in enumerate(zip(blocks, first_lines))
+                         if len(block.splitlines()) == 1 and first_line.startswith("dear")), None)
+        if greeting is not None:
+            start = greeting + 1
+        else:
+            start = 0
+            while start < len(blocks) and len(blocks[start]) < 40 and _DATE_PATTERN.search(blocks[start]):
+                start += 1
+        indices = []
+        for index in range(start, len(blocks)):
+            if first_lines[index].startswith(_CLOSINGS):
+                break
+            indices.append(index)
+        return indices
+
+    @staticmethod
+    def body_paragraphs(letter: str) -> List[str]:
+        """The body paragraphs of a letter, without the preamble, greeting and sign-off."""
+        blocks = CoverLetterGenerator._split_blocks(letter)
+        return [blocks[index] for index in CoverLetterGenerator._body_block_indices(blocks)]
+
+    @staticmethod
+    async def regenerate_paragraph(client, letter: str, paragraph_index: int, resume_info: ResumeExtraction,
+                                   job_info: JobDescriptionExtraction, instructions: Optional[str] = None,
+                                   cancel_token: Optional[CancellationToken] = None,
+                                   deadline: Optional[Deadline] = None,
+                                   usage: Optional[dict] = None) -> str:
+        """LLM Call: Rewrite one body paragraph of a letter and return the whole letter.
+
+        The prompt holds only the paragraph, its neighbours and the extraction
+        fields its role needs, so the call costs a few hundred tokens instead of
+        a full generation. instructions are the user's wishes for the rewrite.
+        If the model's answer is unusable the letter is returned unchanged and
+        usage gets fallback_used.
+        """
+        usage = {} if usage is None else usage
+        blocks = CoverLetterGenerator._split_blocks(letter)
+        body = CoverLetterGenerator._body_block_indices(blocks)
+        if not 0 <= paragraph_index < len(body):
+            raise ValueError(f"The letter has {len(body)} body paragraphs; there is no paragraph {paragraph_index + 1}")
+
+        try:
+            prompt = CoverLetterGenerator._build_paragraph_prompt(
+                [blocks[index] for index in body], paragraph_index, resume_info, job_info,
+                instructions, client.get_model_name()
+            )
+            budget = PromptBudget("paragraph", client.get_model_name())
+            response = await client.agenerate_response(prompt, max_length=budget.output_tokens,
+                                                        cancel_token=cancel_token,
+                                                        timeout=remaining_time(deadline), usage=usage,
+                                                        context_tokens=budget.context_tokens(prompt))
+            # Keep only the paragraph if the model wrapped it in a greeting or sign-off anyway
+            answer = CoverLetterGenerator._split_blocks(remove_thinking_tags(response or ""))
+            paragraph = " ".join(answer[index] for index in CoverLetterGenerator._body_block_indices(answer)).strip('"')
+            if paragraph and validate_response_quality(paragraph, min_length=40):
+                blocks[body[paragraph_index]] = paragraph
+                logger.info("Rewrote paragraph %s of the cover letter", paragraph_index + 1)
+                return "\n\n".join(blocks)
+
+            logger.error("Failed to generate a valid paragraph; keeping the letter unchanged")
+            usage['fallback_used'] = True
+            return letter
+
+        except OperationCancelledError:
+            raise
+        except Exception as e:
+            logger.error("Error rewriting paragraph: %s", e)
+            usage['fallback_used'] = True
+            return letter
+
+    @staticmethod
+    def _build_paragraph_prompt(paragraphs: List[str], paragraph_index: int, resume_info: ResumeExtraction,
+                                job_info: JobDescriptionExtraction, instructions: Optional[str] = None,
+                                model_name: Optional[str] = None) -> str:
+        """Prompt to rewrite one paragraph, with its neighbours and the extraction fields its role needs."""
+        # The first and last paragraphs open and close the letter however many there are
+        if paragraph_index == 0:
+            role_index = 0
+        elif paragraph_index == len(paragraphs) - 1:
+            role_index = len(PARAGRAPH_ROLES) - 1
+        else:
+            role_index = min(paragraph_index, len(PARAGRAPH_ROLES) - 2)
+        role, purpose = PARAGRAPH_ROLES[role_index]
+
+        evidence = CoverLetterGenerator._select_evidence(resume_info, job_info, model_name)
+        details = [f"- Position: {job_info.job_title}", f"- Company: {job_info.company_name}"]
+        if role == "Opening":
+            details.append(f"- Role Summary: {job_info.description}")
+        elif role == "Experience":
+            details.append(f"- Key Requirements: {', '.join(evidence['requirements'])}")
+            details.append(f"- Experience: {'; '.join(evidence['experience']) or 'Professional software development experience'}")
+        elif role == "Skills & Value":
+            details.append(f"- Key Requirements: {', '.join(evidence['requirements'])}")
+            details.append(f"- Top Skills: {', '.join(evidence['skills'])}")
+
+        previous = paragraphs[paragraph_index - 1] if paragraph_index > 0 else "(none: it follows the greeting)"
+        following = (paragraphs[paragraph_index + 1] if paragraph_index + 1 < len(paragraphs)
+                     else "(none: the sign-off follows)")
+        wishes = f"\n- {instructions.strip()}" if instructions and instructions.strip() else ""
+        detail_lines = "\n".join(details)
+        return f"""Rewrite one paragraph of a cover letter for this job application.
+
+**Job Details:**
+{detail_lines}
+
+**Paragraph to rewrite ({role}: {purpose}):**
+{paragraphs[paragraph_index]}
+
+**Paragraph before it:**
+{previous}
+
+**Paragraph after it:**
+{following}
+
+**Requirements:**
+- Professional, confident tone, 50-100 words
+- Fit between the paragraphs before and after it without repeating them
+- Write only the new paragraph: no greeting, sign-off or explanation{wishes}
+
+Write the new paragraph now:"""
+
+    @staticmethod
+    def _select_evidence(resume_info: ResumeExtraction, job_info: JobDescriptionExtraction,
+                         model_name: Optional[str] = None) -> Dict[str, List[str]]:
+        """Resume items most relevant to the job, and the requirements the resume best covers.
+
+        Each section is packed best-first within its RETRIEVAL_CONFIG token budget,
+        in place of a fixed number of items from the front of each list.
+        """
+        budgets = RETRIEVAL_CONFIG['generation_evidence_tokens']
+        job_query = " ".join([job_info.job_title, job_info.description, *job_info.requirements])
+        resume_query = " ".join([*resume_info.skills, *resume_info.experience, *resume_info.education])
+        return {
+            'requirements': select_relevant(job_info.requirements, resume_query, budgets['requirements'], model_name),
+            'skills': select_relevant(resume_info.skills, job_query, budgets['skills'], model_name),
+            'experience': select_relevant(resume_info.experience, job_query, budgets['experience'], model_name)
+        }
+
     @staticmethod
     def _generate_fallback_cover_letter(resume_info: ResumeExtraction, job_info: JobDescriptionExtraction) -> str:
         """Generate a fallback cover letter when AI generation fails."""
@@ -0,0 +1,235 @@
+import json
+import asyncio
+import logging
+import threading
+import concurrent.futures
+from typing import Any, Dict, List, Optional, Tuple
+from ..models import JobDescriptionExtraction
+from ..utils.metrics import EXTRACTION_BATCH_ITEMS
+from ..utils import PromptBudget, estimate_tokens, truncate_to_tokens, remove_thinking_tags, executor_call, raise_if_cancelled, CancellationToken, OperationCancelledError, Deadline, remaining_time
+from ..config import EXTRACTION_BATCH_CONFIG
+
+logger = logging.getLogger(__name__)
+
+_INSTRUCTIONS = """You are an expert job description parser. Extract key information from each of the numbered job postings below and return ONLY valid JSON.
+
+{postings}
+
+Return ONLY a JSON array with one object per posting, in posting order, with no additional text or explanation:
+[
+    {{
+        "posting": 1,
+        "job_title": "exact job title from the posting",
+        "company_name": "company name from the posting",
+        "requirements": ["requirement 1", "requirement 2", "requirement 3", "requirement 4"],
+        "description": "brief 2-3 sentence summary of the role and responsibilities"
+    }}
+]
+
+Requirements:
+- Extract each posting on its own; never mix details from different postings
+- Extract the exact job title as posted
+- Find the actual company name
+- Focus on technical requirements and qualifications
+- Provide a concise role summary
+- Return only valid JSON, no additional text"""
+
+def _resolve(future: concurrent.futures.Future, result: Optional[JobDescriptionExtraction], share: dict) -> None:
+    # The waiting request may have been cancelled, which cancels its future
+    try:
+        future.set_result((result, share))
+    except concurrent.futures.InvalidStateError:
+        pass
+
+class _Batch:
+    """Postings collected for one provider and model during one window."""
+
+    def __init__(self):
+        self.items: List[Tuple[str, concurrent.futures.Future, Optional[Deadline]]] = []
+        # Set when the batch is full so the leader need not wait out the window
+        self.full = concurrent.futures.Future()
+        # Cancels the batch call once every request in it has stopped waiting
+        self.cancel_token = CancellationToken()
+
+    def timeout(self) -> Optional[float]:
+        """Time for the batch call: the longest any request in it is still waiting, None if one has no deadline."""
+        deadlines = [deadline for _, _, deadline in self.items]
+        if any(deadline is None for deadline in deadlines):
+            return None
+        return max(deadline.remaining() for deadline in deadlines)
+
+    def abandon_if_unwanted(self, _future=None) -> None:
+        if all(future.cancelled() for _, future, _ in self.items):
+            self.cancel_token.cancel("every batched request was cancelled")
+
+class ExtractionBatcher:
+    """Sends concurrent job extractions for the same model as one prompt.
+
+    The first request to arrive becomes the batch leader: it waits up to
+    window_seconds (or until max_batch_size postings have joined), then sends
+    every posting in one prompt asking for a JSON array and hands each waiting
+    request its own extraction. The instructions and the per-call overhead are
+    paid once per batch instead of once per posting. Requests run in their own
+    sessions (threads and event loops), so they wait on thread-safe futures.
+    The call runs on its own thread with the longest deadline of the requests
+    in the batch; each request, the leader included, waits for it only until
+    its own deadline or cancellation.
+
+    extract returns None when the posting was not batched with any other or
+    the batch response did not cover it; the caller then makes its usual
+    single-posting call, so a malformed batch response costs extra calls but
+    never a worse extraction.
+    """
+
+    def __init__(self, window_seconds: Optional[float] = None, max_batch_size: Optional[int] = None):
+        self.window_seconds = EXTRACTION_BATCH_CONFIG['window_seconds'] if window_seconds is None else window_seconds
+        self.max_batch_size = max_batch_size or EXTRACTION_BATCH_CONFIG['max_batch_size']
+        self._open: Dict[Tuple[Any, ...], _Batch] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def accepts(client) -> bool:
+        """Whether extractions for this client's provider are batched."""
+        return EXTRACTION_BATCH_CONFIG['enabled'] and getattr(client, "provider", None) in EXTRACTION_BATCH_CONFIG['providers']
+
+    async def extract(self, client, job_text: str, cancel_token: Optional[CancellationToken] = None,
+                      deadline: Optional[Deadline] = None,
+                      usage: Optional[dict] = None) -> Optional[JobDescriptionExtraction]:
+        """Extract the posting as part of a batch; None means the caller should extract it alone."""
+        usage = {} if usage is None else usage
+        key = (getattr(client, "provider", None), client.get_model_name(), getattr(client, "base_url", None))
+        future = concurrent.futures.Future()
+        with self._lock:
+            batch = self._open.get(key)
+            leader = batch is None
+            if leader:
+                batch = self._open[key] = _Batch()
+            batch.items.append((job_text, future, deadline))
+            if len(batch.items) >= self.max_batch_size:
+                # Later requests start a new batch
+                del self._open[key]
+                batch.full.set_result(True)
+
+        if leader:
+            await asyncio.wait({asyncio.wrap_future(batch.full)}, timeout=self.window_seconds)
+            with self._lock:
+                if self._open.get(key) is batch:
+                    del self._open[key]
+            if len(batch.items) == 1:
+                return None
+            # Not tied to the leader's task, so the leader's deadline or cancellation does not cut it short
+            threading.Thread(target=executor_call(asyncio.run, self._run_batch(client, batch)),
+                             name="extraction-batch", daemon=True).start()
+
+        future.add_done_callback(batch.abandon_if_unwanted)
+        unregister = cancel_token.register(future.cancel) if cancel_token is not None else (lambda: None)
+        try:
+            result, share = await asyncio.wait_for(asyncio.wrap_future(future), timeout=remaining_time(deadline))
+        except asyncio.TimeoutError:
+            return None
+        except asyncio.CancelledError:
+            raise_if_cancelled(cancel_token)
+            raise
+        finally:
+            unregister()
+        if result is not None:
+            usage.update(share)
+        return result
+
+    async def _run_batch(self, client, batch: _Batch) -> None:
+        """Make the batch call and hand each waiting request its extraction, or None to extract alone."""
+        results: List[Optional[JobDescriptionExtraction]] = [None] * len(batch.items)
+        share = {}
+        try:
+            timeout = batch.timeout()
+            if timeout is not None and timeout <= 0:
+                logger.warning("Every batched job extraction ran out of time before the batch call")
+            else:
+                results, share = await self._extract_batch(client, [text for text, _, _ in batch.items],
+                                                           batch.cancel_token, timeout)
+        except OperationCancelledError:
+            logger.info("Batched job extraction cancelled: %s", batch.cancel_token.reason)
+        except Exception as e:
+            logger.error("Batched job extraction failed: %s", e)
+        finally:
+            for (_, waiting, _), result in zip(batch.items, results):
+                _resolve(waiting, result, share)
+
+    async def _extract_batch(self, client, texts: List[str], cancel_token: Optional[CancellationToken],
+                             timeout: Optional[float]) -> Tuple[List[Optional[JobDescriptionExtraction]], dict]:
+        """Extractions per posting, and each posting's share of the call's token usage."""
+        model_name = client.get_model_name()
+        budget = PromptBudget("job_extraction", model_name)
+        output_tokens = budget.output_tokens * len(texts)
+        # Each posting gets the single-posting budget, as long as all of them and the answers fit the window
+        reserved = estimate_tokens(_INSTRUCTIONS, model_name)
+        per_posting = min(budget.available_tokens(_INSTRUCTIONS),
+                          max(budget.window - output_tokens - reserved, 0) // len(texts))
+        postings = "\n\n".join(f"Job Posting {number}:\n{truncate_to_tokens(text, per_posting, model_name)}"
+                               for number, text in enumerate(texts, start=1))
+        prompt = _INSTRUCTIONS.format(postings=postings)
+
+        batch_usage = {}
+        try:
+            response_text = await client.agenerate_response(prompt, max_length=output_tokens, cancel_token=cancel_token,
+                                                             timeout=timeout, usage=batch_usage,
+                                                             context_tokens=budget.context_tokens(prompt, output_tokens))
+        except OperationCancelledError:
+            raise
+        except Exception as e:
+            logger.error("Batched job extraction failed: %s", e)
+            EXTRACTION_BATCH_ITEMS.inc(len(texts), outcome="failed")
+            return [None] * len(texts), {}
+
+        results = self._parse_response(response_text, len(texts))
+        extracted = sum(result is not None for result in results)
+        EXTRACTION_BATCH_ITEMS.inc(extracted, outcome="extracted")
+        if extracted < len(texts):
+            EXTRACTION_BATCH_ITEMS.inc(len(texts) - extracted, outcome="failed")
+        logger.info("Batched job extraction of %s postings: %s extracted", len(texts), extracted)
+
+        share = {'batched': len(texts)}
+        for name in ("prompt_tokens", "completion_tokens"):
+            if batch_usage.get(name) is not None:
+                share[name] = batch_usage[name] // len(texts)
+        return results, share
+
+    @staticmethod
+    def _parse_response(response_text: str, count: int) -> List[Optional[JobDescriptionExtraction]]:
+        """Extractions per posting from the model's JSON array; None for postings it does not cover."""
+        results: List[Optional[JobDescriptionExtraction]] = [None] * count
+        text = remove_thinking_tags(response_text or "")
+        start, end = text.find("["), text.rfind("]")
+        if start == -1 or end <= start:
+            return results
+        try:
+            parsed = json.loads(text[start:end + 1])
+        except json.JSONDecodeError as e:
+            logger.warning("Batched job extraction returned invalid JSON: %s", e)
+            return results
+        objects = [item for item in parsed if isinstance(item, dict)] if isinstance(parsed, list) else []
+
+        numbered = all(isinstance(item.get("posting"), int) for item in objects)
+        if not numbered and len(objects) != count:
+            # Without posting numbers, answers can only be matched to postings by position
+            return results
+        for position, item in enumerate(objects):
+            index = item.pop("posting") - 1 if numbered else position
+            if not 0 <= index < count or results[index] is not None:
+                continue
+            try:
+                results[index] = JobDescriptionExtraction(**item)
+            except Exception as e:
+                logger.warning("Batched extraction for posting %s is invalid: %s", index + 1, e)
+        return results
+
+_batcher: Optional[ExtractionBatcher] = None
+_batcher_lock = threading.Lock()
+
+def get_extraction_batcher() -> ExtractionBatcher:
+    """Get the process-wide job extraction batcher."""
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = ExtractionBatcher()
+        return _batcher
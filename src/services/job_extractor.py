@@ -1,27 +1,158 @@
 import logging
 from typing import Optional
 from ..models import JobDescriptionExtraction, ExtractionResult
-from ..utils import clean_json_response, parse_json_safely, extract_keywords, truncate_text
-from ..config import REQUIREMENT_KEYWORDS
+from ..clients.base_client import is_error_response
+from ..utils.metrics import JSON_PARSE_FAILURES, record_cache_lookup
+from ..utils import PromptBudget, SingleFlight, flight_key, strip_boilerplate, get_job_extraction_index, clean_json_response, parse_json_safely, truncate_text, CancellationToken, OperationCancelledError, Deadline, remaining_time
+from ..config import NEAR_DUPLICATE_CONFIG, REQUIREMENT_KEYWORDS
+from .extraction_batcher import get_extraction_batcher
 
 logger = logging.getLogger(__name__)
 
+# Concurrent extractions of the same posting with the same model run once
+_extraction_flight = SingleFlight("job_extraction")
+
 class JobExtractor:
     """Service for extracting structured information from job descriptions."""
     
     @staticmethod
-    async def extract_job_description_info(client, job_content: str) -> Optional[JobDescriptionExtraction]:
-        """Enhanced LLM Call: Extract structured information from job description text."""
+    async def extract_job_description_info(client, job_content: str, cancel_token: Optional[CancellationToken] = None,
+                                           deadline: Optional[Deadline] = None,
+                                           usage: Optional[dict] = None) -> Optional[JobDescriptionExtraction]:
+        """Enhanced LLM Call: Extract structured information from job description text.
+
+        Boilerplate (EEO statements, benefits, cookie banners, repeated company
+        blurbs) is removed first; usage gets chars_saved and tokens_saved. A
+        near-duplicate of an already extracted posting reuses its requirements
+        and description without a model call (the title and company are read
+        from this posting), and usage gets its similarity as reused_similarity.
+        With EXTRACTION_BATCHING on, postings extracted concurrently for the
+        same model may share one prompt (see ExtractionBatcher); usage then
+        gets the batch size as batched. An identical extraction already in
+        flight is waited for instead of repeated; usage then gets coalesced.
+        A fallback extraction is not shared.
+        """
+        usage = {} if usage is None else usage
+        job_content, report = strip_boilerplate(job_content, client.get_model_name())
+        if report['chars_saved']:
+            usage['chars_saved'] = report['chars_saved']
+            usage['tokens_saved'] = report['tokens_saved']
+
+        job_index = get_job_extraction_index() if NEAR_DUPLICATE_CONFIG['enabled'] and job_content else None
+        signature = job_index.signature(job_content) if job_index is not None else None
+        if job_index is not None:
+            match = job_index.query(job_content, signature)
+            record_cache_lookup("job_extraction", match is not None)
+            if match is not None:
+                extraction, similarity = match
+                logger.info("Reusing the extraction of a near-duplicate job posting (similarity %.2f)", similarity)
+                usage['reused_similarity'] = round(similarity, 3)
+                return JobExtractor._reuse_extraction(extraction, job_content)
+
+        if deadline is not None and deadline.expired:
+            logger.warning("No time left for LLM job extraction, using fallback extraction")
+            usage['fallback_used'] = True
+            return JobExtractor._fallback_job_extraction(job_content)
+
         if not job_content or len(job_content.strip()) < 50:
             logger.warning("Job content is too short for meaningful extraction")
+            usage['fallback_used'] = True
             return JobExtractor._fallback_job_extraction(job_content)
-        
+
+        key = flight_key(getattr(client, "provider", None), client.get_model_name(),
+                         getattr(client, "base_url", None), job_content)
+        try:
+            return await _extraction_flight.do(
+                key, lambda: JobExtractor._extract_with_model(client, job_content, job_index, signature,
+                                                              cancel_token, deadline, usage),
+                usage=usage, cancel_token=cancel_token, timeout=remaining_time(deadline),
+                # A fallback is not worth sharing; waiting callers try the model themselves
+                shareable=lambda _: not usage.get('fallback_used')
+            )
+        except TimeoutError:
+            logger.warning("Identical extraction still running when time ran out, using fallback extraction")
+            usage['fallback_used'] = True
+            return JobExtractor._fallback_job_extraction(job_content)
+
+    @staticmethod
+    async def _extract_with_model(client, job_content: str, job_index, signature,
+                                  cancel_token: Optional[CancellationToken], deadline: Optional[Deadline],
+                                  usage: dict) -> JobDescriptionExtraction:
+        """Extract the posting with the model, falling back to deterministic parsing on failure."""
         try:
-            # Improved prompt for better extraction
-            prompt = f"""You are an expert job description parser. Extract key information and return ONLY valid JSON.
+            batcher = get_extraction_batcher()
+            if batcher.accepts(client):
+                extraction = await batcher.extract(client, job_content, cancel_token=cancel_token,
+                                                   deadline=deadline, usage=usage)
+                if extraction is not None:
+                    if job_index is not None:
+                        job_index.add(job_content, extraction.dict(), signature)
+                    return extraction
+                if deadline is not None and deadline.expired:
+                    logger.warning("No time left after batched job extraction, using fallback extraction")
+                    usage['fallback_used'] = True
+                    return JobExtractor._fallback_job_extraction(job_content)
+
+            budget = PromptBudget("job_extraction", client.get_model_name())
+            posting_text = budget.fit(job_content, reserved=JobExtractor._build_prompt(""))
+            prompt = JobExtractor._build_prompt(posting_text)
+
+            response_text = await client.agenerate_response(prompt, max_length=budget.output_tokens,
+                                                             cancel_token=cancel_token,
+                                                             timeout=remaining_time(deadline), usage=usage,
+                                                             context_tokens=budget.context_tokens(prompt))
+            logger.info("Job extraction response length: %s", len(response_text))
+            
+            # Enhanced JSON extraction
+            if response_text and not is_error_response(response_text):
+                json_text = clean_json_response(response_text)
+                if json_text:
+                    parsed_json = parse_json_safely(json_text)
+                    if parsed_json:
+                        logger.debug("Successfully parsed JSON: %s", parsed_json)
+                        extraction = JobDescriptionExtraction(**parsed_json)
+                        # Only model extractions are reused; fallbacks are cheap to redo and may improve
+                        if job_index is not None:
+                            job_index.add(job_content, extraction.dict(), signature)
+                        return extraction
+                JSON_PARSE_FAILURES.inc(extraction="job")
+            
+            # Enhanced fallback parsing
+            logger.info("Using fallback extraction method")
+            usage['fallback_used'] = True
+            return JobExtractor._fallback_job_extraction(job_content)
+            
+        except OperationCancelledError:
+            raise
+        except Exception as e:
+            logger.error("Error extracting job info: %s", e)
+            usage['fallback_used'] = True
+            return JobExtractor._fallback_job_extraction(job_content)
+
+    @staticmethod
+    def _reuse_extraction(extraction: dict, job_content: str) -> JobDescriptionExtraction:
+        """A near-duplicate's extraction adapted to this posting.
+
+        Reposts of the same role by another company or under another title
+        share almost all of their text, so only the requirements and description
+        are reused. The title and company are kept only when they appear in
+        this posting, and are otherwise parsed from it.
+        """
+        text = job_content.lower()
+        parsed = None
+        for field in ("job_title", "company_name"):
+            if extraction[field].lower() not in text:
+                parsed = parsed or JobExtractor._fallback_job_extraction(job_content)
+                extraction = {**extraction, field: getattr(parsed, field)}
+        return JobDescriptionExtraction(**extraction)
+
+    @staticmethod
+    def _build_prompt(posting_text: str) -> str:
+        """Job extraction prompt around the (already budgeted) posting text."""
+        return f"""You are an expert job description parser. Extract key information and return ONLY valid JSON.
 
 Job Description:
-{job_content[:3000]}
+{posting_text}
 
 Return ONLY this JSON format with no additional text or explanation:
 {{
@@ -37,26 +168,6 @@ Requirements:
 - Focus on technical requirements and qualifications
 - Provide a concise role summary
 - Return only valid JSON, no additional text"""
-            
-            response_text = client.generate_response(prompt, max_length=1000)
-            logger.info(f"Job extraction response length: {len(response_text)}")
-            
-            # Enhanced JSON extraction
-            if response_text and not response_text.startswith(("Model", "API Error", "Request", "Cannot", "Connection")):
-                json_text = clean_json_response(response_text)
-                if json_text:
-                    parsed_json = parse_json_safely(json_text)
-                    if parsed_json:
-                        logger.debug(f"Successfully parsed JSON: {parsed_json}")
-                        return JobDescriptionExtraction(**parsed_json)
-            
-            # Enhanced fallback parsing
-            logger.info("Using fallback extraction method")
-            return JobExtractor._fallback_job_extraction(job_content)
-            
-        except Exception as e:
-            logger.error(f"Error extracting job info: {e}")
-            return JobExtractor._fallback_job_extraction(job_content)
 
     @staticmethod
     def _fallback_job_extraction(job_content: str) -> JobDescriptionExtraction:
@@ -90,6 +201,8 @@ Requirements:
         # Look for company name in first few lines
         for line in lines[:10]:
             line_stripped = line.strip()
+            if line_stripped == job_title:
+                continue
             if len(line_stripped) > 2 and len(line_stripped) < 50:
                 # Skip obvious non-company lines
                 skip_indicators = ['job', 'position', 'role', 'we are', 'about', 'description']
@@ -99,23 +212,21 @@ Requirements:
                         company_name = line_stripped
                         break
         
-        # Extract requirements
-        requirements = extract_keywords(job_content, REQUIREMENT_KEYWORDS)
-        
-        # If no keyword-based requirements, extract from requirement sections
-        if not requirements:
-            for i, line in enumerate(lines):
-                line_lower = line.strip().lower()
-                if any(req_word in line_lower for req_word in REQUIREMENT_KEYWORDS):
-                    # Look at next few lines for actual requirements
-                    for j in range(i, min(i+5, len(lines))):
-                        req_line = lines[j].strip()
-                        if len(req_line) > 15 and len(req_line) < 200:
-                            requirements.append(req_line)
-                            if len(requirements) >= 4:
-                                break
-                    if len(requirements) >= 4:
-                        break
+        # Extract requirement lines from requirement sections; matching keywords
+        # alone would return the keywords themselves rather than the requirements
+        requirements = []
+        for i, line in enumerate(lines):
+            line_lower = line.strip().lower()
+            if any(req_word in line_lower for req_word in REQUIREMENT_KEYWORDS):
+                # Look at next few lines for actual requirements
+                for j in range(i, min(i+5, len(lines))):
+                    req_line = lines[j].strip()
+                    if len(req_line) > 15 and len(req_line) < 200 and req_line not in requirements:
+                        requirements.append(req_line)
+                        if len(requirements) >= 4:
+                            break
+                if len(requirements) >= 4:
+                    break
         
         # Generate description
         description = truncate_text(job_content, 400, "...")
@@ -0,0 +1,115 @@
+import logging
+from collections import Counter
+from typing import List, Optional, Sequence, Tuple
+from ..models import ResumeExtraction
+from ..utils.retrieval import tokenize
+from ..utils.lazy_imports import numpy
+from ..config import MATCH_SCORING_CONFIG, SKILL_KEYWORDS
+
+logger = logging.getLogger(__name__)
+
+class JobMatcher:
+    """Scores a resume against many job postings in one vectorized pass.
+
+    The postings are indexed once into a sparse TF-IDF matrix, kept as flat
+    NumPy arrays of (posting, term, weight) entries, so scoring a resume is a
+    gather and a bincount over those entries rather than a loop over postings.
+    The fit score mixes the TF-IDF cosine similarity with skill coverage: the
+    share of the skills a posting mentions (from SKILL_KEYWORDS and the
+    resume's own skills) that the resume has. Use top_k to pick the postings
+    worth spending model calls on.
+    """
+
+    def __init__(self, job_texts: Sequence[str]):
+        np = numpy()
+        self._np = np
+        self.job_texts = list(job_texts)
+        self.vocabulary = {}
+        rows, columns, counts = [], [], []
+        for row, text in enumerate(self.job_texts):
+            for term, count in Counter(tokenize(text)).items():
+                rows.append(row)
+                columns.append(self.vocabulary.setdefault(term, len(self.vocabulary)))
+                counts.append(count)
+        self._rows = np.array(rows, dtype=np.intp)
+        self._columns = np.array(columns, dtype=np.intp)
+
+        postings = len(self.job_texts)
+        document_frequency = np.bincount(self._columns, minlength=len(self.vocabulary))
+        self._idf = np.log((1 + postings) / (1 + document_frequency)) + 1
+        # Sublinear term frequency, then every posting's vector is scaled to unit length
+        weights = (1 + np.log(np.array(counts, dtype=np.float64))) * self._idf[self._columns]
+        norms = np.sqrt(np.bincount(self._rows, weights=weights ** 2, minlength=postings))
+        self._weights = weights / np.maximum(norms[self._rows], 1e-12)
+
+    def __len__(self) -> int:
+        return len(self.job_texts)
+
+    @staticmethod
+    def _resume_text(resume_info: ResumeExtraction) -> str:
+        return " ".join([*resume_info.skills, *resume_info.experience, *resume_info.education])
+
+    def text_similarity(self, resume_text: str):
+        """TF-IDF cosine similarity of the resume text to every posting."""
+        np = self._np
+        query = np.zeros(len(self.vocabulary))
+        for term, count in Counter(tokenize(resume_text)).items():
+            column = self.vocabulary.get(term)
+            if column is not None:
+                query[column] = (1 + np.log(count)) * self._idf[column]
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return np.zeros(len(self.job_texts))
+        return np.bincount(self._rows, weights=self._weights * query[self._columns] / norm,
+                           minlength=len(self.job_texts))
+
+    def skill_coverage(self, resume_info: ResumeExtraction, resume_text: Optional[str] = None):
+        """Share of the taxonomy skills each posting mentions that the resume has (0 if it mentions none)."""
+        np = self._np
+        resume_terms = set(tokenize(resume_text or self._resume_text(resume_info)))
+        skills = list(dict.fromkeys(
+            tuple(tokenize(skill)) for skill in [*SKILL_KEYWORDS, *resume_info.skills] if tokenize(skill)
+        ))
+        # A skill made of terms no posting uses cannot be mentioned by any of them
+        skills = [skill for skill in skills if all(term in self.vocabulary for term in skill)]
+        if not skills:
+            return np.zeros(len(self.job_texts))
+
+        skill_terms = list(dict.fromkeys(term for skill in skills for term in skill))
+        term_position = np.full(len(self.vocabulary), -1, dtype=np.intp)
+        term_position[[self.vocabulary[term] for term in skill_terms]] = np.arange(len(skill_terms))
+        # Postings x skill terms: which of the terms each posting contains
+        positions = term_position[self._columns]
+        present = positions >= 0
+        has_term = np.zeros((len(self.job_texts), len(skill_terms)))
+        has_term[self._rows[present], positions[present]] = 1.0
+
+        term_index = {term: index for index, term in enumerate(skill_terms)}
+        skill_terms_matrix = np.zeros((len(skill_terms), len(skills)))
+        for column, skill in enumerate(skills):
+            skill_terms_matrix[[term_index[term] for term in skill], column] = 1.0
+        # A multi-word skill is mentioned when all of its terms are
+        mentioned = has_term @ skill_terms_matrix >= np.array([len(skill) for skill in skills])
+
+        resume_has = np.array([all(term in resume_terms for term in skill) for skill in skills])
+        mentioned_count = mentioned.sum(axis=1)
+        return np.where(mentioned_count > 0, (mentioned & resume_has).sum(axis=1) / np.maximum(mentioned_count, 1), 0.0)
+
+    def score(self, resume_info: ResumeExtraction, resume_text: Optional[str] = None):
+        """Fit score in [0, 1] of the resume for every posting, in posting order."""
+        resume_text = resume_text or self._resume_text(resume_info)
+        return (MATCH_SCORING_CONFIG['text_weight'] * self.text_similarity(resume_text)
+                + MATCH_SCORING_CONFIG['skill_weight'] * self.skill_coverage(resume_info, resume_text))
+
+    def top_k(self, resume_info: ResumeExtraction, k: Optional[int] = None,
+              resume_text: Optional[str] = None) -> List[Tuple[int, float]]:
+        """(posting index, fit score) of the k best-fitting postings, best first."""
+        np = self._np
+        k = min(k or MATCH_SCORING_CONFIG['top_k'], len(self.job_texts))
+        if k <= 0:
+            return []
+        scores = self.score(resume_info, resume_text)
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        logger.info("Selected %s of %s postings; best fit %.2f", k, len(self.job_texts), scores[best[0]])
+        return [(int(index), float(scores[index])) for index in best]
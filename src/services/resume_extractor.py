@@ -1,27 +1,223 @@
+import re
+import asyncio
 import logging
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from ..models import ResumeExtraction, ExtractionResult
-from ..utils import clean_json_response, parse_json_safely, extract_keywords, extract_email, extract_phone
-from ..config import SKILL_KEYWORDS, EXPERIENCE_KEYWORDS, EDUCATION_KEYWORDS
+from ..clients.base_client import is_error_response
+from ..utils.metrics import JSON_PARSE_FAILURES
+from ..utils import PromptBudget, SingleFlight, get_call_slots, flight_key, BM25Index, estimate_tokens, select_resume_evidence, pack_chunks, split_resume_sections, clean_json_response, parse_json_safely, extract_keywords, extract_email, extract_phone, CancellationToken, OperationCancelledError, Deadline, remaining_time
+from ..config import CHUNKED_EXTRACTION_CONFIG, RESUME_SECTION_HEADINGS, SKILL_KEYWORDS, EXPERIENCE_KEYWORDS, EDUCATION_KEYWORDS
 
 logger = logging.getLogger(__name__)
 
+# Concurrent extractions of the same resume with the same model run once
+_extraction_flight = SingleFlight("resume_extraction")
+
 class ResumeExtractor:
     """Service for extracting structured information from resume text."""
     
     @staticmethod
-    async def extract_resume_info(client, pdf_text: str) -> Optional[ResumeExtraction]:
-        """Enhanced LLM Call: Extract structured information from resume text."""
+    async def extract_resume_info(client, pdf_text: str, cancel_token: Optional[CancellationToken] = None,
+                                  deadline: Optional[Deadline] = None,
+                                  usage: Optional[dict] = None,
+                                  job_text: Optional[str] = None) -> Optional[ResumeExtraction]:
+        """Enhanced LLM Call: Extract structured information from resume text.
+
+        A resume too long for the prompt budget is extracted in chunks, split at
+        its section headings, that run concurrently and are merged afterwards;
+        this needs a backend that serves more than one call at once. Otherwise
+        it is cut to the lines most relevant to job_text (the posting), or to
+        its first lines without one. An identical
+        extraction already in flight is waited for instead of repeated; usage
+        then gets coalesced. A fallback extraction is not shared.
+        """
+        usage = {} if usage is None else usage
+        if deadline is not None and deadline.expired:
+            logger.warning("No time left for LLM resume extraction, using fallback extraction")
+            usage['fallback_used'] = True
+            return ResumeExtractor._fallback_resume_extraction(pdf_text)
+
         if not pdf_text or len(pdf_text.strip()) < 50:
             logger.warning("PDF text is too short for meaningful extraction")
+            usage['fallback_used'] = True
             return ResumeExtractor._fallback_resume_extraction(pdf_text)
-        
+
+        model_name = client.get_model_name()
+        budget = PromptBudget("resume_extraction", model_name)
+        available = budget.available_tokens(ResumeExtractor._build_prompt(""))
+        # The posting only shapes the prompt when the resume has to be cut down, so a resume that
+        # fits is extracted once however many postings it is paired with
+        fits = estimate_tokens(pdf_text, model_name) <= available
+        key = flight_key(getattr(client, "provider", None), model_name, getattr(client, "base_url", None),
+                         pdf_text, "" if fits else job_text)
+        try:
+            return await _extraction_flight.do(
+                key, lambda: ResumeExtractor._extract_with_model(client, pdf_text, job_text, budget, available,
+                                                                 cancel_token, deadline, usage),
+                usage=usage, cancel_token=cancel_token, timeout=remaining_time(deadline),
+                # Followers with time left extract for themselves rather than take the leader's fallback
+                shareable=lambda _: not usage.get('fallback_used')
+            )
+        except TimeoutError:
+            logger.warning("Identical extraction still running when time ran out, using fallback extraction")
+            usage['fallback_used'] = True
+            return ResumeExtractor._fallback_resume_extraction(pdf_text)
+
+    @staticmethod
+    async def _extract_with_model(client, pdf_text: str, job_text: Optional[str], budget: PromptBudget,
+                                  available: int, cancel_token: Optional[CancellationToken],
+                                  deadline: Optional[Deadline], usage: dict) -> ResumeExtraction:
+        """Extract the resume with the model, falling back to deterministic parsing on failure."""
+        model_name = budget.model_name
         try:
-            # Improved prompt with better instructions
-            prompt = f"""You are an expert resume parser. Extract information from this resume and return ONLY valid JSON.
+            # Chunks handled one at a time would only be slower than a single call on the cut-down resume
+            if (CHUNKED_EXTRACTION_CONFIG['enabled'] and CHUNKED_EXTRACTION_CONFIG['max_concurrency'] > 1
+                    and estimate_tokens(pdf_text, model_name) > available):
+                chunks = ResumeExtractor._chunk_resume(pdf_text, job_text, available, model_name)
+                if len(chunks) > 1:
+                    return await ResumeExtractor._extract_in_chunks(client, pdf_text, chunks, budget,
+                                                                    cancel_token, deadline, usage)
+
+            resume_text = select_resume_evidence(pdf_text, job_text, available, model_name)
+            prompt = ResumeExtractor._build_prompt(resume_text)
+
+            response_text = await client.agenerate_response(prompt, max_length=budget.output_tokens,
+                                                             cancel_token=cancel_token,
+                                                             timeout=remaining_time(deadline), usage=usage,
+                                                             context_tokens=budget.context_tokens(prompt))
+            logger.info("Resume extraction response length: %s", len(response_text))
+            
+            # Enhanced JSON extraction
+            parsed_json = ResumeExtractor._parse_response(response_text)
+            if parsed_json:
+                logger.debug("Successfully parsed JSON: %s", parsed_json)
+                return ResumeExtraction(**parsed_json)
+                    
+            # Enhanced fallback parsing
+            logger.info("Using fallback extraction method")
+            usage['fallback_used'] = True
+            return ResumeExtractor._fallback_resume_extraction(pdf_text)
+            
+        except OperationCancelledError:
+            raise
+        except Exception as e:
+            logger.error("Error extracting resume info: %s", e)
+            usage['fallback_used'] = True
+            return ResumeExtractor._fallback_resume_extraction(pdf_text)
+
+    @staticmethod
+    def _parse_response(response_text: str) -> Optional[Dict[str, Any]]:
+        """JSON object of an extraction response; None for a client error message or unparseable output."""
+        if not response_text or is_error_response(response_text):
+            return None
+        json_text = clean_json_response(response_text)
+        parsed_json = parse_json_safely(json_text) if json_text else None
+        if not isinstance(parsed_json, dict) or not parsed_json:
+            JSON_PARSE_FAILURES.inc(extraction="resume")
+            return None
+        return parsed_json
+
+    @staticmethod
+    def _chunk_resume(pdf_text: str, job_text: Optional[str], max_tokens: int,
+                      model_name: Optional[str] = None) -> List[str]:
+        """Resume split at section headings into chunks of at most max_tokens.
+
+        Past max_chunks, the first chunk (name and contact details) is kept along
+        with the chunks most relevant to the job posting, in document order.
+        """
+        chunks = pack_chunks(split_resume_sections(pdf_text, RESUME_SECTION_HEADINGS), max_tokens, model_name)
+        max_chunks = max(CHUNKED_EXTRACTION_CONFIG['max_chunks'], 1)
+        if len(chunks) <= max_chunks:
+            return chunks
+        kept = {0} | {index + 1 for index in BM25Index(chunks[1:]).rank(job_text or "")[:max_chunks - 1]}
+        logger.warning("Resume needs %s chunks; keeping the %s most relevant to the job", len(chunks), max_chunks)
+        return [chunk for index, chunk in enumerate(chunks) if index in kept]
+
+    @staticmethod
+    async def _extract_in_chunks(client, pdf_text: str, chunks: List[str], budget: PromptBudget,
+                                 cancel_token: Optional[CancellationToken], deadline: Optional[Deadline],
+                                 usage: dict) -> ResumeExtraction:
+        """Extract every chunk concurrently, within the backend's parallel slots, and merge the results.
+
+        The slots are shared by every chunked extraction on the same backend, so
+        concurrent requests together stay within max_concurrency chunk calls.
+        """
+        slots = get_call_slots(client, CHUNKED_EXTRACTION_CONFIG['max_concurrency'])
+
+        async def extract_chunk(chunk: str):
+            chunk_usage = {}
+            async with slots.slot(cancel_token):
+                prompt = ResumeExtractor._build_prompt(chunk)
+                response_text = await client.agenerate_response(prompt, max_length=budget.output_tokens,
+                                                                 cancel_token=cancel_token,
+                                                                 timeout=remaining_time(deadline), usage=chunk_usage,
+                                                                 context_tokens=budget.context_tokens(prompt))
+            return ResumeExtractor._parse_response(response_text), chunk_usage
+
+        logger.info("Extracting resume in %s chunks", len(chunks))
+        results = await asyncio.gather(*(extract_chunk(chunk) for chunk in chunks), return_exceptions=True)
+        parts = []
+        for result in results:
+            if isinstance(result, (OperationCancelledError, asyncio.CancelledError)):
+                raise result
+            if isinstance(result, Exception):
+                logger.error("Error extracting resume chunk: %s", result)
+                continue
+            parsed_json, chunk_usage = result
+            # Token counts add up across chunks, so the stage reports the whole extraction
+            for key in ("prompt_tokens", "completion_tokens", "eval_duration_ms"):
+                if chunk_usage.get(key) is not None:
+                    usage[key] = usage.get(key, 0) + chunk_usage[key]
+            if parsed_json:
+                parts.append(parsed_json)
+        usage['chunks'] = len(chunks)
+
+        fallback = ResumeExtractor._fallback_resume_extraction(pdf_text)
+        if not parts:
+            logger.info("Using fallback extraction method")
+            usage['fallback_used'] = True
+            return fallback
+        return ResumeExtractor.merge_extractions(parts, fallback)
+
+    @staticmethod
+    def merge_extractions(parts: List[Dict[str, Any]], fallback: ResumeExtraction) -> ResumeExtraction:
+        """Merge partial extractions of one resume, dropping duplicate entries.
+
+        Entries are compared case- and punctuation-insensitively and keep their
+        first spelling and chunk order. Fields no chunk filled in, and contact
+        details without an email address or phone number, come from fallback.
+        """
+        def merged(field: str) -> List[str]:
+            entries, seen = [], set()
+            for part in parts:
+                values = part.get(field) or []
+                for value in [values] if isinstance(values, str) else values:
+                    entry = str(value).strip()
+                    key = re.sub(r'[^a-z0-9+#]+', ' ', entry.lower()).strip()
+                    if key and key not in seen:
+                        seen.add(key)
+                        entries.append(entry)
+            return entries
+
+        contact_info = next(
+            (str(part['contact_info']).strip() for part in parts
+             if part.get('contact_info') and (extract_email(str(part['contact_info'])) or extract_phone(str(part['contact_info'])))),
+            fallback.contact_info
+        )
+        return ResumeExtraction(
+            experience=merged('experience') or fallback.experience,
+            skills=merged('skills') or fallback.skills,
+            education=merged('education') or fallback.education,
+            contact_info=contact_info
+        )
+
+    @staticmethod
+    def _build_prompt(resume_text: str) -> str:
+        """Resume extraction prompt around the (already budgeted) resume text."""
+        return f"""You are an expert resume parser. Extract information from this resume and return ONLY valid JSON.
 
 Resume Text:
-{pdf_text[:2500]}
+{resume_text}
 
 Return ONLY this JSON format with no additional text or explanation:
 {{
@@ -37,26 +233,6 @@ Requirements:
 - Focus on technical skills relevant to software development
 - Include actual contact information if present
 - Return only valid JSON, no additional text"""
-            
-            response_text = client.generate_response(prompt, max_length=1000)
-            logger.info(f"Resume extraction response length: {len(response_text)}")
-            
-            # Enhanced JSON extraction
-            if response_text and not response_text.startswith(("Model", "API Error", "Request", "Cannot", "Connection")):
-                json_text = clean_json_response(response_text)
-                if json_text:
-                    parsed_json = parse_json_safely(json_text)
-                    if parsed_json:
-                        logger.debug(f"Successfully parsed JSON: {parsed_json}")
-                        return ResumeExtraction(**parsed_json)
-                    
-            # Enhanced fallback parsing
-            logger.info("Using fallback extraction method")
-            return ResumeExtractor._fallback_resume_extraction(pdf_text)
-            
-        except Exception as e:
-            logger.error(f"Error extracting resume info: {e}")
-            return ResumeExtractor._fallback_resume_extraction(pdf_text)
 
     @staticmethod
     def _fallback_resume_extraction(pdf_text: str) -> ResumeExtraction:
@@ -101,10 +277,10 @@ Requirements:
             if any(edu in line_lower for edu in EDUCATION_KEYWORDS):
                 education.append(line_stripped)
         
-        # Remove duplicates and limit results
-        skills = list(set(skills))[:8]
-        experience = list(set(experience))[:4]
-        education = list(set(education))[:3]
+        # Remove duplicates (keeping document order) and limit results
+        skills = list(dict.fromkeys(skills))[:8]
+        experience = list(dict.fromkeys(experience))[:4]
+        education = list(dict.fromkeys(education))[:3]
         
         return ResumeExtraction(
             experience=experience if experience else ["Professional software development experience"],
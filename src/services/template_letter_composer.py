@@ -0,0 +1,134 @@
+import re
+import logging
+from typing import List, Tuple
+from ..models import ResumeExtraction, JobDescriptionExtraction
+from ..utils import format_cover_letter
+
+logger = logging.getLogger(__name__)
+
+# Opening sentences keyed by how well the candidate's skills cover the requirements
+OPENING_TEMPLATES = {
+    'strong': "I am excited to apply for the {job_title} position at {company_name}. My hands-on work with {matched_skills} lines up closely with what your team is looking for.",
+    'partial': "I am writing to apply for the {job_title} position at {company_name}. My background in {matched_skills} gives me a solid starting point for the work this role involves.",
+    'none': "I am writing to express my interest in the {job_title} position at {company_name}. I bring a track record of learning quickly and delivering reliable results."
+}
+
+EXPERIENCE_TEMPLATES = {
+    'with_requirements': "In my most recent role as {experience}, I built the kind of experience your posting asks for, including {requirements}.",
+    'without_requirements': "In my most recent role as {experience}, I took ownership of projects from design through delivery.",
+    'additional': " Before that, as {experience}, I strengthened my ability to work across teams and ship dependable software."
+}
+
+SKILLS_TEMPLATES = {
+    'matched': "My technical toolkit includes {matched_skills}, which map directly to your requirements.",
+    'additional': " I also work with {other_skills}, so I can contribute beyond the core of the role.",
+    'unmatched': "My technical toolkit includes {other_skills}, and I am ready to ramp up quickly on {gaps}.",
+    'education': " My education, {education}, gave me a strong foundation for this work."
+}
+
+CLOSING_TEMPLATE = "I would welcome the chance to discuss how I can contribute to {company_name} as your next {job_title}. Thank you for your time and consideration, and I look forward to hearing from you."
+
+class TemplateLetterComposer:
+    """Deterministic cover letter composer that makes no model calls."""
+
+    @staticmethod
+    def compose_cover_letter(resume_info: ResumeExtraction, job_info: JobDescriptionExtraction) -> str:
+        """Compose a cover letter by filling paragraph templates from the extractions."""
+        matches, gaps = TemplateLetterComposer.match_requirements(resume_info.skills, job_info.requirements)
+        matched_skills = list(dict.fromkeys(skill for _, skill in matches))
+        if not matched_skills:
+            # Terse requirement lists can miss skills the posting still mentions
+            matched_skills = [skill for skill in resume_info.skills
+                              if TemplateLetterComposer._mentions(job_info.description, skill)]
+        other_skills = [skill for skill in resume_info.skills if skill not in matched_skills]
+
+        if len(matched_skills) >= 2:
+            strength = 'strong'
+        elif matched_skills:
+            strength = 'partial'
+        else:
+            strength = 'none'
+
+        opening = OPENING_TEMPLATES[strength].format(
+            job_title=job_info.job_title,
+            company_name=job_info.company_name,
+            matched_skills=TemplateLetterComposer._join(matched_skills[:3])
+        )
+
+        experience = resume_info.experience[0] if resume_info.experience else "a software professional"
+        matched_requirements = list(dict.fromkeys(requirement for requirement, _ in matches))
+        if matched_requirements:
+            experience_paragraph = EXPERIENCE_TEMPLATES['with_requirements'].format(
+                experience=experience,
+                requirements=TemplateLetterComposer._join([TemplateLetterComposer._as_phrase(r) for r in matched_requirements[:2]])
+            )
+        else:
+            experience_paragraph = EXPERIENCE_TEMPLATES['without_requirements'].format(experience=experience)
+        if len(resume_info.experience) > 1:
+            experience_paragraph += EXPERIENCE_TEMPLATES['additional'].format(experience=resume_info.experience[1])
+
+        if matched_skills:
+            skills_paragraph = SKILLS_TEMPLATES['matched'].format(matched_skills=TemplateLetterComposer._join(matched_skills[:4]))
+            if other_skills:
+                skills_paragraph += SKILLS_TEMPLATES['additional'].format(other_skills=TemplateLetterComposer._join(other_skills[:3]))
+        else:
+            skills_paragraph = SKILLS_TEMPLATES['unmatched'].format(
+                other_skills=TemplateLetterComposer._join(other_skills[:4]) or "a broad set of technical skills",
+                gaps=TemplateLetterComposer._join([TemplateLetterComposer._as_phrase(g) for g in gaps[:2]]) or "your stack"
+            )
+        if resume_info.education:
+            skills_paragraph += SKILLS_TEMPLATES['education'].format(education=resume_info.education[0])
+
+        closing = CLOSING_TEMPLATE.format(job_title=job_info.job_title, company_name=job_info.company_name)
+
+        body = "\n\n".join([opening, experience_paragraph, skills_paragraph, closing])
+        letter = format_cover_letter(body, job_info.job_title, job_info.company_name)
+        logger.info("Composed template cover letter: %s matched skills, %s gaps", len(matched_skills), len(gaps))
+        return letter
+
+    @staticmethod
+    def match_requirements(skills: List[str], requirements: List[str]) -> Tuple[List[Tuple[str, str]], List[str]]:
+        """Pair requirements with the candidate skills they mention.
+
+        Returns the (requirement, skill) matches and the requirements with no matching skill.
+        """
+        matches = []
+        gaps = []
+        for requirement in requirements:
+            matched = False
+            for skill in skills:
+                if TemplateLetterComposer._mentions(requirement, skill):
+                    matches.append((requirement, skill))
+                    matched = True
+            if not matched:
+                gaps.append(requirement)
+        return matches, gaps
+
+    @staticmethod
+    def _mentions(text: str, skill: str) -> bool:
+        """Check whether text mentions a skill as a whole word or as all of its tokens."""
+        skill_tokens = TemplateLetterComposer._tokens(skill)
+        if not text or not skill_tokens:
+            return False
+        # Whole-word match so that short skills like "git" do not match "digital"
+        pattern = r'(?<!\w)' + re.escape(skill.lower().strip()) + r'(?!\w)'
+        return bool(re.search(pattern, text.lower())) or skill_tokens <= TemplateLetterComposer._tokens(text)
+
+    @staticmethod
+    def _tokens(text: str) -> set:
+        return set(re.findall(r'[a-z0-9+#]+(?:\.[a-z0-9]+)*', text.lower()))
+
+    @staticmethod
+    def _as_phrase(requirement: str) -> str:
+        """Turn a requirement line into a phrase that reads well mid-sentence."""
+        phrase = re.sub(r'^[\s\-\*\u2022]+', '', requirement.strip())
+        phrase = re.sub(r'\s*\(?\b(required|preferred|is a plus|a plus)\b\)?\.?$', '', phrase, flags=re.IGNORECASE)
+        phrase = phrase.rstrip('.;:')
+        return phrase[:1].lower() + phrase[1:]
+
+    @staticmethod
+    def _join(items: List[str]) -> str:
+        items = [item.strip() for item in items if item and item.strip()]
+        if len(items) <= 1:
+            return "".join(items)
+        return ", ".join(items[:-1]) + " and " + items[-1]
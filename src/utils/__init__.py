@@ -3,7 +3,20 @@ from .pdf_utils import (
     save_uploaded_pdf, 
     cleanup_temp_file,
     validate_pdf_file,
-    get_pdf_info
+    get_pdf_info,
+    read_pdf,
+    PdfBackend,
+    PdfDocument,
+    register_pdf_backend,
+    get_pdf_backend,
+    available_pdf_backends,
+    select_pdf_backends
+)
+from .pdf_worker import (
+    PdfWorkerPool,
+    get_pdf_worker_pool,
+    parse_pdf,
+    parse_pdf_text
 )
 from .text_utils import (
     clean_json_response, 
@@ -12,11 +25,66 @@ from .text_utils import (
     extract_keywords,
     clean_text,
     truncate_text,
+    split_resume_sections,
     extract_email,
     extract_phone,
     format_cover_letter,
     validate_response_quality
 )
+from .prompt_budget import (
+    PromptBudget,
+    estimate_tokens,
+    truncate_to_tokens
+)
+from .retrieval import (
+    BM25Index,
+    select_relevant,
+    select_resume_evidence,
+    pack_chunks
+)
+from .boilerplate import (
+    BoilerplateIndex,
+    get_boilerplate_index,
+    strip_boilerplate
+)
+from .near_duplicates import (
+    NearDuplicateIndex,
+    get_job_extraction_index,
+    group_near_duplicates
+)
+from .cancellation import (
+    CancellationToken,
+    OperationCancelledError,
+    raise_if_cancelled
+)
+from .deadline import (
+    Deadline,
+    remaining_time
+)
+from .metrics import (
+    MetricsRegistry,
+    get_metrics_registry,
+    record_cache_lookup,
+    start_metrics_server
+)
+from .tracing import (
+    Tracer,
+    get_tracer,
+    current_span
+)
+from .profiling import (
+    RequestProfiler,
+    get_request_profiler,
+    executor_call
+)
+from .single_flight import (
+    SingleFlight,
+    flight_key
+)
+from .call_slots import (
+    CallSlots,
+    get_call_slots
+)
 
 __all__ = [
     'extract_text_from_pdf', 
@@ -24,14 +92,58 @@ __all__ = [
     'cleanup_temp_file',
     'validate_pdf_file',
     'get_pdf_info',
+    'read_pdf',
+    'PdfBackend',
+    'PdfDocument',
+    'register_pdf_backend',
+    'get_pdf_backend',
+    'available_pdf_backends',
+    'select_pdf_backends',
+    'PdfWorkerPool',
+    'get_pdf_worker_pool',
+    'parse_pdf',
+    'parse_pdf_text',
     'clean_json_response', 
     'remove_thinking_tags',
     'parse_json_safely',
     'extract_keywords',
     'clean_text',
     'truncate_text',
+    'split_resume_sections',
     'extract_email',
     'extract_phone',
     'format_cover_letter',
-    'validate_response_quality'
+    'validate_response_quality',
+    'PromptBudget',
+    'estimate_tokens',
+    'truncate_to_tokens',
+    'BM25Index',
+    'select_relevant',
+    'select_resume_evidence',
+    'pack_chunks',
+    'BoilerplateIndex',
+    'get_boilerplate_index',
+    'strip_boilerplate',
+    'NearDuplicateIndex',
+    'get_job_extraction_index',
+    'group_near_duplicates',
+    'CancellationToken',
+    'OperationCancelledError',
+    'raise_if_cancelled',
+    'Deadline',
+    'remaining_time',
+    'MetricsRegistry',
+    'get_metrics_registry',
+    'record_cache_lookup',
+    'start_metrics_server',
+    'Tracer',
+    'get_tracer',
+    'current_span',
+    'RequestProfiler',
+    'get_request_profiler',
+    'executor_call',
+    'SingleFlight',
+    'flight_key',
+    'CallSlots',
+    'get_call_slots'
 ]
\ No newline at end of file
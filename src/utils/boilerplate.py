@@ -0,0 +1,202 @@
+import re
+import zlib
+import hashlib
+import logging
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+from ..config import BOILERPLATE_CONFIG
+from .prompt_budget import estimate_tokens
+from .metrics import BOILERPLATE_CHARS_REMOVED, BOILERPLATE_TOKENS_REMOVED
+
+logger = logging.getLogger(__name__)
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+# Word hashes kept per posting to tell reposts of one role from postings for different roles
+_SKETCH_SIZE = 64
+
+def _words(text: str) -> List[str]:
+    return _WORD_PATTERN.findall(text.lower())
+
+def _empty_report() -> Dict[str, int]:
+    return {'chars_saved': 0, 'tokens_saved': 0, 'paragraphs_removed': 0, 'lines_collapsed': 0}
+
+def _split_paragraphs(text: str) -> Tuple[List[str], str]:
+    """Blank-line separated paragraphs and the separator to join them with.
+
+    A posting pasted without blank lines is split per line.
+    """
+    paragraphs = [paragraph.strip() for paragraph in re.split(r"\n\s*\n", text) if paragraph.strip()]
+    if len(paragraphs) == 1:
+        return [line.strip() for line in text.splitlines() if line.strip()], "\n"
+    return paragraphs, "\n\n"
+
+def _sketch(words: List[str]) -> Tuple[int, ...]:
+    """Bottom-k sketch: the smallest word hashes, enough to estimate resemblance between word sets."""
+    return tuple(sorted({zlib.crc32(word.encode("utf-8")) for word in words})[:_SKETCH_SIZE])
+
+def _resemblance(first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of the word sets two sketches were taken from."""
+    union = sorted(set(first) | set(second))[:_SKETCH_SIZE]
+    if not union:
+        return 1.0
+    both = set(first) & set(second)
+    return sum(1 for value in union if value in both) / len(union)
+
+class BoilerplateIndex:
+    """Shingle index of boilerplate paragraphs found in job postings.
+
+    A paragraph counts as boilerplate when most of its word n-grams (shingles)
+    are in the index, so reworded or reordered EEO statements and benefit lists
+    still match the shipped phrases. The index also learns: a long paragraph
+    seen verbatim in learn_min_postings postings for different roles, such as
+    a company blurb, is added to it. Postings count as different roles when the
+    rest of their text resembles each other no more than learn_max_resemblance,
+    so reposts of one role never teach the index its own description. At most
+    max_learned_boilerplate learned paragraphs are kept, dropping the least
+    recently matched. Thread-safe; one index is shared by all sessions.
+    """
+
+    def __init__(self, phrases: Optional[List[str]] = None, shingle_size: Optional[int] = None,
+                 match_threshold: Optional[float] = None):
+        self.shingle_size = shingle_size or BOILERPLATE_CONFIG['shingle_size']
+        self.match_threshold = BOILERPLATE_CONFIG['match_threshold'] if match_threshold is None else match_threshold
+        self._shingles: Set[Tuple[str, ...]] = set()
+        # Learned paragraph fingerprint -> its shingles, and how many learned paragraphs hold each shingle
+        self._learned: "OrderedDict[str, Set[Tuple[str, ...]]]" = OrderedDict()
+        self._learned_shingles: Counter = Counter()
+        # Paragraph fingerprint -> sketches of the rest of each posting it was seen in
+        self._sightings: "OrderedDict[str, List[Tuple[int, ...]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        for phrase in BOILERPLATE_CONFIG['phrases'] if phrases is None else phrases:
+            self.add(phrase)
+
+    def _shingles_of(self, text: str) -> Set[Tuple[str, ...]]:
+        words = _words(text)
+        size = min(self.shingle_size, len(words))
+        return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)} if size else set()
+
+    def add(self, text: str) -> None:
+        """Treat text, and paragraphs mostly made of its shingles, as boilerplate."""
+        shingles = self._shingles_of(text)
+        with self._lock:
+            self._shingles |= shingles
+
+    def _learn(self, key: str, paragraph: str) -> None:
+        """Add a paragraph learned from postings, evicting the least recently matched. Caller holds the lock."""
+        if key in self._learned:
+            return
+        shingles = self._shingles_of(paragraph)
+        self._learned[key] = shingles
+        self._learned_shingles.update(shingles)
+        while len(self._learned) > BOILERPLATE_CONFIG['max_learned_boilerplate']:
+            _, evicted = self._learned.popitem(last=False)
+            self._learned_shingles.subtract(evicted)
+            for shingle in evicted:
+                if self._learned_shingles[shingle] <= 0:
+                    del self._learned_shingles[shingle]
+
+    def is_boilerplate(self, paragraph: str) -> bool:
+        words = _words(paragraph)
+        if len(words) < BOILERPLATE_CONFIG['min_paragraph_words']:
+            return False
+        shingles = self._shingles_of(paragraph)
+        key = hashlib.sha1(" ".join(words).encode("utf-8")).hexdigest()
+        with self._lock:
+            matched = sum(1 for shingle in shingles if shingle in self._shingles or shingle in self._learned_shingles)
+            if key in self._learned:
+                self._learned.move_to_end(key)
+        return matched >= self.match_threshold * len(shingles)
+
+    def observe(self, paragraphs: List[str], removed: Optional[Set[int]] = None) -> None:
+        """Count the long paragraphs of one posting and learn those seen in enough postings for different roles.
+
+        removed holds the indices of paragraphs already stripped as boilerplate;
+        they are left out when comparing the rest of the posting.
+        """
+        removed = removed or set()
+        paragraph_words = [_words(paragraph) for paragraph in paragraphs]
+        with self._lock:
+            for index, (paragraph, words) in enumerate(zip(paragraphs, paragraph_words)):
+                if len(words) < BOILERPLATE_CONFIG['learn_min_words'] or index in removed:
+                    continue
+                key = hashlib.sha1(" ".join(words).encode("utf-8")).hexdigest()
+                rest = _sketch([word for other, other_words in enumerate(paragraph_words)
+                                if other != index and other not in removed for word in other_words])
+                sightings = self._sightings.pop(key, [])
+                if all(_resemblance(rest, seen) <= BOILERPLATE_CONFIG['learn_max_resemblance'] for seen in sightings):
+                    sightings.append(rest)
+                if len(sightings) >= BOILERPLATE_CONFIG['learn_min_postings']:
+                    logger.info("Learned boilerplate paragraph: %.60s...", paragraph)
+                    self._learn(key, paragraph)
+                    continue
+                self._sightings[key] = sightings
+                # Forget the least recently seen paragraphs
+                while len(self._sightings) > BOILERPLATE_CONFIG['max_learned_paragraphs']:
+                    self._sightings.popitem(last=False)
+
+    def strip(self, text: str, model_name: Optional[str] = None) -> Tuple[str, Dict[str, int]]:
+        """Remove boilerplate paragraphs and repeated lines from a job posting.
+
+        Returns the cleaned text and a report with chars_saved, tokens_saved
+        (estimated for model_name), paragraphs_removed and lines_collapsed.
+        If a posting of at least min_remaining_chars would be cut below that,
+        the original is returned: most likely its content was mistaken for
+        boilerplate. A posting with nothing to remove is returned unchanged.
+        """
+        report = _empty_report()
+        if not text or not text.strip():
+            return text, report
+
+        paragraphs, separator = _split_paragraphs(text)
+        kept, seen_lines, removed = [], set(), set()
+        for index, paragraph in enumerate(paragraphs):
+            if self.is_boilerplate(paragraph):
+                report['paragraphs_removed'] += 1
+                removed.add(index)
+                continue
+            lines = []
+            for line in paragraph.splitlines():
+                key = " ".join(_words(line))
+                if key and key in seen_lines:
+                    report['lines_collapsed'] += 1
+                    continue
+                seen_lines.add(key)
+                lines.append(line.rstrip())
+            if any(line.strip() for line in lines):
+                kept.append("\n".join(lines))
+        self.observe(paragraphs, removed)
+        if not report['paragraphs_removed'] and not report['lines_collapsed']:
+            return text, report
+
+        cleaned = separator.join(kept)
+        if not kept or len(cleaned) < BOILERPLATE_CONFIG['min_remaining_chars'] <= len(text.strip()):
+            logger.warning("Boilerplate stripping would leave %s characters; keeping the posting as is", len(cleaned))
+            return text, _empty_report()
+        report['chars_saved'] = max(len(text.strip()) - len(cleaned), 0)
+        report['tokens_saved'] = max(estimate_tokens(text, model_name) - estimate_tokens(cleaned, model_name), 0)
+        return cleaned, report
+
+_index: Optional[BoilerplateIndex] = None
+_index_lock = threading.Lock()
+
+def get_boilerplate_index() -> BoilerplateIndex:
+    """Get the process-wide boilerplate index."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = BoilerplateIndex()
+        return _index
+
+def strip_boilerplate(text: str, model_name: Optional[str] = None) -> Tuple[str, Dict[str, int]]:
+    """Strip job posting boilerplate with the shared index and record the savings; see BoilerplateIndex.strip."""
+    if not BOILERPLATE_CONFIG['enabled']:
+        return text, _empty_report()
+    cleaned, report = get_boilerplate_index().strip(text, model_name)
+    if report['chars_saved']:
+        BOILERPLATE_CHARS_REMOVED.inc(report['chars_saved'])
+        BOILERPLATE_TOKENS_REMOVED.inc(report['tokens_saved'])
+        logger.info("Removed %s boilerplate paragraphs and %s repeated lines from the job posting: "
+                    "%s characters, ~%s tokens", report['paragraphs_removed'], report['lines_collapsed'],
+                    report['chars_saved'], report['tokens_saved'])
+    return cleaned, report
@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import concurrent.futures
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+from .cancellation import CancellationToken, raise_if_cancelled
+
+class CallSlots:
+    """Limits how many calls run at once across every session.
+
+    Streamlit runs each session in its own thread and event loop, so an
+    asyncio.Semaphore cannot be shared between them. Waiting callers queue
+    thread-safe futures instead and are handed a slot in arrival order.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = max(int(limit), 1)
+        self._active = 0
+        self._waiters: Deque[concurrent.futures.Future] = deque()
+        self._lock = threading.Lock()
+
+    @asynccontextmanager
+    async def slot(self, cancel_token: Optional[CancellationToken] = None) -> AsyncIterator[None]:
+        """Hold one slot for the duration of the block, waiting for one if all are taken."""
+        with self._lock:
+            waiter = None
+            if self._active < self.limit and not self._waiters:
+                self._active += 1
+            else:
+                waiter = concurrent.futures.Future()
+                self._waiters.append(waiter)
+
+        if waiter is not None:
+            unregister = cancel_token.register(waiter.cancel) if cancel_token is not None else (lambda: None)
+            try:
+                await asyncio.wrap_future(waiter)
+            except asyncio.CancelledError:
+                # cancel() fails once the slot was handed over, which then has to be passed on
+                if not waiter.cancel():
+                    self._release()
+                raise_if_cancelled(cancel_token)
+                raise
+            finally:
+                unregister()
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                # False for a waiter that was cancelled; its slot goes to the next one
+                if waiter.set_running_or_notify_cancel():
+                    waiter.set_result(None)
+                    return
+            self._active -= 1
+
+    @property
+    def active(self) -> int:
+        with self._lock:
+            return self._active
+
+_slots: Dict[Tuple[Any, ...], CallSlots] = {}
+_slots_lock = threading.Lock()
+
+def get_call_slots(client, limit: int) -> CallSlots:
+    """Get the process-wide slots for calls to the client's backend (provider and server)."""
+    key = (getattr(client, "provider", None), getattr(client, "base_url", None))
+    with _slots_lock:
+        slots = _slots.get(key)
+        if slots is None:
+            slots = _slots[key] = CallSlots(limit)
+        return slots
@@ -0,0 +1,90 @@
+import logging
+import threading
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class OperationCancelledError(Exception):
+    """Raised when work is abandoned because its cancellation token was cancelled."""
+
+class CancellationToken:
+    """Thread-safe cooperative cancellation signal.
+
+    Long-running calls check the token between steps and register callbacks
+    that abort blocking I/O (for example closing an HTTP stream), so cancelling
+    from the UI thread stops the backend from decoding tokens nobody will read.
+    """
+
+    def __init__(self, parent: Optional["CancellationToken"] = None):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self.reason: Optional[str] = None
+        # Removes this token's callback from the parent, so a parent outliving its children does not keep them
+        self._detach: Callable[[], None] = lambda: None
+        if parent is not None:
+            # An already cancelled parent cancels this token right here, before the handle is known
+            detach = parent.register(lambda: self.cancel(parent.reason))
+            self._detach = detach if not self.is_cancelled else (lambda: None)
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: Optional[str] = None) -> None:
+        """Cancel the token and run the registered callbacks once."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason or "cancelled"
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+
+        self._detach()
+        logger.info("Cancellation requested: %s", self.reason)
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning("Cancellation callback failed: %s", e)
+
+    def register(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Register a callback to run on cancellation and return a function that unregisters it.
+
+        The callback runs immediately if the token is already cancelled.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._unregister(callback)
+        callback()
+        return lambda: None
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise OperationCancelledError(self.reason)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the token is cancelled or the timeout elapses."""
+        return self._event.wait(timeout)
+
+    def child(self) -> "CancellationToken":
+        """Create a token that is cancelled with this one but can also be cancelled on its own.
+
+        Call close() on the child once its work is done.
+        """
+        return CancellationToken(parent=self)
+
+    def close(self) -> None:
+        """Detach from the parent token; the work this token guarded has finished."""
+        self._detach()
+
+    def _unregister(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+def raise_if_cancelled(cancel_token: Optional[CancellationToken]) -> None:
+    """Raise OperationCancelledError if the (optional) token was cancelled."""
+    if cancel_token is not None:
+        cancel_token.raise_if_cancelled()
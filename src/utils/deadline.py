@@ -0,0 +1,38 @@
+import time
+from typing import Dict, Optional
+
+class Deadline:
+    """A point in time by which a request must finish, measured on the monotonic clock."""
+
+    def __init__(self, seconds: float):
+        self.budget = max(float(seconds), 0.0)
+        self.expires_at = time.monotonic() + self.budget
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline, never negative."""
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def timeout(self, default: Optional[float] = None) -> float:
+        """Timeout for a single call: the remaining time, capped at default if given."""
+        remaining = self.remaining()
+        return min(default, remaining) if default is not None else remaining
+
+    def split(self, weights: Dict[str, float], stage: str) -> "Deadline":
+        """Give a stage its weighted share of the remaining time.
+
+        weights lists the stage and every stage still to run after it, so time
+        left unused by earlier stages rolls forward to the later ones.
+        """
+        total = sum(weights.values())
+        share = weights[stage] / total if total > 0 else 1.0
+        return Deadline(self.remaining() * share)
+
+def remaining_time(deadline: Optional[Deadline], default: Optional[float] = None) -> Optional[float]:
+    """Timeout for a call under an optional deadline."""
+    if deadline is None:
+        return default
+    return deadline.timeout(default)
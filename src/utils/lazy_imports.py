@@ -0,0 +1,9 @@
+def numpy():
+    """The numpy module, imported on first use.
+
+    Importing NumPy up front adds ~100ms to importing src.core, which every
+    Streamlit rerun and CLI entry point pays, while only the retrieval,
+    near-duplicate and job matching indexes need it.
+    """
+    import numpy
+    return numpy
@@ -0,0 +1,282 @@
+import math
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from ..config import METRICS_CONFIG
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+class _Metric(ABC):
+    """A named metric with a fixed set of label names and one series per label combination."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Metric {self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """Sample lines of every series, without the HELP and TYPE lines."""
+
+class Counter(_Metric):
+    """A value that only goes up, such as the number of fallbacks."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only be incremented")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+class Gauge(_Metric):
+    """A value that goes up and down, such as the number of in-flight requests."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def get(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+class Histogram(_Metric):
+    """Observations counted into cumulative buckets, from which p50/p95 can be estimated."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Optional[Sequence[float]] = None):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets or METRICS_CONFIG['latency_buckets'])) + (math.inf,)
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * len(self.buckets))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    def get_count(self, **labels) -> int:
+        with self._lock:
+            return sum(self._counts.get(self._key(labels), []))
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, list(counts), self._sums[key]) for key, counts in self._counts.items())
+        lines = []
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    """Holds the process's metrics and renders them in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Optional[Sequence[float]] = None) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _get_or_create(self, metric_class, name: str, documentation: str, labelnames: Iterable[str], **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = metric_class(name, documentation, labelnames, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, metric_class) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} is already registered with a different type or labels")
+            return metric
+
+_registry = MetricsRegistry()
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get the process-wide metrics registry."""
+    return _registry
+
+STAGE_LATENCY = _registry.histogram(
+    "cover_letter_stage_duration_seconds", "Wall time of each pipeline stage.", ["stage", "provider", "model"]
+)
+LLM_REQUEST_LATENCY = _registry.histogram(
+    "llm_request_duration_seconds", "Wall time of model calls.", ["provider", "model"]
+)
+FALLBACKS = _registry.counter(
+    "cover_letter_fallbacks_total", "Stages where a deterministic fallback replaced the model output.", ["stage"]
+)
+JSON_PARSE_FAILURES = _registry.counter(
+    "llm_json_parse_failures_total", "Model responses that did not contain valid extraction JSON.", ["extraction"]
+)
+TIMEOUTS = _registry.counter(
+    "cover_letter_timeouts_total", "Stages and model calls that ran out of time.", ["stage"]
+)
+CACHE_HITS = _registry.counter("cache_hits_total", "Cache lookups that found an entry.", ["cache"])
+CACHE_MISSES = _registry.counter("cache_misses_total", "Cache lookups that found nothing.", ["cache"])
+ADMISSIONS = _registry.counter(
+    "cover_letter_admissions_total", "Admission decisions by action.", ["action"]
+)
+PDF_WORKER_RESTARTS = _registry.counter(
+    "pdf_worker_restarts_total", "PDF worker processes replaced, by reason.", ["reason"]
+)
+BOILERPLATE_CHARS_REMOVED = _registry.counter(
+    "job_boilerplate_chars_removed_total", "Characters of job postings removed as boilerplate before prompting."
+)
+BOILERPLATE_TOKENS_REMOVED = _registry.counter(
+    "job_boilerplate_tokens_removed_total", "Estimated prompt tokens saved by removing job posting boilerplate."
+)
+EXTRACTION_BATCH_ITEMS = _registry.counter(
+    "extraction_batch_items_total", "Job extractions sent in a multi-posting prompt, by outcome.", ["outcome"]
+)
+SINGLE_FLIGHT_CALLS = _registry.counter(
+    "single_flight_calls_total", "Calls that ran (leader) or shared an identical in-flight call (follower).",
+    ["flight", "role"]
+)
+QUEUE_DEPTH = _registry.gauge("cover_letter_queue_depth", "Requests waiting for a backend slot.")
+IN_FLIGHT = _registry.gauge("cover_letter_in_flight_requests", "Requests currently being processed.")
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    (CACHE_HITS if hit else CACHE_MISSES).inc(cache=cache)
+
+def _metrics_handler():
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        registry: MetricsRegistry = _registry
+
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = self.registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug("Metrics request: " + format, *args)
+
+    return MetricsHandler
+
+_server = None
+_server_lock = threading.Lock()
+
+def start_metrics_server(host: Optional[str] = None, port: Optional[int] = None):
+    """Serve the registry on http://host:port/metrics from a daemon thread.
+
+    Safe to call on every Streamlit rerun: the server is started once per process.
+    Returns the ThreadingHTTPServer, or None if the port cannot be bound.
+    """
+    # http.server is only needed once the endpoint is served, so import it here
+    from http.server import ThreadingHTTPServer
+    global _server
+    with _server_lock:
+        if _server is not None:
+            return _server
+        host = host or METRICS_CONFIG['host']
+        port = METRICS_CONFIG['port'] if port is None else port
+        try:
+            _server = ThreadingHTTPServer((host, port), _metrics_handler())
+        except OSError as e:
+            logger.warning("Could not start metrics server on %s:%s: %s", host, port, e)
+            return None
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+        logger.info("Serving metrics on http://%s:%s/metrics", host, _server.server_port)
+        return _server
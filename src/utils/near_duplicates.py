@@ -0,0 +1,137 @@
+import re
+import zlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from ..config import NEAR_DUPLICATE_CONFIG
+from .lazy_imports import numpy
+
+_URL_PATTERN = re.compile(r"https?://\S+|www\.\S+")
+_WORD_PATTERN = re.compile(r"[a-z0-9+#]+")
+# Universal hash family (a * x + b) mod p over a Mersenne prime. a, b and the
+# CRC32 shingle hashes x are all below 2**32, so a * x + b stays below 2**64
+# and the uint64 arithmetic is exact.
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+def normalize_job_text(text: str) -> List[str]:
+    """Words of a posting, lowercased, with URLs (and the tracking parameters in them) dropped."""
+    return _WORD_PATTERN.findall(_URL_PATTERN.sub(" ", (text or "").lower()))
+
+class NearDuplicateIndex:
+    """MinHash/LSH index from job postings to values computed for them.
+
+    Each posting gets a MinHash signature of its word shingles; the signature is
+    cut into bands, and postings sharing any band are candidates whose Jaccard
+    similarity is then estimated from the full signatures. Lookups cost a few
+    dict probes regardless of how many postings are indexed. Keeps at most
+    max_entries postings, dropping the least recently used.
+    """
+
+    def __init__(self, threshold: Optional[float] = None, num_perm: Optional[int] = None,
+                 bands: Optional[int] = None, max_entries: Optional[int] = None):
+        np = numpy()
+        self._np = np
+        self.threshold = NEAR_DUPLICATE_CONFIG['threshold'] if threshold is None else threshold
+        self.num_perm = num_perm or NEAR_DUPLICATE_CONFIG['num_perm']
+        self.bands = bands or NEAR_DUPLICATE_CONFIG['bands']
+        if self.num_perm % self.bands:
+            raise ValueError(f"num_perm ({self.num_perm}) must be a multiple of bands ({self.bands})")
+        self.rows = self.num_perm // self.bands
+        self.max_entries = max_entries or NEAR_DUPLICATE_CONFIG['max_entries']
+        rng = np.random.default_rng(NEAR_DUPLICATE_CONFIG['seed'])
+        self._a = rng.integers(1, _MAX_HASH, self.num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MAX_HASH, self.num_perm, dtype=np.uint64)
+        self._entries: "OrderedDict[int, Tuple[Any, Any]]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, bytes], set] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def signature(self, text: str):
+        """MinHash signature (num_perm uint64 values) of the posting's word shingles."""
+        np = self._np
+        words = normalize_job_text(text)
+        size = min(NEAR_DUPLICATE_CONFIG['shingle_size'], len(words)) or 1
+        shingles = {" ".join(words[i:i + size]) for i in range(max(len(words) - size + 1, 1))}
+        hashes = np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+                             dtype=np.uint64, count=len(shingles))
+        # One row per permutation; the minimum hash per row is the signature
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % np.uint64(_PRIME)
+        return (permuted & np.uint64(_MAX_HASH)).min(axis=1)
+
+    def _band_keys(self, signature) -> List[Tuple[int, bytes]]:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+    def similarity(self, first, second) -> float:
+        """Estimated Jaccard similarity of two signatures."""
+        return float((first == second).mean())
+
+    def add(self, text: str, value: Any, signature=None) -> None:
+        signature = self.signature(text) if signature is None else signature
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (signature, value)
+            for key in self._band_keys(signature):
+                self._buckets.setdefault(key, set()).add(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, entry_id: int) -> None:
+        signature, _ = self._entries.pop(entry_id)
+        for key in self._band_keys(signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def query(self, text: str, signature=None) -> Optional[Tuple[Any, float]]:
+        """The value of the most similar indexed posting at or above the threshold, and its similarity."""
+        signature = self.signature(text) if signature is None else signature
+        with self._lock:
+            candidates = set()
+            for key in self._band_keys(signature):
+                candidates |= self._buckets.get(key, set())
+            best_id, best_similarity = None, 0.0
+            for entry_id in candidates:
+                similarity = self.similarity(signature, self._entries[entry_id][0])
+                if similarity > best_similarity:
+                    best_id, best_similarity = entry_id, similarity
+            if best_id is None or best_similarity < self.threshold:
+                return None
+            self._entries.move_to_end(best_id)
+            return self._entries[best_id][1], best_similarity
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+def group_near_duplicates(texts: Sequence[str], threshold: Optional[float] = None) -> List[List[int]]:
+    """Group indices of texts that are near-duplicates of an earlier text, in input order.
+
+    The first index of each group is its representative; e.g. a batch of
+    postings needs one extraction per group instead of one per posting.
+    """
+    index = NearDuplicateIndex(threshold=threshold, max_entries=max(len(texts), 1))
+    groups: List[List[int]] = []
+    for position, text in enumerate(texts):
+        signature = index.signature(text)
+        match = index.query(text, signature)
+        if match is not None:
+            groups[match[0]].append(position)
+        else:
+            index.add(text, len(groups), signature)
+            groups.append([position])
+    return groups
+
+_job_extraction_index: Optional[NearDuplicateIndex] = None
+_index_lock = threading.Lock()
+
+def get_job_extraction_index() -> NearDuplicateIndex:
+    """Get the process-wide index of job postings to their extractions."""
+    global _job_extraction_index
+    with _index_lock:
+        if _job_extraction_index is None:
+            _job_extraction_index = NearDuplicateIndex()
+        return _job_extraction_index
@@ -1,39 +1,289 @@
 import logging
-import PyPDF2
 import tempfile
+import importlib.util
 import os
-from typing import Optional, BinaryIO
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, BinaryIO, Tuple, Union
+from ..config import PDF_CONFIG
 
 logger = logging.getLogger(__name__)
 
-def extract_text_from_pdf(pdf_path: str) -> Optional[str]:
-    """Extract text from PDF file."""
+UNKNOWN_INFO = {'title': 'Unknown', 'author': 'Unknown', 'encrypted': False}
+
+class PdfBackend(ABC):
+    """A PDF parsing library behind a common interface.
+
+    Backends import their library lazily, so optional ones cost nothing
+    unless they are installed and selected.
+    """
+
+    name = "base"
+    module = ""
+
+    def is_available(self) -> bool:
+        return importlib.util.find_spec(self.module) is not None
+
+    @abstractmethod
+    def open(self, pdf_path: str):
+        """Parse the file and return the library's document object."""
+
+    @abstractmethod
+    def page_count(self, document) -> int:
+        """Number of pages of an open document."""
+
+    @abstractmethod
+    def page_text(self, document, page_num: int) -> str:
+        """Text of one page of an open document."""
+
+    def metadata(self, document) -> dict:
+        """Title, author and encryption flag of an open document."""
+        return dict(UNKNOWN_INFO)
+
+    def close(self, document) -> None:
+        pass
+
+class PyPDF2Backend(PdfBackend):
+    name = "pypdf2"
+    module = "PyPDF2"
+
+    def open(self, pdf_path: str):
+        return importlib.import_module(self.module).PdfReader(pdf_path)
+
+    def page_count(self, document) -> int:
+        return len(document.pages)
+
+    def page_text(self, document, page_num: int) -> str:
+        return document.pages[page_num].extract_text()
+
+    def metadata(self, document) -> dict:
+        metadata = document.metadata or {}
+        return {
+            'title': metadata.get('/Title', 'Unknown'),
+            'author': metadata.get('/Author', 'Unknown'),
+            'encrypted': document.is_encrypted
+        }
+
+class PypdfBackend(PyPDF2Backend):
+    """pypdf, the maintained successor of PyPDF2, with the same reader API."""
+
+    name = "pypdf"
+    module = "pypdf"
+
+class PyMuPDFBackend(PdfBackend):
+    """PyMuPDF (MuPDF bindings), which parses in C."""
+
+    name = "pymupdf"
+    module = "fitz"
+
+    def open(self, pdf_path: str):
+        import fitz
+        return fitz.open(pdf_path)
+
+    def page_count(self, document) -> int:
+        return document.page_count
+
+    def page_text(self, document, page_num: int) -> str:
+        return document[page_num].get_text()
+
+    def metadata(self, document) -> dict:
+        metadata = document.metadata or {}
+        return {
+            'title': metadata.get('title') or 'Unknown',
+            'author': metadata.get('author') or 'Unknown',
+            'encrypted': document.is_encrypted
+        }
+
+    def close(self, document) -> None:
+        document.close()
+
+class PdfiumBackend(PdfBackend):
+    """pypdfium2 (PDFium bindings), which parses in C++."""
+
+    name = "pdfium"
+    module = "pypdfium2"
+
+    def open(self, pdf_path: str):
+        import pypdfium2
+        return pypdfium2.PdfDocument(pdf_path)
+
+    def page_count(self, document) -> int:
+        return len(document)
+
+    def page_text(self, document, page_num: int) -> str:
+        page = document[page_num]
+        text_page = page.get_textpage()
+        try:
+            return text_page.get_text_range()
+        finally:
+            text_page.close()
+            page.close()
+
+    def metadata(self, document) -> dict:
+        # PDFium refuses to open encrypted files without a password
+        metadata = document.get_metadata_dict()
+        return {
+            'title': metadata.get('Title') or 'Unknown',
+            'author': metadata.get('Author') or 'Unknown',
+            'encrypted': False
+        }
+
+    def close(self, document) -> None:
+        document.close()
+
+class PdfMinerBackend(PdfBackend):
+    """pdfminer.six, pure Python with layout analysis. Slow, but reads some layouts the others garble."""
+
+    name = "pdfminer"
+    module = "pdfminer"
+
+    def open(self, pdf_path: str):
+        from pdfminer.high_level import extract_text
+        # pdfminer has no page-at-a-time API, so read the pages up front; each ends with a form feed
+        return extract_text(pdf_path, maxpages=PDF_CONFIG['max_pages']).split("\f")[:-1]
+
+    def page_count(self, document) -> int:
+        return len(document)
+
+    def page_text(self, document, page_num: int) -> str:
+        return document[page_num]
+
+class PdfDocument:
+    """A PDF parsed once by a backend.
+
+    Pass it to extract_text_from_pdf and get_pdf_info to read both the text and
+    the metadata from the same parse.
+    """
+
+    def __init__(self, pdf_path: str, backend: Union[str, PdfBackend, None] = None):
+        self.path = pdf_path
+        self.backend = backend if isinstance(backend, PdfBackend) else get_pdf_backend(backend)
+        self.native = self.backend.open(pdf_path)
+
+    @property
+    def num_pages(self) -> int:
+        return self.backend.page_count(self.native)
+
+    def page_texts(self, max_pages: int) -> List[str]:
+        """Text of the first max_pages pages; pages that fail to extract are skipped."""
+        pages = []
+        for page_num in range(min(self.num_pages, max_pages)):
+            try:
+                pages.append(self.backend.page_text(self.native, page_num))
+            except Exception as e:
+                logger.warning("Error extracting text from page %s: %s", page_num, e)
+        return pages
+
+    def info(self) -> dict:
+        return {'num_pages': self.num_pages, **self.backend.metadata(self.native)}
+
+    def close(self) -> None:
+        self.backend.close(self.native)
+
+    def __enter__(self) -> "PdfDocument":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+_backends: Dict[str, PdfBackend] = {}
+
+def register_pdf_backend(backend: PdfBackend) -> None:
+    """Make a backend selectable by name, replacing any with the same name."""
+    _backends[backend.name] = backend
+
+for _backend in (PyPDF2Backend(), PypdfBackend(), PyMuPDFBackend(), PdfiumBackend(), PdfMinerBackend()):
+    register_pdf_backend(_backend)
+
+def available_pdf_backends() -> List[str]:
+    """Names of the registered backends whose library is installed."""
+    return [name for name, backend in _backends.items() if backend.is_available()]
+
+def select_pdf_backends() -> List[PdfBackend]:
+    """Installed backends in the order documents should try them.
+
+    The configured backend comes first, or with 'auto' the first installed one
+    in PDF_CONFIG['backend_preference']. The rest of the preference list follows
+    as fallbacks, then any other registered backend.
+    """
+    configured = PDF_CONFIG['backend']
+    names = [] if configured == 'auto' else [configured]
+    for name in PDF_CONFIG['backend_preference'] + list(_backends):
+        if name not in names:
+            names.append(name)
+    return [_backends[name] for name in names if name in _backends and _backends[name].is_available()]
+
+def get_pdf_backend(name: Optional[str] = None) -> PdfBackend:
+    """Look up a backend by name, defaulting to the first of select_pdf_backends()."""
+    if name is None or name == 'auto':
+        selected = select_pdf_backends()
+        if not selected:
+            raise RuntimeError("No PDF backend is installed")
+        return selected[0]
+    if name not in _backends:
+        raise ValueError(f"Unknown PDF backend '{name}'. Registered: {', '.join(_backends)}")
+    return _backends[name]
+
+def _low_yield(text: str, pages: int) -> bool:
+    return len(text.strip()) < max(PDF_CONFIG['min_text_length'], PDF_CONFIG['min_chars_per_page'] * pages)
+
+def extract_text_from_pdf(pdf: Union[str, PdfDocument], backend: Union[str, PdfBackend, None] = None) -> Optional[str]:
+    """Extract text from a PDF file path or an already parsed PdfDocument.
+
+    Without an explicit backend, a document whose text is too short for its page
+    count (e.g. an unusual font encoding) is retried with the next selected
+    backend, and the longest text wins.
+    """
+    pdf_path = pdf.path if isinstance(pdf, PdfDocument) else pdf
     try:
-        with open(pdf_path, "rb") as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            pdf_text = ""
-            
-            max_pages = min(len(pdf_reader.pages), 50)  # Limit to 50 pages
-            
-            for page_num in range(max_pages):
-                try:
-                    page = pdf_reader.pages[page_num]
-                    pdf_text += page.extract_text() + "\n"
-                except Exception as e:
-                    logger.warning(f"Error extracting text from page {page_num}: {e}")
-                    
-        logger.info(f"Extracted PDF text length: {len(pdf_text)} characters from {max_pages} pages")
-        
-        if len(pdf_text.strip()) < 50:
-            logger.error("PDF text extraction failed or too short")
-            return None
-            
-        return pdf_text.strip()
-        
+        if isinstance(pdf, PdfDocument):
+            candidates = [pdf.backend] + [other for other in select_pdf_backends() if other is not pdf.backend]
+        elif backend is not None:
+            candidates = [backend if isinstance(backend, PdfBackend) else get_pdf_backend(backend)]
+        else:
+            candidates = select_pdf_backends()
     except Exception as e:
-        logger.error(f"Error reading PDF: {e}")
+        logger.error("Error reading PDF: %s", e)
         return None
 
+    pdf_text = None
+    for candidate in candidates:
+        try:
+            if candidate is getattr(pdf, "backend", None):
+                pages = pdf.page_texts(PDF_CONFIG['max_pages'])
+            else:
+                with PdfDocument(pdf_path, candidate) as document:
+                    pages = document.page_texts(PDF_CONFIG['max_pages'])
+        except Exception as e:
+            logger.warning("Error reading PDF with %s: %s", candidate.name, e)
+            continue
+        text = "".join(page + "\n" for page in pages)
+        logger.info("Extracted PDF text length: %s characters from %s pages with %s", len(text), len(pages), candidate.name)
+        if pdf_text is None or len(text.strip()) > len(pdf_text.strip()):
+            pdf_text = text
+        if not _low_yield(text, len(pages)):
+            break
+
+    if pdf_text is None:
+        logger.error("Error reading PDF: no backend could parse it")
+        return None
+
+    if len(pdf_text.strip()) < PDF_CONFIG['min_text_length']:
+        logger.error("PDF text extraction failed or too short")
+        return None
+
+    return pdf_text.strip()
+
+def read_pdf(pdf_path: str, backend: Union[str, PdfBackend, None] = None) -> Tuple[Optional[str], dict]:
+    """Text (as extract_text_from_pdf) and info (as get_pdf_info) of a PDF from a single parse."""
+    try:
+        document = PdfDocument(pdf_path, backend)
+    except Exception as e:
+        # Other backends may still read it; there is no parsed document to take the info from
+        logger.warning("Error opening PDF: %s", e)
+        return extract_text_from_pdf(pdf_path, backend), {'num_pages': 0, **UNKNOWN_INFO}
+    with document:
+        return extract_text_from_pdf(document), get_pdf_info(document)
+
 def save_uploaded_pdf(pdf_file: BinaryIO) -> Optional[str]:
     """Save uploaded PDF to temporary file and return path."""
     try:
@@ -43,11 +293,11 @@ def save_uploaded_pdf(pdf_file: BinaryIO) -> Optional[str]:
             temp_pdf.write(pdf_file.read())
             temp_pdf_path = temp_pdf.name
             
-        logger.info(f"Saved PDF to temporary file: {temp_pdf_path}")
+        logger.info("Saved PDF to temporary file: %s", temp_pdf_path)
         return temp_pdf_path
         
     except Exception as e:
-        logger.error(f"Error saving PDF file: {e}")
+        logger.error("Error saving PDF file: %s", e)
         return None
 
 def cleanup_temp_file(file_path: str) -> bool:
@@ -55,10 +305,10 @@ def cleanup_temp_file(file_path: str) -> bool:
     try:
         if file_path and os.path.exists(file_path):
             os.unlink(file_path)
-            logger.debug(f"Cleaned up temporary file: {file_path}")
+            logger.debug("Cleaned up temporary file: %s", file_path)
             return True
     except Exception as e:
-        logger.warning(f"Could not delete temporary file {file_path}: {e}")
+        logger.warning("Could not delete temporary file %s: %s", file_path, e)
     return False
 
 def validate_pdf_file(pdf_file: BinaryIO) -> bool:
@@ -66,29 +316,24 @@ def validate_pdf_file(pdf_file: BinaryIO) -> bool:
     try:
         pdf_file.seek(0)
         header = pdf_file.read(4)
+        size = pdf_file.seek(0, os.SEEK_END)
         pdf_file.seek(0)  # Reset position
-        
+
+        if size > PDF_CONFIG['max_file_bytes']:
+            logger.error("PDF file is %s bytes, over the %s byte limit", size, PDF_CONFIG['max_file_bytes'])
+            return False
         return header == b'%PDF'
     except Exception as e:
-        logger.error(f"Error validating PDF file: {e}")
+        logger.error("Error validating PDF file: %s", e)
         return False
 
-def get_pdf_info(pdf_path: str) -> dict:
-    """Get basic information about the PDF."""
+def get_pdf_info(pdf: Union[str, PdfDocument]) -> dict:
+    """Get basic information about the PDF, from a file path or an already parsed PdfDocument."""
     try:
-        with open(pdf_path, "rb") as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            return {
-                'num_pages': len(pdf_reader.pages),
-                'title': pdf_reader.metadata.get('/Title', 'Unknown') if pdf_reader.metadata else 'Unknown',
-                'author': pdf_reader.metadata.get('/Author', 'Unknown') if pdf_reader.metadata else 'Unknown',
-                'encrypted': pdf_reader.is_encrypted
-            }
+        if isinstance(pdf, PdfDocument):
+            return pdf.info()
+        with PdfDocument(pdf) as document:
+            return document.info()
     except Exception as e:
-        logger.error(f"Error getting PDF info: {e}")
-        return {
-            'num_pages': 0,
-            'title': 'Unknown',
-            'author': 'Unknown',
-            'encrypted': False
-        }
\ No newline at end of file
+        logger.error("Error getting PDF info: %s", e)
+        return {'num_pages': 0, **UNKNOWN_INFO}
@@ -0,0 +1,253 @@
+import os
+import sys
+import time
+import atexit
+import socket
+import cProfile
+import logging
+import threading
+import subprocess
+from multiprocessing.connection import Connection
+from typing import List, Optional, Tuple
+from ..config import PDF_WORKER_CONFIG
+from .metrics import PDF_WORKER_RESTARTS
+from .profiling import add_profile_stats, is_profiling
+from .pdf_utils import UNKNOWN_INFO, extract_text_from_pdf, read_pdf
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; workers then run without rlimits
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+def _limit_address_space(memory_mb: int) -> None:
+    if resource is None or not memory_mb:
+        return
+    limit = memory_mb * 1024 * 1024
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+def _limit_cpu_time(cpu_seconds: int) -> None:
+    """Allow cpu_seconds more CPU time from now; the kernel kills the worker with SIGXCPU past it."""
+    if resource is None or not cpu_seconds:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    limit = int(usage.ru_utime + usage.ru_stime) + cpu_seconds
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (limit, hard))
+
+def _worker_main(conn, cpu_seconds: int, memory_mb: int) -> None:
+    """Parse PDFs sent over conn until told to stop or the parent goes away."""
+    _limit_address_space(memory_mb)
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if task is None:
+            return
+        pdf_path, backend, profiled = task
+        # RLIMIT_CPU counts the process's whole lifetime, so move the limit forward per document
+        _limit_cpu_time(cpu_seconds)
+        profile = cProfile.Profile() if profiled else None
+        if profile is not None:
+            profile.enable()
+        try:
+            reply = ("ok", read_pdf(pdf_path, backend))
+        except MemoryError:
+            reply = ("error", "ran out of memory")
+        except Exception as e:
+            reply = ("error", f"{type(e).__name__}: {e}")
+        stats = None
+        if profile is not None:
+            # The parent's profiler cannot see this process, so the stats travel with the reply
+            profile.create_stats()
+            stats = profile.stats
+        conn.send(reply + (stats,))
+
+def worker_entry() -> None:
+    """Entry point of a worker process: python -c "...; worker_entry()" fd cpu_seconds memory_mb"""
+    fd, cpu_seconds, memory_mb = (int(arg) for arg in sys.argv[1:4])
+    _worker_main(Connection(fd), cpu_seconds, memory_mb)
+
+class _Worker:
+    """One worker process and the parent's end of its socket.
+
+    Workers are fresh interpreters rather than multiprocessing children: those
+    re-run the main module on start, which under Streamlit is the app script.
+    """
+
+    def __init__(self, cpu_seconds: int, memory_mb: int):
+        parent_sock, child_sock = socket.socketpair()
+        # Let the worker import src the same way this process did
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(path for path in sys.path if path))
+        try:
+            self.process = subprocess.Popen(
+                [sys.executable, "-c", f"from {__name__} import worker_entry; worker_entry()",
+                 str(child_sock.fileno()), str(cpu_seconds), str(memory_mb)],
+                pass_fds=(child_sock.fileno(),), stdin=subprocess.DEVNULL, env=env
+            )
+        finally:
+            child_sock.close()
+        self.conn = Connection(parent_sock.detach())
+        self.documents = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+            self.process.wait(timeout=1)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            pass
+        self.kill()
+
+    def kill(self) -> None:
+        if self.alive:
+            self.process.kill()
+        try:
+            self.process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            pass
+        self.conn.close()
+
+class PdfWorkerPool:
+    """Parses PDFs in a pool of resource-limited subprocesses.
+
+    A malformed or huge upload can make a parser spin or balloon in memory. Here
+    it only takes down its own worker: each worker has RLIMIT_CPU and RLIMIT_AS
+    set, a document that is not done within the wall-clock timeout gets its
+    worker killed, and workers are replaced after max_documents_per_worker
+    documents so leaks do not accumulate. Other requests keep their own workers.
+
+    Calls block, so run them in an executor thread from async code. Requires a
+    POSIX system; elsewhere parse_pdf_text parses in-process. For requests
+    sampled by the profiler the worker profiles the parse and sends the stats
+    back with the text, where they join the request's profile.
+    """
+
+    def __init__(self, workers: Optional[int] = None, cpu_seconds: Optional[int] = None,
+                 memory_mb: Optional[int] = None, timeout: Optional[float] = None,
+                 max_documents_per_worker: Optional[int] = None):
+        self.workers = max(int(workers or PDF_WORKER_CONFIG['workers']), 1)
+        self.cpu_seconds = PDF_WORKER_CONFIG['cpu_seconds'] if cpu_seconds is None else cpu_seconds
+        self.memory_mb = PDF_WORKER_CONFIG['memory_mb'] if memory_mb is None else memory_mb
+        self.timeout = timeout or PDF_WORKER_CONFIG['timeout_seconds']
+        self.max_documents_per_worker = max_documents_per_worker or PDF_WORKER_CONFIG['max_documents_per_worker']
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._idle: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def extract_text(self, pdf_path: str, timeout: Optional[float] = None, backend: Optional[str] = None) -> Optional[str]:
+        """extract_text_from_pdf in a worker; None if parsing failed, crashed or ran out of time."""
+        return self.parse(pdf_path, timeout, backend)[0]
+
+    def parse(self, pdf_path: str, timeout: Optional[float] = None,
+              backend: Optional[str] = None) -> Tuple[Optional[str], dict]:
+        """read_pdf in a worker: text and info from one parse; the text is None if it failed, crashed or timed out."""
+        failed = (None, {'num_pages': 0, **UNKNOWN_INFO})
+        timeout = min(timeout, self.timeout) if timeout is not None else self.timeout
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=timeout):
+            logger.error("No PDF worker became free within %.1fs", timeout)
+            return failed
+        worker = None
+        try:
+            worker = self._checkout()
+            worker.conn.send((pdf_path, backend, is_profiling()))
+            if not worker.conn.poll(max(timeout - (time.monotonic() - started), 0.0)):
+                logger.error("PDF parsing exceeded %.1fs; killing worker %s", timeout, worker.process.pid)
+                self._discard(worker, "timeout")
+                worker = None
+                return failed
+            status, payload, stats = worker.conn.recv()
+            worker.documents += 1
+            if stats is not None:
+                add_profile_stats(stats)
+            if status != "ok":
+                logger.error("PDF worker could not parse %s: %s", pdf_path, payload)
+                return failed
+            return payload
+        except (EOFError, OSError) as e:
+            if worker is None:
+                # Starting the worker process failed, e.g. out of processes or memory
+                logger.error("Could not start a PDF worker: %s", e)
+                return failed
+            # The worker died mid-document, typically killed for exceeding its CPU or memory limit
+            try:
+                worker.process.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                pass
+            logger.error("PDF worker %s died (exit code %s): %s", worker.process.pid, worker.process.returncode, e)
+            self._discard(worker, "crashed")
+            worker = None
+            return failed
+        finally:
+            if worker is not None:
+                self._checkin(worker)
+            self._slots.release()
+
+    def _checkout(self) -> _Worker:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("PDF worker pool is shut down")
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.alive:
+                    return worker
+                self._discard(worker, "crashed")
+        return _Worker(self.cpu_seconds, self.memory_mb)
+
+    def _checkin(self, worker: _Worker) -> None:
+        if worker.documents >= self.max_documents_per_worker:
+            PDF_WORKER_RESTARTS.inc(reason="recycled")
+            worker.stop()
+            return
+        with self._lock:
+            if not self._closed:
+                self._idle.append(worker)
+                return
+        worker.stop()
+
+    def _discard(self, worker: _Worker, reason: str) -> None:
+        PDF_WORKER_RESTARTS.inc(reason=reason)
+        worker.kill()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
+
+_pool: Optional[PdfWorkerPool] = None
+_pool_lock = threading.Lock()
+
+def get_pdf_worker_pool() -> PdfWorkerPool:
+    """Get the process-wide PDF worker pool configured by PDF_WORKER_CONFIG."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PdfWorkerPool()
+            atexit.register(_pool.shutdown)
+        return _pool
+
+def parse_pdf(pdf_path: str, timeout: Optional[float] = None) -> Tuple[Optional[str], dict]:
+    """A PDF's text and info from one parse, in the sandboxed worker pool or in-process if the sandbox is disabled."""
+    if not PDF_WORKER_CONFIG['enabled'] or os.name != "posix":
+        return read_pdf(pdf_path)
+    return get_pdf_worker_pool().parse(pdf_path, timeout)
+
+def parse_pdf_text(pdf_path: str, timeout: Optional[float] = None) -> Optional[str]:
+    """Extract a PDF's text in the sandboxed worker pool, or in-process if the sandbox is disabled."""
+    if not PDF_WORKER_CONFIG['enabled'] or os.name != "posix":
+        return extract_text_from_pdf(pdf_path)
+    return get_pdf_worker_pool().extract_text(pdf_path, timeout)
@@ -0,0 +1,257 @@
+import os
+import io
+import glob
+import pstats
+import cProfile
+import logging
+import threading
+import contextvars
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, List, Optional, Union
+from ..config import PROFILING_CONFIG
+
+logger = logging.getLogger(__name__)
+
+class _ProfileStats:
+    """cProfile stats collected in another process, in the form pstats.Stats loads."""
+
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+class RequestProfile:
+    """Profiles collected for one sampled request.
+
+    cProfile only sees the thread it was enabled on, so work handed to executor
+    threads through executor_call is profiled there and merged in at the end.
+    """
+
+    def __init__(self, request_id: str, output_dir: str):
+        self.request_id = request_id
+        self.output_dir = output_dir
+        self.profiles: List[Union[cProfile.Profile, _ProfileStats]] = []
+        self._lock = threading.Lock()
+
+    def add(self, profile: Union[cProfile.Profile, _ProfileStats]) -> None:
+        with self._lock:
+            self.profiles.append(profile)
+
+    @property
+    def stats_path(self) -> str:
+        return os.path.join(self.output_dir, f"{self.request_id}.prof")
+
+    @property
+    def snapshot_path(self) -> str:
+        return os.path.join(self.output_dir, f"{self.request_id}.memory.snapshot")
+
+    def dump_stats(self) -> Optional[str]:
+        with self._lock:
+            profiles = list(self.profiles)
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(self.stats_path)
+        return self.stats_path
+
+def _start_profile() -> Optional[cProfile.Profile]:
+    """Enable a new cProfile profiler, or return None if another one is already active.
+
+    From Python 3.12 cProfile is built on sys.monitoring, which allows one
+    profiler per process, so overlapping sampled requests (and the executor
+    threads of a request) cannot each have their own; the later ones go unprofiled.
+    """
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError as e:
+        logger.debug("Skipping profiling: %s", e)
+        return None
+    return profile
+
+_active_profile: contextvars.ContextVar[Optional[RequestProfile]] = contextvars.ContextVar("active_profile", default=None)
+
+class RequestProfiler:
+    """Opt-in profiler that samples one in every N requests.
+
+    A sampled request is profiled with cProfile (CPU) and, if enabled, tracemalloc
+    (memory). Artifacts are written to output_dir named by request id: a pstats
+    file loadable by snakeviz, flameprof or gprof2dot, and a tracemalloc snapshot.
+    """
+
+    def __init__(self, enabled: Optional[bool] = None, sample_every: Optional[int] = None,
+                 output_dir: Optional[str] = None, memory: Optional[bool] = None):
+        self.enabled = PROFILING_CONFIG['enabled'] if enabled is None else enabled
+        self.sample_every = max(int(sample_every or PROFILING_CONFIG['sample_every']), 1)
+        self.output_dir = output_dir or PROFILING_CONFIG['output_dir']
+        self.memory = PROFILING_CONFIG['memory'] if memory is None else memory
+        self._requests_seen = 0
+        self._tracing_memory = 0
+        self._lock = threading.Lock()
+
+    def should_sample(self) -> bool:
+        if not self.enabled:
+            return False
+        with self._lock:
+            self._requests_seen += 1
+            return (self._requests_seen - 1) % self.sample_every == 0
+
+    @contextmanager
+    def profile(self, request_id: str):
+        """Profile the block if this request is sampled; yields the RequestProfile or None."""
+        if not self.should_sample():
+            yield None
+            return
+
+        profile = _start_profile()
+        if profile is None:
+            logger.info("Another profile is running; request %s is not profiled", request_id)
+            yield None
+            return
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        request_profile = RequestProfile(request_id, self.output_dir)
+        token = _active_profile.set(request_profile)
+        self._start_memory_tracing()
+        try:
+            yield request_profile
+        finally:
+            profile.disable()
+            request_profile.add(profile)
+            _active_profile.reset(token)
+            self._finish(request_profile)
+
+    def _start_memory_tracing(self) -> None:
+        if not self.memory:
+            return
+        with self._lock:
+            # tracemalloc is process-wide, so overlapping sampled requests share one session
+            if self._tracing_memory == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start(PROFILING_CONFIG['memory_frames'])
+            self._tracing_memory += 1
+
+    def _finish(self, request_profile: RequestProfile) -> None:
+        try:
+            # Snapshot first so the profiler's own allocations stay out of it
+            snapshot_path = None
+            if self.memory and tracemalloc.is_tracing():
+                tracemalloc.take_snapshot().dump(request_profile.snapshot_path)
+                snapshot_path = request_profile.snapshot_path
+            stats_path = request_profile.dump_stats()
+            logger.info("Wrote profile for request %s: %s, %s", request_profile.request_id, stats_path, snapshot_path)
+        except Exception as e:
+            logger.warning("Could not write profile for request %s: %s", request_profile.request_id, e)
+        finally:
+            if self.memory:
+                with self._lock:
+                    self._tracing_memory -= 1
+                    if self._tracing_memory == 0:
+                        tracemalloc.stop()
+
+def executor_call(func: Callable, *args, **kwargs) -> Callable[[], object]:
+    """Bind a call for run_in_executor, carrying over the caller's context.
+
+    Executor threads do not inherit context variables, so without this the
+    current trace span and any active request profile would be lost there.
+    """
+    context = contextvars.copy_context()
+
+    def call():
+        return context.run(_run_profiled, func, args, kwargs)
+
+    return call
+
+def _run_profiled(func: Callable, args: tuple, kwargs: dict):
+    request_profile = _active_profile.get()
+    profile = _start_profile() if request_profile is not None else None
+    if profile is None:
+        return func(*args, **kwargs)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        profile.disable()
+        request_profile.add(profile)
+
+def is_profiling() -> bool:
+    """Whether the current request is sampled by the profiler."""
+    return _active_profile.get() is not None
+
+def add_profile_stats(stats: dict) -> None:
+    """Merge cProfile stats from another process (a PDF worker) into the current request's profile."""
+    request_profile = _active_profile.get()
+    if request_profile is not None:
+        request_profile.add(_ProfileStats(stats))
+
+_profiler: Optional[RequestProfiler] = None
+_profiler_lock = threading.Lock()
+
+def get_request_profiler() -> RequestProfiler:
+    """Get the process-wide request profiler configured by PROFILING_CONFIG."""
+    global _profiler
+    with _profiler_lock:
+        if _profiler is None:
+            _profiler = RequestProfiler()
+        return _profiler
+
+def summarize_profiles(paths: List[str], top: int = 25, sort: str = "cumulative",
+                       pattern: Optional[str] = None) -> str:
+    """Merge pstats files and list the top functions."""
+    stats = pstats.Stats(paths[0], stream=io.StringIO())
+    for path in paths[1:]:
+        stats.add(path)
+    output = io.StringIO()
+    stats.stream = output
+    if pattern:
+        # Keep directories so that patterns like "PyPDF2" match the package path
+        stats.sort_stats(sort).print_stats(pattern, top)
+    else:
+        stats.strip_dirs().sort_stats(sort).print_stats(top)
+    return output.getvalue()
+
+def summarize_snapshots(paths: List[str], top: int = 25) -> str:
+    """List the source lines holding the most memory in tracemalloc snapshots."""
+    lines = []
+    for path in paths:
+        snapshot = tracemalloc.Snapshot.load(path).filter_traces([
+            tracemalloc.Filter(False, "*/cProfile.py"),
+            tracemalloc.Filter(False, "*/pstats.py"),
+            tracemalloc.Filter(False, tracemalloc.__file__)
+        ])
+        lines.append(f"{os.path.basename(path)}:")
+        for stat in snapshot.statistics("lineno")[:top]:
+            lines.append(f"  {stat}")
+    return "\n".join(lines)
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarize request profiles written by the profiler.")
+    parser.add_argument("paths", nargs="*", help="Profile files or directories (default: the configured output dir)")
+    parser.add_argument("--top", type=int, default=25, help="Number of functions to list")
+    parser.add_argument("--sort", default="cumulative", choices=["cumulative", "tottime", "ncalls"])
+    parser.add_argument("--filter", dest="pattern", help="Only list functions matching this regex, e.g. PyPDF2|pydantic|re")
+    parser.add_argument("--memory", action="store_true", help="Summarize memory snapshots instead of CPU profiles")
+    args = parser.parse_args()
+
+    suffix = ".memory.snapshot" if args.memory else ".prof"
+    files = []
+    for path in args.paths or [PROFILING_CONFIG['output_dir']]:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, f"*{suffix}"))))
+        else:
+            files.append(path)
+    if not files:
+        parser.error(f"No {suffix} files found")
+
+    if args.memory:
+        print(summarize_snapshots(files, args.top))
+    else:
+        print(f"{len(files)} profiles")
+        print(summarize_profiles(files, args.top, args.sort, args.pattern))
+
+if __name__ == "__main__":
+    main()
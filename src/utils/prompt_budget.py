@@ -0,0 +1,73 @@
+import math
+from typing import Dict, Optional
+from ..config import PROMPT_BUDGET_CONFIG
+
+def _lookup(table: Dict[str, float], model_name: Optional[str], default):
+    """Value for the longest key that prefixes the model name, e.g. 'llama3.2' for 'llama3.2:3b'."""
+    name = (model_name or "").lower().split(":")[0]
+    matches = [key for key in table if name.startswith(key)]
+    return table[max(matches, key=len)] if matches else default
+
+def chars_per_token(model_name: Optional[str] = None) -> float:
+    return _lookup(PROMPT_BUDGET_CONFIG['chars_per_token'], model_name, PROMPT_BUDGET_CONFIG['default_chars_per_token'])
+
+def context_window(model_name: Optional[str] = None) -> int:
+    """Tokens of context the app lets the model use: its window, capped by max_context_tokens."""
+    window = _lookup(PROMPT_BUDGET_CONFIG['context_windows'], model_name, PROMPT_BUDGET_CONFIG['default_context_window'])
+    return min(window, PROMPT_BUDGET_CONFIG['max_context_tokens'])
+
+def estimate_tokens(text: str, model_name: Optional[str] = None) -> int:
+    """Estimated token count of text for a model, rounded up with the configured safety margin."""
+    if not text:
+        return 0
+    return math.ceil(len(text) / chars_per_token(model_name) * (1 + PROMPT_BUDGET_CONFIG['safety_margin']))
+
+def truncate_to_tokens(text: str, max_tokens: int, model_name: Optional[str] = None) -> str:
+    """Cut text to about max_tokens, at a line break when one is close to the limit."""
+    if estimate_tokens(text, model_name) <= max_tokens:
+        return text
+    max_chars = max(int(max_tokens * chars_per_token(model_name) / (1 + PROMPT_BUDGET_CONFIG['safety_margin'])), 0)
+    cut = text[:max_chars]
+    line_break = cut.rfind("\n")
+    if line_break > max_chars * 0.8:
+        cut = cut[:line_break]
+    return cut
+
+def is_reasoning_model(model_name: Optional[str]) -> bool:
+    name = (model_name or "").lower()
+    return any(name.startswith(prefix) for prefix in PROMPT_BUDGET_CONFIG['reasoning_models'])
+
+class PromptBudget:
+    """Token budget of one model call: how much input fits and how much output to ask for.
+
+    output_tokens is what to pass as max_length (Ollama num_predict, Gemini
+    max_output_tokens). context_tokens(prompt) is the num_ctx to request so the
+    prompt and the output fit without reserving the model's whole window.
+    """
+
+    def __init__(self, stage: str, model_name: Optional[str] = None):
+        self.stage = stage
+        self.model_name = model_name
+        self.window = context_window(model_name)
+        self.output_tokens = PROMPT_BUDGET_CONFIG['output_tokens'][stage]
+        if is_reasoning_model(model_name):
+            # Thinking tokens count against num_predict before the answer starts
+            self.output_tokens += PROMPT_BUDGET_CONFIG['reasoning_tokens']
+        self.max_input_tokens = min(PROMPT_BUDGET_CONFIG['max_input_tokens'][stage],
+                                    self.window - self.output_tokens)
+
+    def available_tokens(self, reserved: str = "") -> int:
+        """Input tokens left for the variable text once the reserved prompt text (the instructions) is in."""
+        return max(self.max_input_tokens - estimate_tokens(reserved, self.model_name), 0)
+
+    def fit(self, text: str, reserved: str = "") -> str:
+        """Cut text so that it and the reserved prompt text fit the input budget."""
+        return truncate_to_tokens(text or "", self.available_tokens(reserved), self.model_name)
+
+    def context_tokens(self, prompt: str, output_tokens: Optional[int] = None) -> int:
+        """Smallest configured context bucket holding the prompt plus the output budget."""
+        needed = estimate_tokens(prompt, self.model_name) + (output_tokens or self.output_tokens)
+        for bucket in sorted(PROMPT_BUDGET_CONFIG['context_buckets']):
+            if bucket >= needed:
+                return min(bucket, self.window)
+        return self.window
@@ -0,0 +1,139 @@
+import re
+from typing import Dict, List, Optional, Sequence
+from ..config import RETRIEVAL_CONFIG
+from .prompt_budget import estimate_tokens, truncate_to_tokens
+from .lazy_imports import numpy
+
+# Keeps terms such as c++, c# and node.js intact, without trailing punctuation
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+_STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it of on or our the their this to we will with you your
+""".split())
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased terms of text without common stopwords."""
+    return [token for token in _TOKEN_PATTERN.findall((text or "").lower()) if token not in _STOPWORDS]
+
+class BM25Index:
+    """BM25 scores of a fixed set of short documents (resume lines, skills, requirements).
+
+    Term weights are computed once into a documents x vocabulary matrix, so
+    scoring a query is a single matrix-vector product.
+    """
+
+    def __init__(self, documents: Sequence[str], k1: Optional[float] = None, b: Optional[float] = None):
+        np = numpy()
+        self._np = np
+        k1 = RETRIEVAL_CONFIG['bm25_k1'] if k1 is None else k1
+        b = RETRIEVAL_CONFIG['bm25_b'] if b is None else b
+        self.documents = list(documents)
+        self.vocabulary: Dict[str, int] = {}
+        tokenized = [tokenize(document) for document in self.documents]
+        term_ids = [[self.vocabulary.setdefault(token, len(self.vocabulary)) for token in tokens]
+                    for tokens in tokenized]
+
+        term_counts = np.zeros((len(self.documents), len(self.vocabulary)), dtype=np.float32)
+        rows = np.repeat(np.arange(len(term_ids)), [len(ids) for ids in term_ids])
+        np.add.at(term_counts, (rows, np.fromiter((i for ids in term_ids for i in ids), dtype=np.intp)), 1)
+
+        lengths = term_counts.sum(axis=1)
+        average_length = lengths.mean() if len(lengths) and lengths.mean() > 0 else 1.0
+        document_frequency = (term_counts > 0).sum(axis=0)
+        idf = np.log1p((len(self.documents) - document_frequency + 0.5) / (document_frequency + 0.5))
+        saturation = term_counts + k1 * (1 - b + b * lengths / average_length)[:, None]
+        self._weights = idf * term_counts * (k1 + 1) / np.maximum(saturation, 1e-9)
+
+    def scores(self, query: str):
+        """BM25 score of every document for the query's distinct terms."""
+        query_vector = self._np.zeros(len(self.vocabulary), dtype=self._np.float32)
+        for token in set(tokenize(query)):
+            term_id = self.vocabulary.get(token)
+            if term_id is not None:
+                query_vector[term_id] = 1.0
+        return self._weights @ query_vector
+
+    def rank(self, query: str) -> List[int]:
+        """Document indices from most to least relevant; ties keep document order."""
+        return self._np.argsort(-self.scores(query), kind="stable").tolist()
+
+def select_relevant(items: Sequence[str], query: str, max_tokens: int,
+                    model_name: Optional[str] = None) -> List[str]:
+    """The items most relevant to the query that fit in max_tokens, most relevant first."""
+    items = [item for item in items if item and item.strip()]
+    if not items:
+        return []
+    selected, used = [], 0
+    for index in BM25Index(items).rank(query):
+        cost = estimate_tokens(items[index], model_name) + 1  # separator
+        if used + cost <= max_tokens:
+            selected.append(items[index])
+            used += cost
+    return selected
+
+def split_evidence_units(text: str) -> List[str]:
+    """Non-empty lines of text, with very short lines (headings, dates) merged into the next line."""
+    units, pending = [], []
+    for line in (line.strip() for line in (text or "").splitlines()):
+        if not line:
+            continue
+        pending.append(line)
+        if len(tokenize(line)) >= RETRIEVAL_CONFIG['min_unit_tokens']:
+            units.append("\n".join(pending))
+            pending = []
+    if pending:
+        units.append("\n".join(pending))
+    return units
+
+def select_resume_evidence(resume_text: str, job_text: str, max_tokens: int,
+                           model_name: Optional[str] = None) -> str:
+    """Resume text cut to max_tokens by keeping the lines that best match the job posting.
+
+    The header lines (name, contact details) are always kept; the rest is
+    ranked with BM25 against the posting and packed best-first, then put back
+    in document order so that entries still read in sequence. A resume that
+    already fits is returned unchanged.
+    """
+    if not resume_text or estimate_tokens(resume_text, model_name) <= max_tokens:
+        return resume_text
+    lines = [line.strip() for line in resume_text.splitlines() if line.strip()]
+    header = lines[:RETRIEVAL_CONFIG['header_lines']]
+    units = split_evidence_units("\n".join(lines[len(header):]))
+    available = max_tokens - estimate_tokens("\n".join(header), model_name)
+
+    chosen, used = set(), 0
+    if available > 0 and units:
+        for index in BM25Index(units).rank(job_text or ""):
+            cost = estimate_tokens(units[index], model_name) + 1
+            if used + cost <= available:
+                chosen.add(index)
+                used += cost
+    if not chosen:
+        # Text without usable line structure, e.g. a PDF extracted as one long line
+        return truncate_to_tokens(resume_text, max_tokens, model_name)
+    return "\n".join(header + [unit for index, unit in enumerate(units) if index in chosen])
+
+def pack_chunks(sections: Sequence[str], max_tokens: int, model_name: Optional[str] = None) -> List[str]:
+    """Join consecutive sections into as few chunks of at most max_tokens as possible.
+
+    A section too long for one chunk is split between its lines, and a single
+    line too long for one chunk is truncated.
+    """
+    pieces = []
+    for section in sections:
+        if estimate_tokens(section, model_name) <= max_tokens:
+            pieces.append(section)
+        else:
+            pieces.extend(truncate_to_tokens(unit, max_tokens, model_name) for unit in split_evidence_units(section))
+
+    chunks, current, used = [], [], 0
+    for piece in pieces:
+        cost = estimate_tokens(piece, model_name) + 1
+        if current and used + cost > max_tokens:
+            chunks.append("\n".join(current))
+            current, used = [], 0
+        current.append(piece)
+        used += cost
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
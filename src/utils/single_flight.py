@@ -0,0 +1,137 @@
+import copy
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+import concurrent.futures
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+from ..config import SINGLE_FLIGHT_CONFIG
+from .cancellation import CancellationToken, OperationCancelledError, raise_if_cancelled
+from .metrics import SINGLE_FLIGHT_CALLS
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Followers made no model call, so they do not report the leader's token counts or model timings
+_SPENT_USAGE_KEYS = ("prompt_tokens", "completion_tokens")
+
+def flight_key(*parts: Any) -> str:
+    """Hash of a call's inputs (str, bytes or anything with a stable repr) to key it by."""
+    digest = hashlib.sha256()
+    for part in parts:
+        data = part if isinstance(part, bytes) else str(part).encode("utf-8")
+        digest.update(len(data).to_bytes(8, "big"))
+        digest.update(data)
+    return digest.hexdigest()
+
+class _Retry:
+    """Outcome handed to followers when the leader was cancelled rather than finished."""
+
+class _Flight:
+    def __init__(self):
+        self.waiters: List[concurrent.futures.Future] = []
+
+def _settle(waiter: concurrent.futures.Future, result: Any = None, error: Optional[BaseException] = None) -> None:
+    # A follower that was cancelled has already cancelled its waiter
+    try:
+        if error is not None:
+            waiter.set_exception(error)
+        else:
+            waiter.set_result(result)
+    except concurrent.futures.InvalidStateError:
+        pass
+
+class SingleFlight:
+    """Runs one call per key at a time and shares its outcome with identical concurrent calls.
+
+    The first caller for a key (the leader) runs the call; callers arriving
+    while it is in flight (followers) wait for it and get a deep copy of its
+    result, or its exception. Nothing is kept once the call finishes, so this
+    only merges calls that overlap, like two sessions submitting the same
+    resume or a double-clicked button. Callers may run in different sessions
+    (threads and event loops), so followers wait on thread-safe futures.
+
+    Each follower can still be cancelled on its own and waits no longer than
+    its own timeout. If the leader is cancelled or times out, or its result is
+    not shareable (e.g. an error message), its followers retry and one of them
+    becomes the new leader.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    async def do(self, key: str, call: Callable[[], Awaitable[T]], usage: Optional[dict] = None,
+                 cancel_token: Optional[CancellationToken] = None, timeout: Optional[float] = None,
+                 shareable: Optional[Callable[[T], bool]] = None) -> T:
+        """Run call(), or wait for the identical call already in flight under key.
+
+        A follower's usage gets the leader's (without token counts it did not
+        spend) and coalesced=True. A follower still waiting after timeout
+        seconds raises TimeoutError, so the caller can fall back as it would
+        for its own call. Results for which shareable returns False go to the
+        leader only.
+        """
+        if not SINGLE_FLIGHT_CONFIG['enabled']:
+            return await call()
+        usage = {} if usage is None else usage
+        expires_at = None if timeout is None else time.monotonic() + timeout
+        while True:
+            waiter = concurrent.futures.Future()
+            with self._lock:
+                flight = self._flights.get(key)
+                if flight is None:
+                    flight = self._flights[key] = _Flight()
+                    leader = True
+                else:
+                    flight.waiters.append(waiter)
+                    leader = False
+
+            if leader:
+                SINGLE_FLIGHT_CALLS.inc(flight=self.name, role="leader")
+                return await self._lead(key, flight, call, usage, shareable)
+
+            SINGLE_FLIGHT_CALLS.inc(flight=self.name, role="follower")
+            unregister = cancel_token.register(waiter.cancel) if cancel_token is not None else (lambda: None)
+            try:
+                wait = None if expires_at is None else max(expires_at - time.monotonic(), 0.0)
+                outcome = await asyncio.wait_for(asyncio.wrap_future(waiter), timeout=wait)
+            except asyncio.TimeoutError:
+                logger.warning("Identical in-flight %s call did not finish within %.1fs", self.name, timeout)
+                raise TimeoutError(f"Identical in-flight {self.name} call did not finish in time") from None
+            except asyncio.CancelledError:
+                raise_if_cancelled(cancel_token)
+                raise
+            finally:
+                unregister()
+            if isinstance(outcome, _Retry):
+                logger.info("In-flight %s call was cancelled or failed; retrying", self.name)
+                continue
+            result, leader_usage = outcome
+            usage.update({name: value for name, value in leader_usage.items()
+                          if name not in _SPENT_USAGE_KEYS and not name.endswith("_ms")})
+            usage['coalesced'] = True
+            logger.info("Shared the result of an identical in-flight %s call", self.name)
+            return copy.deepcopy(result)
+
+    async def _lead(self, key: str, flight: _Flight, call: Callable[[], Awaitable[T]], usage: dict,
+                    shareable: Optional[Callable[[T], bool]]) -> T:
+        outcome, error = _Retry(), None
+        try:
+            result = await call()
+            if shareable is None or shareable(result):
+                outcome = (result, dict(usage))
+            return result
+        except (asyncio.CancelledError, OperationCancelledError):
+            raise
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            for waiter in flight.waiters:
+                _settle(waiter, outcome, error)
@@ -30,7 +30,7 @@ def clean_json_response(response_text: str) -> Optional[str]:
             return json_text
             
     except Exception as e:
-        logger.warning(f"Error cleaning JSON response: {e}")
+        logger.warning("Error cleaning JSON response: %s", e)
     
     return None
 
@@ -41,9 +41,9 @@ def parse_json_safely(json_text: str) -> Optional[Dict[Any, Any]]:
             return None
         return json.loads(json_text)
     except json.JSONDecodeError as e:
-        logger.warning(f"JSON parsing failed: {e}")
+        logger.warning("JSON parsing failed: %s", e)
     except Exception as e:
-        logger.error(f"Unexpected error parsing JSON: {e}")
+        logger.error("Unexpected error parsing JSON: %s", e)
     
     return None
 
@@ -59,7 +59,7 @@ def extract_keywords(text: str, keywords: List[str]) -> List[str]:
         if keyword.lower() in text_lower:
             found_keywords.append(keyword)
     
-    return list(set(found_keywords))  # Remove duplicates
+    return list(dict.fromkeys(found_keywords))  # Remove duplicates, keeping keyword order
 
 def clean_text(text: str) -> str:
     """Clean and normalize text."""
@@ -74,6 +74,29 @@ def clean_text(text: str) -> str:
     
     return text.strip()
 
+def split_resume_sections(text: str, headings: List[str]) -> List[str]:
+    """Split resume text at section headings; the text before the first heading is its own section.
+
+    A heading is a short line that matches one of the headings (ignoring case
+    and a trailing colon) or is written in capitals, e.g. "WORK EXPERIENCE".
+    """
+    if not text:
+        return []
+    known = {heading.lower() for heading in headings}
+    sections, current = [], []
+    for line in text.splitlines():
+        label = line.strip().rstrip(':').strip()
+        is_heading = 0 < len(label.split()) <= 4 and (
+            label.lower() in known or (label.isupper() and len(label) >= 4 and not re.search(r'\d', label))
+        )
+        if is_heading and any(part.strip() for part in current):
+            sections.append("\n".join(current).strip())
+            current = []
+        current.append(line)
+    if any(part.strip() for part in current):
+        sections.append("\n".join(current).strip())
+    return sections
+
 def truncate_text(text: str, max_length: int, suffix: str = "...") -> str:
     """Truncate text to specified length."""
     if not text or len(text) <= max_length:
@@ -0,0 +1,234 @@
+import os
+import json
+import time
+import logging
+import secrets
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+from ..config import TRACING_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds and status codes
+KIND_INTERNAL = 1
+KIND_CLIENT = 3
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+class Span:
+    """A timed operation in a request's trace."""
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None,
+                 kind: int = KIND_INTERNAL, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = STATUS_OK
+        self.status_message: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = message
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return (self.end_ns - self.start_ns) / 1e6 if self.end_ns is not None else None
+
+    def to_otlp(self) -> dict:
+        """The span in OTLP/JSON form."""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in self.attributes.items()],
+            "status": {"code": self.status}
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+class JsonLinesSpanExporter:
+    """Appends finished traces to a JSON-lines file, rotating it by size.
+
+    Each line is an OTLP/JSON ExportTraceServiceRequest, the format written by the
+    OpenTelemetry Collector's file exporter, so files can be replayed into Jaeger or
+    other OTLP viewers without any network access at request time.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 0, backup_count: int = 0,
+                 service_name: str = "cover-letter-generator"):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.service_name = service_name
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        if not spans:
+            return
+        record = {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                "scopeSpans": [{"scope": {"name": __name__}, "spans": [span.to_otlp() for span in spans]}]
+            }]
+        }
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            try:
+                self._rotate_if_needed(len(line))
+                with open(self.path, "a", encoding="utf-8") as trace_file:
+                    trace_file.write(line)
+            except OSError as e:
+                logger.warning("Could not write trace to %s: %s", self.path, e)
+
+    def _rotate_if_needed(self, incoming: int) -> None:
+        if self.max_bytes <= 0 or not os.path.exists(self.path):
+            return
+        if os.path.getsize(self.path) + incoming <= self.max_bytes:
+            return
+        if self.backup_count <= 0:
+            os.remove(self.path)
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+class Tracer:
+    """Creates spans and exports each trace once its root span ends.
+
+    The current span is kept in a context variable, so tasks started by
+    asyncio.gather become children of the span that was open when they were created.
+    """
+
+    def __init__(self, exporter: Optional[JsonLinesSpanExporter] = None):
+        self.exporter = exporter
+        self._pending: Dict[str, List[Span]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def start_span(self, name: str, kind: int = KIND_INTERNAL, attributes: Optional[Dict[str, Any]] = None):
+        """Open a span as a child of the current one, or as the root of a new trace."""
+        parent = _current_span.get()
+        trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        span = Span(name, trace_id, parent.span_id if parent else None, kind, attributes)
+        if parent is None and self.exporter is not None:
+            with self._lock:
+                self._pending[trace_id] = []
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            self._finish(span, is_root=parent is None)
+
+    def _finish(self, span: Span, is_root: bool) -> None:
+        if self.exporter is None:
+            return
+        with self._lock:
+            if is_root:
+                spans = self._pending.pop(span.trace_id, []) + [span]
+            elif span.trace_id in self._pending:
+                self._pending[span.trace_id].append(span)
+                return
+            else:
+                # The root already ended, e.g. a model call still running after a timeout
+                spans = [span]
+        self.exporter.export(spans)
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+def get_tracer() -> Tracer:
+    """Get the process-wide tracer, exporting to TRACING_CONFIG['path'] when tracing is enabled."""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            exporter = None
+            if TRACING_CONFIG['enabled']:
+                exporter = JsonLinesSpanExporter(TRACING_CONFIG['path'], TRACING_CONFIG['max_bytes'],
+                                                 TRACING_CONFIG['backup_count'])
+            _tracer = Tracer(exporter)
+        return _tracer
+
+def load_traces(path: str) -> Dict[str, List[dict]]:
+    """Read an exported JSON-lines file into OTLP spans grouped by trace id."""
+    traces: Dict[str, List[dict]] = {}
+    with open(path, encoding="utf-8") as trace_file:
+        for line in trace_file:
+            if not line.strip():
+                continue
+            for resource_spans in json.loads(line).get("resourceSpans", []):
+                for scope_spans in resource_spans.get("scopeSpans", []):
+                    for span in scope_spans.get("spans", []):
+                        traces.setdefault(span["traceId"], []).append(span)
+    return traces
+
+def format_trace(spans: List[dict]) -> str:
+    """Render a trace as an indented tree with start offsets, to check which spans overlapped."""
+    children: Dict[Optional[str], List[dict]] = {}
+    for span in spans:
+        children.setdefault(span.get("parentSpanId"), []).append(span)
+    trace_start = min(int(span["startTimeUnixNano"]) for span in spans)
+    lines = []
+
+    def visit(parent_id: Optional[str], depth: int) -> None:
+        for span in sorted(children.get(parent_id, []), key=lambda s: int(s["startTimeUnixNano"])):
+            start_ms = (int(span["startTimeUnixNano"]) - trace_start) / 1e6
+            duration_ms = (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e6
+            lines.append(f"{'  ' * depth}{span['name']:<{40 - 2 * depth}} +{start_ms:9.1f}ms {duration_ms:9.1f}ms")
+            visit(span["spanId"], depth + 1)
+
+    visit(None, 0)
+    return "\n".join(lines)
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Print the span trees in an exported trace file.")
+    parser.add_argument("path", nargs="?", default=TRACING_CONFIG['path'])
+    parser.add_argument("--last", type=int, default=5, help="Number of most recent traces to print")
+    args = parser.parse_args()
+
+    traces = list(load_traces(args.path).values())
+    for spans in traces[-args.last:]:
+        print(format_trace(spans))
+        print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import pytest
+
+from src.config import BOILERPLATE_CONFIG
+from src.utils import BoilerplateIndex
+
+EEO = ("We are an equal opportunity employer and all qualified applicants will receive consideration for "
+       "employment without regard to race, color, religion, sex, sexual orientation, gender identity, "
+       "national origin, age, disability, protected veteran status, or any other characteristic protected by law.")
+BLURB = ("Acme builds payment infrastructure for small businesses across Europe. Founded in 2015, we now serve "
+         "forty thousand merchants from offices in Berlin, Lisbon and Warsaw, and we are backed by leading investors.")
+ROLES = {
+    "Backend Engineer": "You will design Python services for settlement, own their on-call rotation and work "
+                        "with product managers on reconciliation features for merchants and their accountants.",
+    "Data Analyst": "You will build dashboards in Looker, model revenue data in dbt and answer questions from "
+                    "finance and sales leadership about churn, expansion and cohort retention every quarter.",
+    "Product Designer": "You will run discovery interviews, prototype onboarding flows in Figma and partner with "
+                        "engineers to ship accessible interfaces for the merchant dashboard and the mobile app.",
+    "Support Lead": "You will coach a team of six agents, write macros and help center articles, and triage "
+                    "escalations with engineering so that merchants get answers within one business day.",
+}
+
+
+def _posting(title, extra=""):
+    return f"{title}\n\n{ROLES[title]}\n\n{BLURB}\n\n{EEO}{extra}"
+
+
+def test_shipped_phrases_are_removed_and_content_kept():
+    text = f"Backend Engineer\n\n{ROLES['Backend Engineer']}\n\n{EEO}"
+    cleaned, report = BoilerplateIndex().strip(text)
+    assert EEO not in cleaned and ROLES["Backend Engineer"] in cleaned
+    assert report['paragraphs_removed'] == 1
+    assert report['chars_saved'] == len(text) - len(cleaned)
+    assert report['tokens_saved'] > 0
+
+
+def test_posting_with_nothing_to_strip_is_returned_unchanged():
+    text = "Backend Engineer\nAcme\n" + ROLES["Backend Engineer"] + "\n  Remote within Europe  "
+    cleaned, report = BoilerplateIndex().strip(text)
+    assert cleaned == text
+    assert report['chars_saved'] == 0
+
+
+def test_line_per_paragraph_posting_keeps_its_line_breaks():
+    text = f"Backend Engineer\n{ROLES['Backend Engineer']}\n{EEO}\nRemote within Europe"
+    cleaned, _ = BoilerplateIndex().strip(text)
+    assert cleaned == f"Backend Engineer\n{ROLES['Backend Engineer']}\nRemote within Europe"
+
+
+def test_company_blurb_is_learned_across_different_roles():
+    index = BoilerplateIndex()
+    for title in ("Backend Engineer", "Data Analyst", "Product Designer"):
+        index.strip(_posting(title))
+    cleaned, report = index.strip(_posting("Support Lead"))
+    assert BLURB not in cleaned
+    assert ROLES["Support Lead"] in cleaned
+
+
+def test_role_description_is_not_learned_from_reposts_of_the_role():
+    index = BoilerplateIndex()
+    for number in range(5):
+        index.strip(_posting("Backend Engineer", f"\n\nApply at https://jobs.example.com/acme?ref={number}"))
+    cleaned, _ = index.strip(_posting("Backend Engineer"))
+    assert ROLES["Backend Engineer"] in cleaned
+    assert BLURB in cleaned
+
+
+def test_learned_paragraphs_are_capped(monkeypatch):
+    monkeypatch.setitem(BOILERPLATE_CONFIG, 'max_learned_boilerplate', 1)
+    monkeypatch.setitem(BOILERPLATE_CONFIG, 'learn_min_postings', 2)
+    index = BoilerplateIndex(phrases=[])
+    blurbs = [BLURB, "Globex moves freight for retailers on three continents with a fleet of electric trucks, "
+                     "twelve warehouses and a routing platform that our own engineers have built since 2009."]
+    for blurb in blurbs:
+        for title in ("Backend Engineer", "Data Analyst"):
+            index.strip(f"{title}\n\n{ROLES[title]}\n\n{blurb}")
+    assert len(index._learned) == 1
+    assert not index.is_boilerplate(BLURB)
+    assert index.is_boilerplate(blurbs[1])
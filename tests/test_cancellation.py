@@ -0,0 +1,60 @@
+import threading
+
+import pytest
+
+from src.utils import CancellationToken, OperationCancelledError, raise_if_cancelled
+
+
+def test_cancel_runs_callbacks_once_with_reason():
+    token = CancellationToken()
+    calls = []
+    token.register(lambda: calls.append(token.reason))
+    token.cancel("user left")
+    token.cancel("again")
+    assert calls == ["user left"]
+    with pytest.raises(OperationCancelledError, match="user left"):
+        token.raise_if_cancelled()
+
+
+def test_register_after_cancel_runs_immediately_and_unregister_works():
+    token = CancellationToken()
+    calls = []
+    unregister = token.register(lambda: calls.append("dropped"))
+    unregister()
+    token.cancel()
+    token.register(lambda: calls.append("late"))
+    assert calls == ["late"]
+    raise_if_cancelled(None)
+
+
+def test_child_follows_parent_but_not_the_other_way():
+    parent = CancellationToken()
+    child = parent.child()
+    child.cancel("child only")
+    assert not parent.is_cancelled
+    other = parent.child()
+    parent.cancel("parent")
+    assert other.is_cancelled and other.reason == "parent"
+
+
+def test_finished_children_are_detached_from_the_parent():
+    parent = CancellationToken()
+    for _ in range(100):
+        parent.child().close()
+    for _ in range(100):
+        parent.child().cancel("done")
+    assert parent._callbacks == []
+
+
+def test_child_of_cancelled_parent_is_cancelled():
+    parent = CancellationToken()
+    parent.cancel("gone")
+    child = parent.child()
+    assert child.is_cancelled
+    child.close()
+
+
+def test_wait_returns_when_cancelled_from_another_thread():
+    token = CancellationToken()
+    threading.Timer(0.02, token.cancel).start()
+    assert token.wait(timeout=2)
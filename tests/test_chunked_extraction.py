@@ -0,0 +1,91 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.config import CHUNKED_EXTRACTION_CONFIG
+from src.services.resume_extractor import ResumeExtractor
+from src.utils import CallSlots, CancellationToken, OperationCancelledError, call_slots
+
+SECTION = "\n".join(f"Led project {n} building Python services on Kubernetes with PostgreSQL and Kafka."
+                    for n in range(60))
+RESUME = f"Jane Doe\njane@example.com\n\nEXPERIENCE\n{SECTION}\n\nPROJECTS\n{SECTION}\n\nSKILLS\n{SECTION}\n"
+
+
+class FakeClient:
+    """Counts calls in flight across every thread that uses it."""
+    provider = "fake"
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.in_flight = 0
+        self.peak = 0
+
+    def get_model_name(self):
+        return "fake-model"
+
+    async def agenerate_response(self, prompt, **kwargs):
+        with self.lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.05)
+        with self.lock:
+            self.in_flight -= 1
+        return '{"skills": ["Python"], "experience": ["Led projects"], "education": [], "contact_info": "jane@example.com"}'
+
+
+@pytest.fixture(autouse=True)
+def fresh_slots(monkeypatch):
+    monkeypatch.setattr(call_slots, "_slots", {})
+    monkeypatch.setitem(CHUNKED_EXTRACTION_CONFIG, 'enabled', True)
+
+
+def _extract_in_threads(client, count):
+    usages = [{} for _ in range(count)]
+
+    def run(usage, job_text):
+        asyncio.run(ResumeExtractor.extract_resume_info(client, RESUME, usage=usage, job_text=job_text))
+
+    # Different postings keep the extractions from being coalesced into one
+    threads = [threading.Thread(target=run, args=(usage, f"posting {n}")) for n, usage in enumerate(usages)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return usages
+
+
+def test_chunk_calls_share_slots_across_sessions(monkeypatch):
+    monkeypatch.setitem(CHUNKED_EXTRACTION_CONFIG, 'max_concurrency', 2)
+    client = FakeClient()
+    usages = _extract_in_threads(client, 3)
+    assert all(usage.get('chunks', 0) > 1 for usage in usages)
+    assert client.calls == sum(usage['chunks'] for usage in usages)
+    assert client.peak == 2
+
+
+def test_no_chunking_without_parallel_slots(monkeypatch):
+    monkeypatch.setitem(CHUNKED_EXTRACTION_CONFIG, 'max_concurrency', 1)
+    client = FakeClient()
+    usage = _extract_in_threads(client, 1)[0]
+    assert 'chunks' not in usage
+    assert client.calls == 1
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    async def scenario():
+        slots = CallSlots(1)
+        token = CancellationToken()
+        async with slots.slot():
+            waiting = asyncio.ensure_future(slots.slot(token).__aenter__())
+            await asyncio.sleep(0.01)
+            token.cancel("test")
+            with pytest.raises(OperationCancelledError):
+                await waiting
+        assert slots.active == 0
+        async with slots.slot():
+            assert slots.active == 1
+
+    asyncio.run(scenario())
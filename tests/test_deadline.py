@@ -0,0 +1,66 @@
+import asyncio
+import time
+
+import pytest
+
+from src.clients.ollama_client import OllamaClient
+from src.models import JobDescriptionExtraction, ResumeExtraction
+from src.services.cover_letter_generator import CoverLetterGenerator
+from src.utils import Deadline, remaining_time
+
+
+def test_deadline_counts_down_and_never_goes_negative():
+    deadline = Deadline(0.05)
+    assert 0 < deadline.remaining() <= 0.05
+    assert not deadline.expired
+    time.sleep(0.06)
+    assert deadline.remaining() == 0.0
+    assert deadline.expired
+    assert Deadline(-1).budget == 0.0
+
+
+def test_timeout_is_capped_by_default_and_remaining_time():
+    deadline = Deadline(10)
+    assert deadline.timeout(2) == 2
+    assert 9 < deadline.timeout() <= 10
+    assert remaining_time(None) is None
+    assert remaining_time(None, 5) == 5
+    assert remaining_time(deadline, 3) == 3
+
+
+def test_split_rolls_unused_time_forward():
+    deadline = Deadline(10)
+    weights = {"extraction": 1, "generation": 3}
+    assert deadline.split(weights, "extraction").budget == pytest.approx(2.5, abs=0.01)
+    assert deadline.split({"generation": 3}, "generation").budget == pytest.approx(10, abs=0.01)
+
+
+@pytest.fixture
+def no_network(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("no request may be sent once the deadline has passed")
+    monkeypatch.setattr("src.clients.ollama_client.requests.get", fail)
+    monkeypatch.setattr("src.clients.ollama_client.requests.post", fail)
+
+
+def test_expired_timeout_reports_a_timeout_not_a_missing_model(no_network):
+    response = OllamaClient("llama3", "http://localhost:11434").generate_response("prompt", timeout=0)
+    assert response.startswith("Request timed out")
+
+
+def test_spent_deadline_falls_back_without_a_model_call(no_network, monkeypatch):
+    client = OllamaClient("llama3", "http://localhost:11434")
+    monkeypatch.setattr(client, "generate_response", lambda *args, **kwargs: pytest.fail("model was called"))
+    with pytest.raises(TimeoutError):
+        asyncio.run(client.agenerate_response("prompt", timeout=0.0))
+
+    letter = "Dear Hiring Manager,\n\nI am applying for the Backend Engineer role.\n\nBest regards,\nJane"
+    resume = ResumeExtraction(skills=["Python"], experience=["Backend engineer"], education=["BSc"],
+                              contact_info="jane@example.com")
+    job = JobDescriptionExtraction(job_title="Backend Engineer", company_name="Acme",
+                                   requirements=["Python"], description="Payment APIs.")
+    usage = {}
+    rewritten = asyncio.run(CoverLetterGenerator.regenerate_paragraph(
+        client, letter, 0, resume_info=resume, job_info=job, deadline=Deadline(0), usage=usage))
+    assert rewritten == letter
+    assert usage['fallback_used']
@@ -0,0 +1,99 @@
+import re
+import json
+import time
+import asyncio
+import threading
+
+import pytest
+
+from src.config import EXTRACTION_BATCH_CONFIG, NEAR_DUPLICATE_CONFIG
+from src.services.extraction_batcher import ExtractionBatcher
+from src.services.job_extractor import JobExtractor
+from src.services import extraction_batcher
+from src.utils import Deadline
+
+
+class FakeClient:
+    provider = "gemini"
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    def get_model_name(self):
+        return "gemini-1.5-flash"
+
+    async def agenerate_response(self, prompt, timeout=None, **kwargs):
+        count = len(re.findall(r"Job Posting \d+:", prompt))
+        self.calls.append((count, timeout))
+        await asyncio.sleep(self.delay)
+        if not count:
+            return json.dumps({"job_title": "Single", "company_name": "Acme", "requirements": [], "description": "d"})
+        return json.dumps([{"posting": number, "job_title": f"Title {number}", "company_name": "Acme",
+                            "requirements": [], "description": "d"} for number in range(1, count + 1)])
+
+
+@pytest.fixture(autouse=True)
+def batching(monkeypatch):
+    monkeypatch.setitem(EXTRACTION_BATCH_CONFIG, 'enabled', True)
+    monkeypatch.setitem(NEAR_DUPLICATE_CONFIG, 'enabled', False)
+    monkeypatch.setattr(extraction_batcher, "_batcher", ExtractionBatcher(window_seconds=0.1, max_batch_size=4))
+
+
+def _posting(number):
+    return f"Backend Engineer {number}\nAcme\n" + f"Build payment APIs in Python for team {number}. " * 4
+
+
+def _extract_concurrently(client, deadlines):
+    """Extract one posting per deadline, each in its own thread and event loop like separate sessions."""
+    results = [None] * len(deadlines)
+
+    def run(index, seconds):
+        usage = {}
+        deadline = Deadline(seconds) if seconds is not None else None
+        extraction = asyncio.run(JobExtractor.extract_job_description_info(client, _posting(index),
+                                                                           deadline=deadline, usage=usage))
+        results[index] = (extraction, usage)
+
+    threads = []
+    for index, seconds in enumerate(deadlines):
+        threads.append(threading.Thread(target=run, args=(index, seconds)))
+        threads[-1].start()
+        time.sleep(0.01)
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_batch_call_uses_the_longest_deadline():
+    client = FakeClient()
+    results = _extract_concurrently(client, [2.0, 30.0])
+    assert len(client.calls) == 1
+    count, timeout = client.calls[0]
+    assert count == 2 and timeout > 20
+    assert [extraction.job_title for extraction, _ in results] == ["Title 1", "Title 2"]
+    assert all(usage['batched'] == 2 for _, usage in results)
+
+
+def test_leader_out_of_time_falls_back_without_its_own_call():
+    client = FakeClient(delay=0.4)
+    results = _extract_concurrently(client, [0.25, 30.0])
+    leader, leader_usage = results[0]
+    follower, follower_usage = results[1]
+    # The follower still gets the batch answer although the leader stopped waiting
+    assert follower.job_title == "Title 2" and follower_usage['batched'] == 2
+    assert leader_usage['fallback_used'] and 'batched' not in leader_usage
+    assert [count for count, _ in client.calls] == [2]
+
+
+def test_parse_response_matches_numbered_and_positional_answers():
+    numbered = json.dumps([{"posting": 2, "job_title": "B", "company_name": "Y", "requirements": [], "description": "d"}])
+    results = ExtractionBatcher._parse_response(numbered, 2)
+    assert results[0] is None and results[1].job_title == "B"
+
+    positional = json.dumps([{"job_title": t, "company_name": "Y", "requirements": [], "description": "d"}
+                             for t in ("A", "B")])
+    assert [result.job_title for result in ExtractionBatcher._parse_response(positional, 2)] == ["A", "B"]
+    # Unnumbered answers that do not line up with the postings are not guessed at
+    assert ExtractionBatcher._parse_response(positional, 3) == [None, None, None]
+    assert ExtractionBatcher._parse_response("not json", 2) == [None, None]
@@ -0,0 +1,47 @@
+import pytest
+
+from src.models import ResumeExtraction
+from src.services import JobMatcher
+
+POSTINGS = [
+    "Backend engineer: Python, SQL and AWS. Build payment APIs with Docker.",
+    "Frontend developer: React, TypeScript and CSS for our design system.",
+    "Warehouse associate: forklift certification and early shifts.",
+]
+
+
+@pytest.fixture
+def resume():
+    return ResumeExtraction(skills=["Python", "SQL", "Docker"],
+                            experience=["Built payment APIs in Python on AWS"],
+                            education=["BSc Computer Science"], contact_info="jane@example.com")
+
+
+def test_skill_coverage_counts_only_skills_the_posting_mentions(resume):
+    coverage = JobMatcher(POSTINGS).skill_coverage(resume)
+    # Python, SQL, AWS and Docker are all on the resume
+    assert coverage[0] == pytest.approx(1.0)
+    # React, TypeScript and CSS are not
+    assert coverage[1] == 0
+    # Mentions no known skill
+    assert coverage[2] == 0
+
+
+def test_text_similarity_is_a_cosine(resume):
+    matcher = JobMatcher(POSTINGS)
+    similarity = matcher.text_similarity("python payment apis aws")
+    assert 0 < similarity[0] <= 1
+    assert similarity[2] == 0
+    assert matcher.text_similarity(POSTINGS[1])[1] == pytest.approx(1.0)
+    assert matcher.text_similarity("nothing known here").tolist() == [0, 0, 0]
+
+
+def test_top_k_returns_the_best_postings_first(resume):
+    matcher = JobMatcher(POSTINGS)
+    assert len(matcher) == 3
+    best = matcher.top_k(resume, k=2)
+    assert best[0][0] == 0
+    assert best[0][1] >= best[1][1]
+    assert all(0 <= score <= 1 for _, score in best)
+    assert len(matcher.top_k(resume, k=10)) == 3
+    assert JobMatcher([]).top_k(resume) == []
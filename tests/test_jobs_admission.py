@@ -0,0 +1,139 @@
+import io
+import time
+import threading
+
+import pytest
+
+from src.core import jobs
+from src.core.admission import AdmissionController, ADMITTED, REJECTED
+from src.models import PipelineResult
+
+
+class FakeClient:
+    provider = "fake"
+    model_name = "fake-model"
+
+
+@pytest.fixture
+def blocking_pipeline(monkeypatch):
+    """Replace the pipeline with one that holds its worker until released."""
+    release = threading.Event()
+    started = threading.Semaphore(0)
+
+    async def run_cover_letter_pipeline(pdf_file, job_description, client, admission_controller=None,
+                                        admission=None, **kwargs):
+        started.release()
+        while not release.is_set():
+            time.sleep(0.01)
+        admission_controller.release(admission, 1.0)
+        return PipelineResult(content="letter", admission=admission.action)
+
+    monkeypatch.setattr(jobs, "run_cover_letter_pipeline", run_cover_letter_pipeline)
+    yield release, started
+    release.set()
+
+
+def _wait_for(predicate, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < end, "condition not reached"
+        time.sleep(0.01)
+
+
+def _manager(max_workers=1, max_queued_jobs=20, **admission):
+    config = {'backend_slots': 1, 'degrade_queue_depth': 1, 'reject_queue_depth': 2,
+              'wait_slo_seconds': 1e9, 'reject_wait_seconds': 1e9, **admission}
+    controller = AdmissionController(config)
+    return jobs.JobManager(max_workers=max_workers, max_queued_jobs=max_queued_jobs,
+                           admission_controller=controller), controller
+
+
+def _submit(manager):
+    return manager.submit(io.BytesIO(b"%PDF-1.4"), "Backend engineer", FakeClient())
+
+
+def test_queued_jobs_count_towards_admission(blocking_pipeline):
+    release, started = blocking_pipeline
+    manager, controller = _manager()
+    try:
+        running = _submit(manager)
+        assert started.acquire(timeout=5)
+        # One running and two waiting for the single worker fill the reject threshold
+        queued = [_submit(manager), _submit(manager)]
+        assert controller.get_stats()['in_flight'] == 3
+
+        rejected = _submit(manager)
+        status = manager.get_status(rejected)
+        assert status.state == jobs.COMPLETED
+        result = manager.get_result(rejected)
+        assert result.admission == REJECTED
+        assert result.retry_after_seconds >= 1
+        assert controller.get_stats()['in_flight'] == 3
+
+        release.set()
+        for job_id in [running] + queued:
+            _wait_for(lambda: manager.get_status(job_id).state == jobs.COMPLETED)
+        assert controller.get_stats()['in_flight'] == 0
+    finally:
+        # Let queued jobs finish while the fake pipeline is still in place
+        release.set()
+        manager.shutdown(wait=True)
+
+
+def test_cancelling_a_queued_job_releases_its_admission(blocking_pipeline):
+    release, started = blocking_pipeline
+    manager, controller = _manager()
+    try:
+        running = _submit(manager)
+        assert started.acquire(timeout=5)
+        queued = _submit(manager)
+        assert controller.get_stats()['in_flight'] == 2
+
+        assert manager.cancel(queued)
+        assert controller.get_stats()['in_flight'] == 1
+
+        release.set()
+        _wait_for(lambda: manager.get_status(running).state == jobs.COMPLETED)
+        assert manager.get_result(running).admission == ADMITTED
+        assert controller.get_stats()['in_flight'] == 0
+    finally:
+        # Let queued jobs finish while the fake pipeline is still in place
+        release.set()
+        manager.shutdown(wait=True)
+
+
+def test_job_queue_is_bounded(blocking_pipeline):
+    release, started = blocking_pipeline
+    manager, controller = _manager(max_queued_jobs=1, reject_queue_depth=100)
+    try:
+        _submit(manager)
+        assert started.acquire(timeout=5)
+        _submit(manager)
+
+        overflow = _submit(manager)
+        result = manager.get_result(overflow)
+        assert result.admission == REJECTED
+        assert result.retry_after_seconds >= 1
+        assert controller.get_stats()['in_flight'] == 2
+    finally:
+        # Let queued jobs finish while the fake pipeline is still in place
+        release.set()
+        manager.shutdown(wait=True)
+
+
+def test_rejected_request_does_not_read_the_upload(monkeypatch):
+    import asyncio
+    from src.core import processor
+
+    def fail(*args, **kwargs):
+        raise AssertionError("a rejected request must not parse the PDF")
+
+    monkeypatch.setattr(processor, "parse_pdf_text", fail)
+    monkeypatch.setattr(processor, "parse_pdf", fail)
+    monkeypatch.setattr(processor, "_save_upload", fail)
+    controller = AdmissionController({'backend_slots': 1, 'reject_queue_depth': 0})
+    result = asyncio.run(processor.run_cover_letter_pipeline(
+        io.BytesIO(b"%PDF-1.4"), "Backend engineer", FakeClient(), admission_controller=controller))
+    assert result.admission == REJECTED
+    assert result.draft is None
+    assert controller.get_stats()['in_flight'] == 0
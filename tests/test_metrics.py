@@ -0,0 +1,60 @@
+import math
+
+import pytest
+
+from src.utils import MetricsRegistry
+
+
+def test_counter_and_gauge_render_in_prometheus_text_format():
+    registry = MetricsRegistry()
+    calls = registry.counter("calls_total", "Calls made.", ["stage"])
+    calls.inc(stage="generation")
+    calls.inc(2, stage='job "extraction"\n')
+    in_flight = registry.gauge("in_flight", "Requests in flight.")
+    in_flight.inc(3)
+    in_flight.dec()
+
+    assert registry.render().splitlines() == [
+        "# HELP calls_total Calls made.",
+        "# TYPE calls_total counter",
+        'calls_total{stage="generation"} 1',
+        'calls_total{stage="job \\"extraction\\"\\n"} 2',
+        "# HELP in_flight Requests in flight.",
+        "# TYPE in_flight gauge",
+        "in_flight 2",
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency.", ["stage"], buckets=[1, 0.1])
+    for value in (0.05, 0.5, 0.7, 5):
+        latency.observe(value, stage="pdf")
+
+    assert latency.get_count(stage="pdf") == 4
+    assert latency.buckets == (0.1, 1, math.inf)
+    assert registry.render().splitlines()[2:] == [
+        'latency_seconds_bucket{stage="pdf",le="0.1"} 1',
+        'latency_seconds_bucket{stage="pdf",le="1"} 3',
+        'latency_seconds_bucket{stage="pdf",le="+Inf"} 4',
+        'latency_seconds_sum{stage="pdf"} 6.25',
+        'latency_seconds_count{stage="pdf"} 4',
+    ]
+
+
+def test_labels_and_registration_are_checked():
+    registry = MetricsRegistry()
+    calls = registry.counter("calls_total", "Calls made.", ["stage"])
+    assert registry.counter("calls_total", "Calls made.", ["stage"]) is calls
+    with pytest.raises(ValueError):
+        registry.gauge("calls_total", "Calls made.", ["stage"])
+    with pytest.raises(ValueError):
+        calls.inc(provider="ollama")
+    with pytest.raises(ValueError):
+        calls.inc(-1, stage="generation")
+
+
+def test_metric_base_class_is_abstract():
+    from src.utils.metrics import _Metric
+    with pytest.raises(TypeError):
+        _Metric("untyped", "No samples.")
@@ -0,0 +1,80 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.services.job_extractor import JobExtractor
+from src.utils import near_duplicates
+from src.utils.near_duplicates import NearDuplicateIndex, group_near_duplicates, _PRIME, _MAX_HASH
+
+POSTING = """Senior Backend Engineer
+Acme Corp
+
+We are looking for a backend engineer to build and operate our payment APIs.
+Requirements:
+5+ years of experience with Python and distributed systems
+Experience with PostgreSQL, Kafka and Kubernetes in production
+Strong ownership of services from design to on-call
+Clear written communication with product and design partners
+"""
+
+
+def test_signature_matches_exact_universal_hash():
+    index = NearDuplicateIndex(num_perm=8, bands=4)
+    # The largest values the family can see must not wrap around in uint64
+    a = np.array([_MAX_HASH - 1], dtype=np.uint64)
+    x = np.array([_MAX_HASH], dtype=np.uint64)
+    b = np.array([_MAX_HASH - 1], dtype=np.uint64)
+    assert int((a * x + b)[0]) == (_MAX_HASH - 1) * _MAX_HASH + _MAX_HASH - 1
+    signature = index.signature(POSTING)
+    assert signature.shape == (8,)
+    assert int(signature.max()) <= _MAX_HASH and _PRIME > _MAX_HASH
+
+
+def test_near_duplicate_is_found_and_different_posting_is_not():
+    index = NearDuplicateIndex(threshold=0.7)
+    index.add(POSTING, "acme")
+    edited = POSTING + "Apply at https://jobs.example.com/acme?utm_source=board\n"
+    match = index.query(edited)
+    assert match is not None and match[0] == "acme" and match[1] >= 0.7
+    assert index.query("Pastry chef wanted for a busy downtown bakery, early mornings and weekends.") is None
+
+
+def test_index_evicts_least_recently_used():
+    index = NearDuplicateIndex(max_entries=2)
+    index.add("first posting about data engineering with spark and airflow pipelines", 1)
+    index.add("second posting about mobile development with swift and kotlin apps", 2)
+    index.add("third posting about security engineering with threat modelling and audits", 3)
+    assert len(index) == 2
+    assert index.query("first posting about data engineering with spark and airflow pipelines") is None
+
+
+def test_group_near_duplicates_keeps_input_order():
+    other = "Registered nurse for the night shift in our cardiology ward, weekends included."
+    assert group_near_duplicates([POSTING, other, POSTING + "\nPosted 3 days ago"]) == [[0, 2], [1]]
+
+
+class FakeClient:
+    provider = "fake"
+
+    def get_model_name(self):
+        return "fake-model"
+
+
+def test_near_duplicate_repost_keeps_its_own_title_and_company(monkeypatch):
+    index = NearDuplicateIndex(threshold=0.7)
+    monkeypatch.setattr("src.services.job_extractor.get_job_extraction_index", lambda: index)
+    monkeypatch.setitem(near_duplicates.NEAR_DUPLICATE_CONFIG, 'enabled', True)
+    index.add(POSTING, {"job_title": "Senior Backend Engineer", "company_name": "Acme Corp",
+                        "requirements": ["Python", "Kafka"], "description": "Payment APIs."})
+
+    repost = POSTING.replace("Senior Backend Engineer", "Staff Backend Engineer").replace("Acme Corp", "Globex")
+    usage = {}
+    extraction = asyncio.run(JobExtractor.extract_job_description_info(FakeClient(), repost, usage=usage))
+    assert usage['reused_similarity'] >= 0.7
+    assert extraction.job_title == "Staff Backend Engineer"
+    assert extraction.company_name == "Globex"
+    assert extraction.requirements == ["Python", "Kafka"]
+
+    extraction = asyncio.run(JobExtractor.extract_job_description_info(FakeClient(), POSTING))
+    assert (extraction.job_title, extraction.company_name) == ("Senior Backend Engineer", "Acme Corp")
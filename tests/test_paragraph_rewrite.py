@@ -0,0 +1,84 @@
+import io
+import time
+
+from src.core import jobs, MODE_TEMPLATE
+from src.core.admission import AdmissionController
+from src.models import JobDescriptionExtraction, PipelineResult, ResumeExtraction
+from src.services.cover_letter_generator import CoverLetterGenerator
+
+BODY = [
+    "I am excited to apply for the Backend Engineer role at Acme, where reliable services matter.",
+    "At Globex I built payment pipelines in Python that processed millions of transactions a day.",
+    "I would welcome the chance to discuss how I can help Acme. Thank you for your consideration.",
+]
+
+
+def test_body_paragraphs_of_a_plain_letter():
+    letter = "Dear Hiring Manager,\n\n" + "\n\n".join(BODY) + "\n\nSincerely,\nJane Doe"
+    assert CoverLetterGenerator.body_paragraphs(letter) == BODY
+
+
+def test_header_and_subject_before_the_greeting_are_preamble():
+    letter = ("Jane Doe\njane@example.com\n\nMarch 3, 2025\n\nAcme Inc.\n1 Main Street\n\n"
+              "Re: Application for the Backend Engineer position\n\nDear Hiring Manager,\n\n"
+              + "\n\n".join(BODY) + "\n\nBest regards,\nJane Doe")
+    assert CoverLetterGenerator.body_paragraphs(letter) == BODY
+
+
+def test_letter_without_greeting_skips_only_the_date():
+    letter = "March 3, 2025\n\n" + "\n\n".join(BODY) + "\n\nSincerely,\nJane"
+    assert CoverLetterGenerator.body_paragraphs(letter) == BODY
+
+
+class FakeClient:
+    provider = "fake"
+    model_name = "fake-model"
+
+    def get_model_name(self):
+        return self.model_name
+
+    async def agenerate_response(self, prompt, **kwargs):
+        return "At Globex I moved our Python payment services to AWS, cutting hosting costs by a third."
+
+
+def test_paragraph_rewrite_runs_as_a_background_job():
+    letter = "Dear Hiring Manager,\n\n" + "\n\n".join(BODY) + "\n\nSincerely,\nJane Doe"
+    result = PipelineResult(
+        content=letter, admission="admitted",
+        resume_info=ResumeExtraction(skills=["Python"], experience=["Globex"], education=["BSc"],
+                                     contact_info="jane@example.com"),
+        job_info=JobDescriptionExtraction(job_title="Backend Engineer", company_name="Acme",
+                                          requirements=["Python"], description="Payment APIs.")
+    )
+    controller = AdmissionController({'backend_slots': 1})
+    manager = jobs.JobManager(max_workers=1, admission_controller=controller)
+    try:
+        job_id = manager.submit_paragraph_rewrite(result, 1, FakeClient(), instructions="mention AWS")
+        end = time.monotonic() + 5
+        while manager.get_status(job_id).state != jobs.COMPLETED:
+            assert time.monotonic() < end
+            time.sleep(0.01)
+        updated = manager.get_result(job_id)
+        assert "AWS" in CoverLetterGenerator.body_paragraphs(updated.content)[1]
+        assert updated.stages[-1].stage == "paragraph_regeneration"
+        assert controller.get_stats()['in_flight'] == 0
+        assert result.content == letter
+    finally:
+        manager.shutdown()
+
+
+def test_rewrite_of_a_template_letter_passes_admission():
+    letter = "Dear Hiring Manager,\n\n" + "\n\n".join(BODY) + "\n\nSincerely,\nJane Doe"
+    result = PipelineResult(content=letter, mode=MODE_TEMPLATE)
+    # At capacity, so the controller rejects every request
+    controller = AdmissionController({'backend_slots': 1, 'reject_queue_depth': 0})
+    manager = jobs.JobManager(max_workers=1, admission_controller=controller)
+    try:
+        job_id = manager.submit_paragraph_rewrite(result, 1, FakeClient())
+        assert manager.get_status(job_id).state == jobs.COMPLETED
+        rejected = manager.get_result(job_id)
+        assert rejected.content == letter
+        assert "at capacity" in rejected.message
+        assert not rejected.stages
+    finally:
+        manager.shutdown()
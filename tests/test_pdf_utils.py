@@ -0,0 +1,59 @@
+import pytest
+
+from src.utils import PdfBackend, PdfDocument, extract_text_from_pdf, get_pdf_info, read_pdf
+
+PAGE = "Jane Doe, backend engineer. Built payment APIs in Python and Go on AWS for five years.\n"
+
+
+class CountingBackend(PdfBackend):
+    """Serves three fixed pages and counts how often a file is parsed."""
+
+    name = "counting"
+    module = "json"
+
+    def __init__(self):
+        self.opened = 0
+
+    def open(self, pdf_path: str):
+        self.opened += 1
+        return [PAGE] * 3
+
+    def page_count(self, document) -> int:
+        return len(document)
+
+    def page_text(self, document, page_num: int) -> str:
+        return document[page_num]
+
+    def metadata(self, document) -> dict:
+        return {'title': 'Resume', 'author': 'Jane Doe', 'encrypted': False}
+
+
+def test_text_and_info_share_one_parse():
+    backend = CountingBackend()
+    with PdfDocument("resume.pdf", backend) as document:
+        text = extract_text_from_pdf(document)
+        info = get_pdf_info(document)
+    assert backend.opened == 1
+    assert text.count("Jane Doe") == 3
+    assert info == {'num_pages': 3, 'title': 'Resume', 'author': 'Jane Doe', 'encrypted': False}
+
+
+def test_read_pdf_parses_once():
+    backend = CountingBackend()
+    text, info = read_pdf("resume.pdf", backend)
+    assert backend.opened == 1
+    assert text.startswith("Jane Doe") and info['num_pages'] == 3
+
+
+def test_read_pdf_of_a_missing_file_reports_no_pages(tmp_path):
+    text, info = read_pdf(str(tmp_path / "missing.pdf"))
+    assert text is None
+    assert info['num_pages'] == 0
+
+
+def test_backends_must_implement_parsing():
+    class MetadataOnly(PdfBackend):
+        name = "metadata-only"
+
+    with pytest.raises(TypeError):
+        MetadataOnly()
@@ -0,0 +1,102 @@
+import os
+import pstats
+
+import pytest
+
+from benchmarks.corpus import build_pdf
+from src.utils import pdf_worker
+from src.utils.pdf_worker import PdfWorkerPool
+from src.utils.profiling import RequestProfiler, executor_call
+
+posix_only = pytest.mark.skipif(os.name != "posix", reason="PDF workers need a POSIX system")
+
+
+def _write_pdf(path, lines):
+    path.write_bytes(build_pdf([[f"Line {number} of a backend engineer resume" for number in range(lines)]]))
+    return str(path)
+
+
+@pytest.fixture
+def resume_pdf(tmp_path):
+    return _write_pdf(tmp_path / "resume.pdf", 40)
+
+
+def test_worker_that_cannot_start_fails_the_document(monkeypatch):
+    def cannot_fork(*args, **kwargs):
+        raise OSError("Resource temporarily unavailable")
+
+    monkeypatch.setattr(pdf_worker, "_Worker", cannot_fork)
+    pool = PdfWorkerPool(workers=1)
+    assert pool.extract_text("resume.pdf", timeout=1) is None
+    # The slot is given back, so the next document is not blocked
+    assert pool.extract_text("resume.pdf", timeout=1) is None
+
+
+@posix_only
+def test_sampled_requests_get_the_worker_profile(resume_pdf, tmp_path):
+    pool = PdfWorkerPool(workers=1)
+    profiler = RequestProfiler(enabled=True, sample_every=1, output_dir=str(tmp_path), memory=False)
+    try:
+        with profiler.profile("sampled"):
+            text, info = executor_call(pool.parse, resume_pdf)()
+    finally:
+        pool.shutdown()
+    assert "Line 39" in text and info['num_pages'] == 1
+    stats = pstats.Stats(str(tmp_path / "sampled.prof"))
+    # PyPDF2 only ran in the worker process
+    assert any("PyPDF2" in filename for filename, _, _ in stats.stats)
+
+
+@pytest.fixture
+def slow_pdf(tmp_path):
+    # PyPDF2 needs several CPU seconds for this many text lines
+    return _write_pdf(tmp_path / "slow.pdf", 60000)
+
+
+def _parse_ok(pool, pdf_path):
+    text, info = pool.parse(pdf_path)
+    assert text is not None and "Line 39" in text
+    assert info['num_pages'] == 1
+
+
+@posix_only
+def test_worker_past_the_wall_clock_timeout_is_killed(resume_pdf, slow_pdf):
+    pool = PdfWorkerPool(workers=1, cpu_seconds=0)
+    timeouts = pdf_worker.PDF_WORKER_RESTARTS.get(reason="timeout")
+    try:
+        assert pool.parse(slow_pdf, timeout=1) == (None, {'num_pages': 0, **pdf_worker.UNKNOWN_INFO})
+        assert pdf_worker.PDF_WORKER_RESTARTS.get(reason="timeout") == timeouts + 1
+        assert pool._idle == []
+        _parse_ok(pool, resume_pdf)
+    finally:
+        pool.shutdown()
+
+
+@posix_only
+def test_worker_over_its_cpu_limit_crashes_and_is_replaced(resume_pdf, slow_pdf):
+    pool = PdfWorkerPool(workers=1, cpu_seconds=1, timeout=60)
+    crashes = pdf_worker.PDF_WORKER_RESTARTS.get(reason="crashed")
+    try:
+        # The kernel kills the worker with SIGXCPU long before the wall-clock timeout
+        assert pool.extract_text(slow_pdf) is None
+        assert pdf_worker.PDF_WORKER_RESTARTS.get(reason="crashed") == crashes + 1
+        _parse_ok(pool, resume_pdf)
+    finally:
+        pool.shutdown()
+
+
+@posix_only
+def test_workers_are_recycled_after_max_documents(resume_pdf):
+    pool = PdfWorkerPool(workers=1, max_documents_per_worker=2)
+    recycled = pdf_worker.PDF_WORKER_RESTARTS.get(reason="recycled")
+    try:
+        _parse_ok(pool, resume_pdf)
+        first = pool._idle[0].process
+        _parse_ok(pool, resume_pdf)
+        assert pool._idle == []
+        assert first.poll() is not None
+        assert pdf_worker.PDF_WORKER_RESTARTS.get(reason="recycled") == recycled + 1
+        _parse_ok(pool, resume_pdf)
+        assert pool._idle[0].process.pid != first.pid
+    finally:
+        pool.shutdown()
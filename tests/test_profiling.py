@@ -0,0 +1,65 @@
+import asyncio
+import cProfile
+import threading
+import pytest
+from src.utils import profiling
+from src.utils.profiling import RequestProfiler, executor_call
+
+class ExclusiveProfile(cProfile.Profile):
+    """cProfile as on Python 3.12+: only one profiler may be enabled in the process."""
+    _active = None
+    _lock = threading.Lock()
+
+    def enable(self, *args, **kwargs):
+        with ExclusiveProfile._lock:
+            if ExclusiveProfile._active is not None:
+                raise ValueError("Another profiling tool is already active")
+            ExclusiveProfile._active = self
+        super().enable(*args, **kwargs)
+
+    def disable(self):
+        super().disable()
+        with ExclusiveProfile._lock:
+            if ExclusiveProfile._active is self:
+                ExclusiveProfile._active = None
+
+@pytest.fixture
+def exclusive_profiler(monkeypatch):
+    monkeypatch.setattr(profiling.cProfile, "Profile", ExclusiveProfile)
+
+def test_overlapping_sampled_requests_do_not_fail(exclusive_profiler, tmp_path):
+    profiler = RequestProfiler(enabled=True, sample_every=1, output_dir=str(tmp_path), memory=False)
+    both_running = threading.Barrier(2)
+    results, errors = {}, []
+
+    async def request(request_id):
+        with profiler.profile(request_id) as profile:
+            # Both requests are inside profile() here, and each hands work to an executor thread
+            await asyncio.get_running_loop().run_in_executor(None, both_running.wait, 5)
+            value = await asyncio.get_running_loop().run_in_executor(None, executor_call(sum, [1, 2, 3]))
+            results[request_id] = (value, profile)
+
+    def run(request_id):
+        try:
+            asyncio.run(request(request_id))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(f"request-{i}",)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert [value for value, _ in results.values()] == [6, 6]
+    # One request got the profiler, the other ran unprofiled
+    profiled = [profile for _, profile in results.values() if profile is not None]
+    assert len(profiled) == 1
+    assert (tmp_path / f"{profiled[0].request_id}.prof").exists()
+
+def test_executor_call_runs_unprofiled_when_profiler_is_busy(exclusive_profiler, tmp_path):
+    profiler = RequestProfiler(enabled=True, sample_every=1, output_dir=str(tmp_path), memory=False)
+    with profiler.profile("busy") as profile:
+        assert profile is not None
+        assert executor_call(max, 4, 9)() == 9
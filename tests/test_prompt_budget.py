@@ -0,0 +1,60 @@
+import math
+
+import pytest
+
+from src.config import PROMPT_BUDGET_CONFIG
+from src.utils import PromptBudget, estimate_tokens, truncate_to_tokens
+from src.utils.prompt_budget import chars_per_token, context_window
+
+
+def test_model_lookup_uses_the_longest_matching_prefix():
+    assert chars_per_token("llama3.2:3b") == 3.8
+    assert chars_per_token("unknown-model") == PROMPT_BUDGET_CONFIG['default_chars_per_token']
+    # llama3 has an 8k window, llama3.2 a 128k one capped by max_context_tokens
+    assert context_window("llama3:8b") == min(8192, PROMPT_BUDGET_CONFIG['max_context_tokens'])
+    assert context_window("llama3.2") == PROMPT_BUDGET_CONFIG['max_context_tokens']
+
+
+def test_estimate_tokens_rounds_up_with_the_safety_margin():
+    assert estimate_tokens("") == 0
+    text = "x" * 380
+    expected = math.ceil(380 / 3.8 * (1 + PROMPT_BUDGET_CONFIG['safety_margin']))
+    assert estimate_tokens(text, "llama3") == expected
+    assert estimate_tokens(text, "llama3") > 380 / 3.8
+
+
+def test_truncate_prefers_a_nearby_line_break():
+    short = "fits"
+    assert truncate_to_tokens(short, 100) is short
+    text = "\n".join(f"line {number:03d} with some words" for number in range(200))
+    cut = truncate_to_tokens(text, 100, "llama3")
+    assert estimate_tokens(cut, "llama3") <= 100
+    assert text.startswith(cut) and text[len(cut)] == "\n"
+
+
+def test_reasoning_models_get_thinking_tokens():
+    plain = PromptBudget("generation", "llama3")
+    reasoning = PromptBudget("generation", "deepseek-r1:7b")
+    assert reasoning.output_tokens == plain.output_tokens + PROMPT_BUDGET_CONFIG['reasoning_tokens']
+
+
+def test_available_tokens_and_fit_leave_room_for_the_instructions():
+    budget = PromptBudget("job_extraction", "llama3")
+    instructions = "Extract the posting. " * 20
+    available = budget.available_tokens(instructions)
+    assert available == budget.max_input_tokens - estimate_tokens(instructions, "llama3")
+    fitted = budget.fit("word " * 5000, instructions)
+    assert estimate_tokens(fitted, "llama3") <= available
+    assert budget.fit(None) == ""
+
+
+@pytest.mark.parametrize("prompt_chars, expected", [(100, 2048), (6000, 4096), (20000, 8192)])
+def test_context_tokens_picks_the_smallest_bucket(prompt_chars, expected):
+    budget = PromptBudget("generation", "llama3")
+    assert budget.context_tokens("x" * prompt_chars) == expected
+
+
+def test_context_tokens_never_exceeds_the_window():
+    budget = PromptBudget("generation", "phi3")
+    assert budget.context_tokens("x" * 100000) == budget.window == 4096
+    assert budget.context_tokens("x", output_tokens=3000) == 4096
@@ -0,0 +1,43 @@
+from src.utils import BM25Index, estimate_tokens, select_relevant
+from src.utils.retrieval import tokenize
+
+
+def test_tokenize_keeps_technical_terms_and_drops_stopwords():
+    assert tokenize("Built the C++ and Node.js services, with C#.") == ["built", "c++", "node.js", "services", "c#"]
+
+
+def test_bm25_ranks_matching_documents_first():
+    documents = [
+        "Managed a retail team of twelve",
+        "Built Python APIs on AWS with Docker",
+        "Python scripting for reports",
+    ]
+    index = BM25Index(documents)
+    scores = index.scores("python aws")
+    assert scores[0] == 0
+    assert scores[1] > scores[2] > 0
+    assert index.rank("python aws") == [1, 2, 0]
+    # No known terms: every score is 0 and the document order is kept
+    assert index.rank("kubernetes") == [0, 1, 2]
+
+
+def test_bm25_prefers_shorter_documents_for_the_same_match():
+    index = BM25Index(["python", "python plus many other unrelated words here"])
+    short, long = index.scores("python")
+    assert short > long
+
+
+def test_bm25_handles_empty_input():
+    assert BM25Index([]).rank("python") == []
+    assert BM25Index(["", "the and of"]).scores("python").tolist() == [0, 0]
+
+
+def test_select_relevant_fits_the_token_budget():
+    items = ["Docker and Kubernetes in production", "Python backend services", "", "Team lunches"]
+    selected = select_relevant(items, "python kubernetes", max_tokens=1000)
+    assert selected[-1] == "Team lunches"
+    assert set(selected[:2]) == {"Docker and Kubernetes in production", "Python backend services"}
+
+    budget = estimate_tokens("Python backend services") + 1
+    assert select_relevant(items, "python", max_tokens=budget) == ["Python backend services"]
+    assert select_relevant([], "python", max_tokens=100) == []
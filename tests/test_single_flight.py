@@ -0,0 +1,150 @@
+import time
+import asyncio
+
+import pytest
+
+from src.clients.base_client import BaseClient
+from src.utils import SingleFlight, flight_key
+from src.utils.deadline import Deadline
+from src.services.job_extractor import JobExtractor
+from src.services.resume_extractor import ResumeExtractor
+from src.utils.metrics import JSON_PARSE_FAILURES
+
+
+def test_flight_key_separates_parts():
+    assert flight_key("ab", "c") != flight_key("a", "bc")
+    assert flight_key(b"pdf", "text") == flight_key(b"pdf", "text")
+
+
+def test_concurrent_identical_calls_run_once():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"letter": "text"}
+
+    async def scenario():
+        usages = [{"prompt_tokens": None} for _ in range(3)]
+        results = await asyncio.gather(*(flight.do("key", call, usage=usage) for usage in usages))
+        return results, usages
+
+    results, usages = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert all(result == {"letter": "text"} for result in results)
+    # Followers get copies, not the leader's object
+    assert results[1] is not results[0]
+    assert sum(bool(usage.get("coalesced")) for usage in usages) == 2
+
+
+def test_follower_gives_up_at_its_timeout():
+    flight = SingleFlight("test")
+
+    async def slow():
+        await asyncio.sleep(0.3)
+        return "done"
+
+    async def scenario():
+        leader = asyncio.ensure_future(flight.do("key", slow))
+        await asyncio.sleep(0.01)
+        with pytest.raises(TimeoutError):
+            await flight.do("key", slow, timeout=0.05)
+        assert await leader == "done"
+
+    asyncio.run(scenario())
+
+
+def test_unshareable_result_makes_followers_call_themselves():
+    flight = SingleFlight("test")
+    responses = iter(["Cannot connect to Ollama.", "a letter", "a letter"])
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return next(responses)
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("key", call, shareable=lambda response: not response.startswith("Cannot"))
+                                      for _ in range(3)))
+
+    results = asyncio.run(scenario())
+    assert results[0] == "Cannot connect to Ollama."
+    assert results[1:] == ["a letter", "a letter"]
+    assert len(calls) == 2
+
+
+class FakeClient(BaseClient):
+    provider = "fake"
+
+    def __init__(self, responses, delay=0.05):
+        super().__init__("fake-model")
+        self.responses = list(responses)
+        self.delay = delay
+        self.calls = 0
+
+    def check_model_availability(self):
+        return True
+
+    def generate_response(self, prompt, max_length=1024, cancel_token=None, timeout=None, usage=None,
+                          context_tokens=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.responses.pop(0)
+
+
+def test_client_does_not_share_error_messages():
+    client = FakeClient(["Request timed out. Please try again.", "answer"])
+
+    async def scenario():
+        return await asyncio.gather(client.agenerate_response("prompt"), client.agenerate_response("prompt"))
+
+    assert asyncio.run(scenario()) == ["Request timed out. Please try again.", "answer"]
+    assert client.calls == 2
+
+
+def test_extraction_follower_falls_back_at_its_deadline():
+    posting = "Backend Engineer\nAcme\n" + "Build payment APIs in Python and Go for our platform team. " * 3
+    client = FakeClient(['{"job_title": "Backend Engineer", "company_name": "Acme", '
+                         '"requirements": [], "description": "APIs"}'], delay=0.3)
+
+    async def scenario():
+        leader = asyncio.ensure_future(JobExtractor.extract_job_description_info(client, posting))
+        await asyncio.sleep(0.02)
+        usage = {}
+        follower = await JobExtractor.extract_job_description_info(client, posting, deadline=Deadline(0.05),
+                                                                   usage=usage)
+        return await leader, follower, usage
+
+    leader, follower, usage = asyncio.run(scenario())
+    assert leader.company_name == "Acme"
+    assert usage['fallback_used'] and 'coalesced' not in usage
+    assert client.calls == 1
+
+
+def test_extraction_fallback_is_not_shared_with_followers():
+    posting = "Data Engineer\nGlobex\n" + "Run Spark and Airflow pipelines feeding the analytics warehouse. " * 3
+    client = FakeClient(["not json at all", '{"job_title": "Data Engineer", "company_name": "Globex", '
+                                            '"requirements": ["Spark"], "description": "Pipelines"}'])
+
+    async def scenario():
+        usages = [{}, {}]
+        leader = asyncio.ensure_future(JobExtractor.extract_job_description_info(client, posting, usage=usages[0]))
+        await asyncio.sleep(0.01)
+        follower = await JobExtractor.extract_job_description_info(client, posting, usage=usages[1])
+        return await leader, follower, usages
+
+    leader, follower, usages = asyncio.run(scenario())
+    assert usages[0]['fallback_used']
+    # The follower made its own model call instead of taking the leader's fallback
+    assert client.calls == 2
+    assert follower.requirements == ["Spark"]
+    assert not usages[1].get('fallback_used') and 'coalesced' not in usages[1]
+
+
+def test_client_error_messages_are_not_parsed_as_json():
+    failures = JSON_PARSE_FAILURES.get(extraction="resume")
+    for message in ("Gemini API Error: quota exceeded", "An unexpected error occurred: boom"):
+        assert ResumeExtractor._parse_response(message) is None
+    assert JSON_PARSE_FAILURES.get(extraction="resume") == failures
@@ -0,0 +1,91 @@
+import re
+
+import pytest
+
+from src.models import JobDescriptionExtraction, ResumeExtraction
+from src.services import JobExtractor, ResumeExtractor, TemplateLetterComposer
+
+
+@pytest.fixture
+def resume():
+    return ResumeExtraction(
+        experience=["Senior Software Engineer at Acme Corp", "Software Developer at Globex"],
+        skills=["Python", "Docker", "Kubernetes", "AWS", "SQL", "React"],
+        education=["B.S. Computer Science, State University"],
+        contact_info="jane.doe@example.com"
+    )
+
+
+@pytest.fixture
+def job():
+    return JobDescriptionExtraction(
+        job_title="Backend Engineer", company_name="Initech",
+        requirements=["Experience with Python and SQL required", "Knowledge of Docker and Kubernetes",
+                      "Strong communication skills"],
+        description="Build and scale our data platform."
+    )
+
+
+def _paragraphs(letter):
+    return [paragraph for paragraph in letter.split("\n\n") if paragraph.strip()]
+
+
+def test_letter_has_date_greeting_body_and_sign_off(resume, job):
+    letter = TemplateLetterComposer.compose_cover_letter(resume, job)
+    date, greeting, opening, experience, skills, closing, sign_off = _paragraphs(letter)
+
+    assert re.fullmatch(r"[A-Z][a-z]+ \d{2}, \d{4}", date)
+    assert greeting == "Dear Initech Hiring Team,"
+    assert opening.startswith("I am excited to apply for the Backend Engineer position at Initech.")
+    assert "Python, SQL and Docker" in opening
+    assert "Senior Software Engineer at Acme Corp" in experience
+    assert "experience with Python and SQL and knowledge of Docker and Kubernetes" in experience
+    assert "as Software Developer at Globex" in experience
+    assert "Python, SQL, Docker and Kubernetes" in skills and "AWS and React" in skills
+    assert "B.S. Computer Science, State University" in skills
+    assert "Initech as your next Backend Engineer" in closing
+    assert sign_off == "Sincerely,\n[Your Name]"
+
+
+def test_missing_extraction_fields_fall_back_to_generic_text():
+    resume = ResumeExtraction(experience=[], skills=[], education=[], contact_info="")
+    job = JobDescriptionExtraction(job_title="Analyst", company_name="Globex", requirements=[], description="")
+    opening, experience, skills, closing = _paragraphs(TemplateLetterComposer.compose_cover_letter(resume, job))[2:6]
+
+    assert opening.startswith("I am writing to express my interest in the Analyst position at Globex.")
+    assert "In my most recent role as a software professional, I took ownership" in experience
+    assert "Before that" not in experience
+    assert skills == ("My technical toolkit includes a broad set of technical skills, "
+                      "and I am ready to ramp up quickly on your stack.")
+    assert closing.startswith("I would welcome the chance to discuss how I can contribute to Globex")
+
+
+def test_unmatched_skills_name_the_gaps(job):
+    resume = ResumeExtraction(experience=["Designer at Hooli"], skills=["Figma"], education=[], contact_info="")
+    skills = _paragraphs(TemplateLetterComposer.compose_cover_letter(resume, job))[4]
+    assert skills == ("My technical toolkit includes Figma, and I am ready to ramp up quickly on "
+                      "experience with Python and SQL and knowledge of Docker and Kubernetes.")
+
+
+def test_same_input_gives_the_same_letter(resume, job):
+    letters = {TemplateLetterComposer.compose_cover_letter(resume, job) for _ in range(3)}
+    assert len(letters) == 1
+
+
+def test_requirements_match_whole_words_only():
+    matches, gaps = TemplateLetterComposer.match_requirements(["Git", "Node.js"],
+                                                              ["Digital marketing", "Node.js and Git"])
+    assert matches == [("Node.js and Git", "Git"), ("Node.js and Git", "Node.js")]
+    assert gaps == ["Digital marketing"]
+
+
+def test_letter_from_fallback_extractions():
+    resume = ResumeExtractor._fallback_resume_extraction(
+        "Jane Doe\njane.doe@example.com\nSoftware Developer at Globex\nSkills: Python, SQL, Docker\n"
+        "Bachelor of Science in Computer Science\n")
+    job = JobExtractor._fallback_job_extraction(
+        "Backend Engineer\nInitech\nRequirements:\nExperience with Python and SQL required\n"
+        "Knowledge of Docker\n")
+    letter = TemplateLetterComposer.compose_cover_letter(resume, job)
+    assert letter == TemplateLetterComposer.compose_cover_letter(resume, job)
+    assert "Dear " in letter and letter.endswith("Sincerely,\n[Your Name]")